@@ -1,17 +1,21 @@
-from crewai import Agent
-from tools.PDFAnalyserTool import PDFAnalyserTool
-from core.llm_provider import get_llm
+from agents.lazy import build_agent, lazy_agents
 
-llm = get_llm(role="store")  
 
-pdf_analysis_agent = Agent(
-    role="Quant Research Extractor",
-    goal="Extract structured sections from a PDF article relevant to trading and risk.",
-    backstory=(
-        "You are a quant analyst skilled at quickly breaking down complex academic papers. "
-        "You extract structured, labeled sections for downstream trading insight extraction."
-    ),
-    tools=[PDFAnalyserTool()],
-    allow_delegation=False,
-    llm = llm
-)
+def _pdf_analysis_agent():
+    from tools.PDFAnalyserTool import PDFAnalyserTool
+
+    return build_agent(
+        role="Quant Research Extractor",
+        goal="Extract structured sections from a PDF article relevant to trading and risk.",
+        backstory=(
+            "You are a quant analyst skilled at quickly breaking down complex academic papers. "
+            "You extract structured, labeled sections for downstream trading insight extraction."
+        ),
+        tools=[PDFAnalyserTool()],
+    )
+
+
+# Per-run instances for concurrent flows; see agents.code_agents
+AGENT_FACTORIES = {"pdf_analysis_agent": _pdf_analysis_agent}
+
+__getattr__ = lazy_agents(__name__, AGENT_FACTORIES)
@@ -0,0 +1,35 @@
+# agents/lazy.py
+#
+# Agents are built on first access instead of at import: building one loads
+# crewai and creates an LLM client, which made importing any module that
+# mentions an agent slow. Agent modules expose their agents through a module
+# __getattr__ made by lazy_agents(), so `from agents.code_agents import x`
+# keeps working and builds `x` once, the first time it is imported.
+
+import threading
+from typing import Any, Callable, Dict
+
+
+def build_agent(**kwargs):
+    from crewai import Agent
+    from core.llm_provider import get_llm
+
+    kwargs.setdefault("tools", [])
+    return Agent(allow_delegation=False, llm=get_llm(role="store"), **kwargs)
+
+
+def lazy_agents(module_name: str, factories: Dict[str, Callable[[], Any]]) -> Callable[[str], Any]:
+    """Return a module __getattr__ that builds each agent once from its factory."""
+    built: Dict[str, Any] = {}
+    lock = threading.Lock()
+
+    def __getattr__(name: str):
+        factory = factories.get(name)
+        if factory is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        with lock:
+            if name not in built:
+                built[name] = factory()
+        return built[name]
+
+    return __getattr__
@@ -0,0 +1,276 @@
+# benchmarks/bench_pipeline.py
+#
+# Offline benchmark of the PDF-to-code pipeline: PDFAnalyserTool, SummaryTool
+# and the full CodingFlow, run on generated PDFs with the stub LLM so no
+# model is called. Results are written as JSON to compare commits.
+#
+#   cd backend && python -m benchmarks.bench_pipeline --pages 5 20 60 --repeat 3
+#   cd backend && python -m benchmarks.bench_pipeline --compare benchmarks/results/<old>.json
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.bench_section_engine import WORDS
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+# ------------------------------------------------------------------------------
+# Synthetic PDF corpus
+# ------------------------------------------------------------------------------
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def synthetic_pdf(path: str, pages: int, seed: int = 7) -> int:
+    """
+    Write a text-only PDF of `pages` pages and return its number of headings.
+    Headings are set in 14pt bold and body lines in 10pt regular, so both the
+    NLP and the layout heading detectors have something to find.
+    """
+    rng = random.Random(seed)
+    streams, headings = [], 0
+    for page in range(pages):
+        ops, y = ["BT"], 760
+        if page % 2 == 0:
+            headings += 1
+            title = f"{page // 2 + 1} " + " ".join(w.capitalize() for w in rng.sample(WORDS[:20], 3))
+            ops.append(f"/F2 14 Tf 1 0 0 1 72 {y} Tm ({_pdf_escape(title)}) Tj")
+            y -= 24
+        while y > 60:
+            line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14)))
+            ops.append(f"/F1 10 Tf 1 0 0 1 72 {y} Tm ({_pdf_escape(line)}) Tj")
+            y -= 14
+        ops.append(f"/F1 9 Tf 1 0 0 1 300 30 Tm ({page + 1}) Tj")
+        ops.append("ET")
+        streams.append("\n".join(ops).encode("latin-1"))
+
+    # Objects: 1 catalog, 2 page tree, 3-4 fonts, then a page and its content per page
+    page_ids = [5 + 2 * i for i in range(pages)]
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {pages} >>".encode(),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        4: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>",
+    }
+    for page_id, stream in zip(page_ids, streams):
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        ).encode()
+        objects[page_id + 1] = f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream"
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for obj_id in sorted(objects):
+        offsets.append(len(out))
+        out += f"{obj_id} 0 obj\n".encode() + objects[obj_id] + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+    return headings
+
+
+def build_corpus(directory: str, page_counts: List[int]) -> List[Dict[str, Any]]:
+    corpus = []
+    for pages in page_counts:
+        path = os.path.join(directory, f"synthetic_{pages}p.pdf")
+        headings = synthetic_pdf(path, pages, seed=pages)
+        corpus.append({"path": path, "pages": pages, "headings": headings, "bytes": os.path.getsize(path)})
+    return corpus
+
+
+# ------------------------------------------------------------------------------
+# Measurement
+# ------------------------------------------------------------------------------
+
+def _measure(fn: Callable[[], Any], repeat: int) -> Tuple[Any, Dict[str, float]]:
+    """Run `fn` `repeat` times and return its last result with latency stats in ms."""
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return result, {
+        "min_ms": round(timings[0], 2),
+        "median_ms": round(statistics.median(timings), 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 2),
+    }
+
+
+def _per_second(amount: float, latency_ms: float) -> float:
+    return round(amount / (latency_ms / 1000), 2) if latency_ms else 0.0
+
+
+def _stage_totals() -> Dict[str, Tuple[float, float]]:
+    """(seconds, count) of qcfs_stage_wall_seconds per stage, summed over models."""
+    from core.metrics import STAGE_WALL_SECONDS
+
+    totals: Dict[str, List[float]] = {}
+    for metric in STAGE_WALL_SECONDS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith(("_sum", "_count")):
+                entry = totals.setdefault(sample.labels["stage"], [0.0, 0.0])
+                entry[0 if sample.name.endswith("_sum") else 1] += sample.value
+    return {stage: (s, c) for stage, (s, c) in totals.items()}
+
+
+def _stage_breakdown(before, after, runs: int) -> Dict[str, float]:
+    """Mean ms spent per flow run in each instrumented stage between two snapshots."""
+    breakdown = {}
+    for stage, (seconds, count) in after.items():
+        prev_seconds, prev_count = before.get(stage, (0.0, 0.0))
+        if count > prev_count:
+            breakdown[stage] = round((seconds - prev_seconds) * 1000 / runs, 2)
+    return breakdown
+
+
+def use_scratch_workdir(workdir: str):
+    """
+    Point USER_WORKDIR, and with it every on-disk store (section and LLM caches,
+    artifacts, jobs), at `workdir`. Store paths are fixed when core.config is
+    first imported, so this has to run before anything imports it.
+    """
+    if "core.config" in sys.modules:
+        raise RuntimeError("core.config was imported before the benchmark workdir was set")
+    os.environ["USER_WORKDIR"] = workdir
+
+
+def run(corpus: List[Dict[str, Any]], repeat: int, heading_mode: str, skip_flow: bool) -> List[Dict[str, Any]]:
+    from tools.PDFAnalyserTool import PDFAnalyserTool
+    from tools.code_tools import SummaryTool
+
+    results = []
+    for doc in corpus:
+        sections, stats = _measure(lambda: PDFAnalyserTool()._run(doc["path"], heading_mode=heading_mode), repeat)
+        results.append({
+            "stage": "pdf_analysis", "pages": doc["pages"], "bytes": doc["bytes"], **stats,
+            "sections": len(sections), "pages_per_s": _per_second(doc["pages"], stats["median_ms"]),
+        })
+
+        prompt, stats = _measure(lambda: SummaryTool()._run(sections), repeat)
+        results.append({
+            "stage": "summary_tool", "pages": doc["pages"], **stats,
+            "sections": len(sections), "prompt_chars": len(prompt),
+            "sections_per_s": _per_second(len(sections), stats["median_ms"]),
+        })
+
+        if skip_flow:
+            continue
+        from flows.code import CodingFlow
+
+        def coding_flow():
+            flow = CodingFlow()
+            flow.inputs = {"pdf_path": doc["path"], "heading_mode": heading_mode}
+            return flow.kickoff()
+
+        before = _stage_totals()
+        code, stats = _measure(coding_flow, repeat)
+        results.append({
+            "stage": "coding_flow", "pages": doc["pages"], **stats,
+            "code_chars": len(code.code), "docs_per_min": _per_second(60, stats["median_ms"]),
+            "stages_ms": _stage_breakdown(before, _stage_totals(), repeat),
+        })
+    return results
+
+
+# ------------------------------------------------------------------------------
+# Reporting
+# ------------------------------------------------------------------------------
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any]):
+    old = {(r["stage"], r["pages"]): r["median_ms"] for r in previous["results"]}
+    print(f"\nvs {previous['meta']['commit']}:")
+    print(f"{'stage':>14} {'pages':>6} {'old ms':>10} {'new ms':>10} {'change':>8}")
+    for r in current["results"]:
+        before = old.get((r["stage"], r["pages"]))
+        if before:
+            change = (r["median_ms"] - before) / before * 100
+            print(f"{r['stage']:>14} {r['pages']:>6} {before:>10} {r['median_ms']:>10} {change:>+7.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the PDF-to-code pipeline")
+    parser.add_argument("--pages", type=int, nargs="+", default=[5, 20, 60])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--heading-mode", default="layout", choices=("nlp", "layout", "auto"))
+    parser.add_argument("--llm-latency-ms", type=int, default=0, help="simulated latency per stub LLM call")
+    parser.add_argument("--skip-flow", action="store_true", help="only benchmark extraction and SummaryTool")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/pipeline-<commit>.json)")
+    parser.add_argument("--compare", help="earlier result file to print median changes against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="qcfs-bench-") as scratch_dir:
+        # Nothing is read from or written to the user's workdir
+        use_scratch_workdir(os.path.join(scratch_dir, "workdir"))
+        from core.config import settings
+
+        # Measure the work itself: no cached sections, answers or stage
+        # artifacts, and no real model
+        settings.llm_backend = "stub"
+        settings.stub_llm_latency_ms = args.llm_latency_ms
+        settings.section_cache_enabled = False
+        settings.llm_cache_enabled = False
+        settings.artifact_store_enabled = False
+
+        corpus_dir = os.path.join(scratch_dir, "corpus")
+        os.makedirs(corpus_dir)
+        corpus = build_corpus(corpus_dir, args.pages)
+        results = run(corpus, args.repeat, args.heading_mode, args.skip_flow)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "heading_mode": args.heading_mode,
+            "llm_latency_ms": args.llm_latency_ms,
+            "pdf_extract_workers": settings.pdf_extract_workers,
+        },
+        "results": results,
+    }
+
+    print(f"{'stage':>14} {'pages':>6} {'median ms':>10} {'p95 ms':>10}")
+    for r in results:
+        print(f"{r['stage']:>14} {r['pages']:>6} {r['median_ms']:>10} {r['p95_ms']:>10}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{report['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# benchmarks/bench_section_engine.py
+#
+# Micro-benchmark of the single-pass SectionEngine against the previous
+# multi-pass TextPreprocessor / SectionSplitter on synthetic papers.
+#
+#   cd backend && python -m benchmarks.bench_section_engine --pages 20 60 120
+
+import argparse
+import random
+import re
+import time
+from typing import Any, Dict, List
+
+from tools.section_engine import SectionEngine
+
+
+# ------------------------------------------------------------------------------
+# Previous implementation, kept verbatim as the baseline
+# ------------------------------------------------------------------------------
+
+class LegacyTextPreprocessor:
+    def __init__(self):
+        self.url_pattern = re.compile(r'https?://\S+')
+        self.phrase_pattern = re.compile(r'Electronic copy available at: .*', re.IGNORECASE)
+        self.number_pattern = re.compile(r'^\d+\s*$', re.MULTILINE)
+        self.multinew_pattern = re.compile(r'\n+')
+        self.header_footer_pattern = re.compile(r'^\s*(Author|Title|Abstract)\s*$', re.MULTILINE | re.IGNORECASE)
+
+    def preprocess_text(self, text: str) -> str:
+        text = self.url_pattern.sub('', text)
+        text = self.phrase_pattern.sub('', text)
+        text = self.number_pattern.sub('', text)
+        text = self.multinew_pattern.sub('\n', text)
+        text = self.header_footer_pattern.sub('', text)
+        return text.strip()
+
+
+class LegacySectionSplitter:
+    def split_into_sections(self, text: str, headings: List[str]) -> List[Dict[str, Any]]:
+        sections = []
+        current_section = {"heading": "Preamble", "text": "", "position": 0}
+        lines = text.split('\n')
+        position = 1
+
+        for line in lines:
+            line = line.strip()
+            if line in headings:
+                sections.append(current_section)
+                current_section = {"heading": line, "text": "", "position": position}
+                position += 1
+            else:
+                current_section["text"] += line + " "
+
+        sections.append(current_section)
+        return sections
+
+
+# ------------------------------------------------------------------------------
+# Synthetic paper generator
+# ------------------------------------------------------------------------------
+
+WORDS = (
+    "momentum volatility portfolio return signal factor risk premium asset "
+    "trading strategy market index equity bond spread liquidity regression "
+    "the of and in to we that is for with on by this are as an"
+).split()
+
+
+def synthetic_paper(pages: int, seed: int = 7):
+    """Return (raw_text, headings) shaped like pdfplumber output of a paper."""
+    rng = random.Random(seed)
+    lines, headings = ["Title", "Author"], []
+    for page in range(pages):
+        if page % 2 == 0:
+            heading = f"{page // 2 + 1} " + " ".join(w.capitalize() for w in rng.sample(WORDS[:20], 3))
+            headings.append(heading)
+            lines.append(heading)
+        for _ in range(45):
+            line = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14)))
+            if rng.random() < 0.02:
+                line += " https://ssrn.com/abstract=" + str(rng.randint(10 ** 6, 10 ** 7))
+            lines.append(line)
+            if rng.random() < 0.05:
+                lines.append("")
+        lines.append("Electronic copy available at: https://ssrn.com/abstract=123456")
+        lines.append(str(page + 1))
+    return "\n".join(lines) + "\n", headings
+
+
+# ------------------------------------------------------------------------------
+# Runner
+# ------------------------------------------------------------------------------
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(pages: int, repeat: int) -> Dict[str, Any]:
+    raw, headings = synthetic_paper(pages)
+    legacy_pre, legacy_split = LegacyTextPreprocessor(), LegacySectionSplitter()
+    engine = SectionEngine()
+
+    def legacy():
+        clean = legacy_pre.preprocess_text(raw)
+        return [s["text"].strip() for s in legacy_split.split_into_sections(clean, headings)]
+
+    def single_pass():
+        clean = engine.clean(raw)
+        return [s.text for s in engine.split(clean, headings)]
+
+    # Same sections, modulo the whitespace runs left behind by blank lines
+    squash = lambda texts: [" ".join(t.split()) for t in texts if t.strip()]
+    if squash(legacy()) != squash(single_pass()):
+        raise AssertionError(f"Section bodies differ for a {pages}-page paper")
+
+    legacy_s, engine_s = _best_of(legacy, repeat), _best_of(single_pass, repeat)
+    return {
+        "pages": pages,
+        "chars": len(raw),
+        "legacy_ms": round(legacy_s * 1000, 2),
+        "engine_ms": round(engine_s * 1000, 2),
+        "speedup": round(legacy_s / engine_s, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SectionEngine against the legacy cleaner/splitter")
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 60, 120])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'chars':>10} {'legacy ms':>10} {'engine ms':>10} {'speedup':>8}")
+    for pages in args.pages:
+        r = run(pages, args.repeat)
+        print(f"{r['pages']:>6} {r['chars']:>10} {r['legacy_ms']:>10} {r['engine_ms']:>10} {r['speedup']:>7}x")
+
+
+if __name__ == "__main__":
+    main()
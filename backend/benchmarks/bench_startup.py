@@ -0,0 +1,127 @@
+# benchmarks/bench_startup.py
+#
+# Measures how long `import main` takes in a fresh interpreter and which
+# imports it spends that time on, using `python -X importtime`.
+#
+#   cd backend && python -m benchmarks.bench_startup --runs 5 --top 25
+#   cd backend && python -m benchmarks.bench_startup --module flows.code
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    # Settings refuse to load without a key; the import path never uses it
+    env.setdefault("OPENAI_API_KEY", "startup-benchmark")
+    return env
+
+
+def wall_time(module: str, runs: int) -> List[float]:
+    """Seconds taken by `python -c 'import <module>'`, interpreter start-up included."""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", f"import {module}"],
+            cwd=BACKEND_DIR, env=_env(), check=True, capture_output=True,
+        )
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def import_profile(module: str) -> List[Dict[str, Any]]:
+    """Parse the -X importtime report into one record per imported module."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=_env(), check=True, capture_output=True, text=True,
+    )
+    records = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        records.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip())) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return records
+
+
+def by_package(records: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Self time summed per top-level package, e.g. everything under crewai.* as 'crewai'."""
+    totals = defaultdict(float)
+    for record in records:
+        totals[record["module"].split(".")[0]] += record["self_ms"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def direct_imports(records: List[Dict[str, Any]], module: str) -> List[Dict[str, Any]]:
+    """
+    Modules imported directly by `module`. The report lists children before
+    their parent, so they are the depth-1 records between the previous
+    top-level import and `module` itself.
+    """
+    ends = [i for i, r in enumerate(records) if r["depth"] == 0 and r["module"] == module]
+    children = []
+    for record in reversed(records[:ends[-1]] if ends else []):
+        if record["depth"] == 0:
+            break
+        if record["depth"] == 1:
+            children.append(record)
+    return children
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Break down the import cost of the backend")
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=20, help="rows per table")
+    parser.add_argument("--output", help="also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    timings = wall_time(args.module, args.runs)
+    records = import_profile(args.module)
+    packages = by_package(records)
+    direct = direct_imports(records, args.module)
+    slowest = sorted(records, key=lambda r: r["self_ms"], reverse=True)
+
+    print(f"import {args.module}: median {statistics.median(timings):.2f}s over {args.runs} run(s)\n")
+    print(f"{'package':<32} {'self ms':>10}")
+    for name, ms in list(packages.items())[:args.top]:
+        print(f"{name:<32} {ms:>10.1f}")
+    print(f"\n{'imported by ' + args.module:<48} {'cumulative ms':>14}")
+    for r in sorted(direct, key=lambda r: r["cumulative_ms"], reverse=True)[:args.top]:
+        print(f"{r['module']:<48} {r['cumulative_ms']:>14.1f}")
+    print(f"\n{'slowest modules':<48} {'self ms':>14}")
+    for r in slowest[:args.top]:
+        print(f"{r['module']:<48} {r['self_ms']:>14.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "module": args.module,
+                    "wall_seconds": timings,
+                    "packages_ms": packages,
+                    "modules": records,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nSaved {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# core/artifact_store.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import settings
+from core.metrics import record_cache
+
+logger = logging.getLogger("artifact_store")
+
+ARTIFACT_DIR = os.path.join(settings.USER_WORKDIR, "artifacts")
+DB_PATH = os.path.join(ARTIFACT_DIR, "artifacts.db")
+
+
+def artifact_digest(payload: Any) -> str:
+    """sha256 of the canonical JSON form of a stage output."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def make_artifact_key(stage: str, inputs: Dict[str, str], config: Dict[str, Any]) -> str:
+    """
+    Key of one stage run: the digests of everything the stage reads plus the
+    config that shapes its output (model, prompts, limits). A change upstream
+    changes the input digests, so only the stages below it miss.
+    """
+    payload = json.dumps({"stage": stage, "inputs": inputs, "config": config}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of CodingFlow stage outputs, in SQLite.
+
+    Each output is stored once as a blob named by its digest. Stage keys
+    map onto blobs, so reruns that produce the same output share the blob.
+    Once the blobs exceed `max_bytes`, the least recently used stage keys
+    are dropped together with the blobs nothing else refers to.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_bytes: Optional[int] = None):
+        self.db_path = db_path
+        self.max_bytes = max_bytes if max_bytes is not None else settings.artifact_store_max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    digest TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS stages (
+                    key TEXT PRIMARY KEY,
+                    stage TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_stages_access ON stages (last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_stages_digest ON stages (digest)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def get(self, key: str) -> Optional[Tuple[str, Any]]:
+        """Return (digest, payload) of the output stored for a stage key."""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT blobs.digest, blobs.payload FROM stages JOIN blobs ON blobs.digest = stages.digest "
+                "WHERE stages.key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                record_cache("artifacts", "miss")
+                return None
+            conn.execute("UPDATE stages SET last_access = ? WHERE key = ?", (time.time(), key))
+        record_cache("artifacts", "hit")
+        return row[0], json.loads(row[1])
+
+    def put(self, key: str, stage: str, payload: Any) -> str:
+        """Store a stage output under its digest, point `key` at it and return the digest."""
+        digest = artifact_digest(payload)
+        encoded = json.dumps(payload, default=str)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?)",
+                (digest, encoded, len(encoded.encode("utf-8")), now),
+            )
+            conn.execute("INSERT OR REPLACE INTO stages VALUES (?, ?, ?, ?, ?)", (key, stage, digest, now, now))
+            self._evict(conn)
+        return digest
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, digest in conn.execute("SELECT key, digest FROM stages ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM stages WHERE key = ?", (key,))
+            evicted += 1
+            if conn.execute("SELECT 1 FROM stages WHERE digest = ? LIMIT 1", (digest,)).fetchone() is None:
+                size = conn.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                total -= size[0] if size else 0
+        logger.info(f"[ArtifactStore] Evicted {evicted} stage entries, {total} bytes remain")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock, self._connect() as conn:
+            blobs, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+            stages = dict(conn.execute("SELECT stage, COUNT(*) FROM stages GROUP BY stage").fetchall())
+        return {"blobs": blobs, "size_bytes": size, "max_bytes": self.max_bytes, "stages": stages, "path": self.db_path}
+
+    def purge(self) -> int:
+        with self._lock, self._connect() as conn:
+            removed = conn.execute("DELETE FROM stages").rowcount
+            conn.execute("DELETE FROM blobs")
+        return removed
+
+
+_artifact_store: Optional[ArtifactStore] = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the process-wide artifact store, creating it on first use."""
+    global _artifact_store
+    with _artifact_store_lock:
+        if _artifact_store is None:
+            _artifact_store = ArtifactStore()
+        return _artifact_store
@@ -0,0 +1,147 @@
+# core/backtest_jobs.py
+
+import asyncio
+import logging
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from shutil import which
+from typing import Any, Dict, List, Tuple
+
+from core.config import settings
+from core.job_logs import JobLogs
+from core.jobs import CANCELLED, DONE, FAILED, JobQueue
+
+logger = logging.getLogger("backtests")
+
+OUTPUT_TAIL_LINES = 200
+STATISTIC_PATTERN = re.compile(r"STATISTICS::\s*(?P<name>.+?)\s+(?P<value>\S+)\s*$")
+# Time Lean gets to shut down (and stop its container) after SIGTERM before it is killed
+TERMINATE_GRACE_SECONDS = 10
+
+# Live Lean output per job: USER_WORKDIR/backtests/<job_id>.log and /ws/backtests/{job_id}
+backtest_logs = JobLogs(
+    os.path.join(settings.USER_WORKDIR, "backtests"),
+    replay_lines=settings.backtest_stream_replay_lines,
+    client_queue=settings.backtest_stream_client_queue,
+    max_bytes=settings.backtest_log_max_mb * 1024 * 1024,
+    backups=settings.backtest_log_backups,
+    write_queue=settings.backtest_log_write_queue,
+)
+
+
+def lean_command(script: str) -> Tuple[List[str], Dict[str, str]]:
+    """`lean backtest <script>` with the lean CLI from the venv or PATH, and an env that sees the venv first."""
+    venv_bin = os.path.dirname(sys.executable)
+    lean_cli = which("lean") or os.path.join(venv_bin, "lean")
+    if not os.path.isfile(lean_cli):
+        lean_cli = os.path.join(venv_bin, "lean")
+
+    env = os.environ.copy()
+    env["PATH"] = venv_bin + os.pathsep + env.get("PATH", "")
+    return [lean_cli, "backtest", script], env
+
+
+def parse_statistics(lines) -> Dict[str, str]:
+    """Pick the `STATISTICS:: <name>   <value>` lines Lean logs at the end of a backtest."""
+    statistics = {}
+    for line in lines:
+        match = STATISTIC_PATTERN.search(line)
+        if match:
+            statistics[match.group("name")] = match.group("value")
+    return statistics
+
+
+def _signal(proc: asyncio.subprocess.Process, sig: int):
+    """Signal Lean's whole process group, so the tools it started stop with it."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, sig)
+        else:
+            proc.send_signal(sig)
+    except ProcessLookupError:
+        pass
+
+
+async def _stop(proc: asyncio.subprocess.Process):
+    if proc.returncode is not None:
+        return
+    _signal(proc, signal.SIGTERM)
+    try:
+        await asyncio.wait_for(proc.wait(), TERMINATE_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        _signal(proc, signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+        await proc.wait()
+
+
+async def _run_backtest_job(job_id: str, params: Dict[str, Any], cancel: threading.Event) -> Dict[str, Any]:
+    """
+    Run Lean as an asyncio subprocess, so a backtest holds a queue slot but no
+    thread. Output is streamed line by line to the job's log channel as Lean
+    prints it; only a tail is kept in memory. Cancellation and the timeout
+    stop the process.
+    """
+    cmd, env = lean_command(params["script"])
+    logger.info(f"[BACKTESTS] Job {job_id}: {' '.join(cmd)}")
+    channel = backtest_logs.open(job_id)
+    channel.publish(f"$ {' '.join(cmd)}")
+    started = time.perf_counter()
+    tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    statistics: Dict[str, str] = {}
+    status = FAILED
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, env=env,
+            limit=1 << 20,  # Lean prints long JSON lines; the default 64 KiB line limit is too small
+            start_new_session=os.name == "posix",
+        )
+
+        async def read_output():
+            async for raw in proc.stdout:
+                line = raw.decode("utf-8", errors="replace").rstrip()
+                tail.append(line)
+                statistics.update(parse_statistics([line]))
+                channel.publish(line)
+            await proc.wait()
+
+        try:
+            await asyncio.wait_for(read_output(), settings.backtest_timeout_seconds)
+        except asyncio.TimeoutError:
+            await _stop(proc)
+            channel.publish(f"[stopped after {settings.backtest_timeout_seconds}s]")
+            raise TimeoutError(f"Backtest of {params['file']} exceeded {settings.backtest_timeout_seconds}s")
+        except asyncio.CancelledError:
+            await _stop(proc)
+            channel.publish("[cancelled]")
+            raise
+
+        duration = time.perf_counter() - started
+        channel.publish(f"[Lean exited with code {proc.returncode} after {duration:.0f}s]")
+        if proc.returncode != 0:
+            last_lines = "\n".join(list(tail)[-20:])
+            raise RuntimeError(f"Lean exited with code {proc.returncode}:\n{last_lines}")
+        status = DONE
+    except asyncio.CancelledError:
+        status = CANCELLED
+        raise
+    finally:
+        backtest_logs.close(job_id, status)
+
+    logger.info(f"[BACKTESTS] Job {job_id}: {params['file']} finished in {duration:.0f}s")
+    return {
+        "file": params["file"],
+        "returncode": proc.returncode,
+        "duration_seconds": round(duration, 1),
+        "statistics": statistics,
+        "output_tail": list(tail),
+        "log_file": channel.path,
+    }
+
+
+# Lean runs are heavy (a container per backtest); at most backtest_max_concurrent
+# run at once and the rest wait here, persisted in the job table
+backtest_jobs = JobQueue("backtest", _run_backtest_job, settings.backtest_max_concurrent, interruptible=True)
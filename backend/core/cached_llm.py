@@ -0,0 +1,119 @@
+# core/cached_llm.py
+
+import logging
+import sqlite3
+from typing import Iterator
+
+import litellm
+from crewai import LLM
+
+from core.config import settings
+from core.llm_cache import cache_bypassed, get_llm_cache, normalise_messages
+from core.metrics import record_llm_call
+from utils.tokens import count_tokens
+
+logger = logging.getLogger("llm_cache")
+
+
+class CachedLLM(LLM):
+    """
+    crewai LLM that answers repeated prompts from the response cache.
+
+    Calls that hand the model executable functions are never cached, since
+    replaying them would skip the function side effects.
+    """
+
+    def call(self, messages, *args, **kwargs):
+        cache = get_llm_cache()
+        if not settings.llm_cache_enabled or cache_bypassed() or kwargs.get("available_functions"):
+            cache.record_bypass()
+            response = super().call(messages, *args, **kwargs)
+            self._record(messages, response, "bypass")
+            return response
+
+        tools = kwargs.get("tools", args[0] if args else None)
+        key = cache.make_key(self.model, self.temperature, messages, tools)
+        try:
+            cached = cache.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"[LLMCache] Lookup failed, calling model: {e}")
+            cached = None
+        if cached is not None:
+            logger.info(f"[LLMCache] Hit for {self.model} ({key[:12]})")
+            record_llm_call(self.model, 0, 0, "hit")
+            return cached
+
+        response = super().call(messages, *args, **kwargs)
+        self._record(messages, response, "miss")
+        if isinstance(response, str) and response:
+            try:
+                cache.put(key, self.model, response)
+            except sqlite3.Error as e:
+                logger.warning(f"[LLMCache] Could not store response: {e}")
+        return response
+
+    def stream(self, messages, **params) -> Iterator[str]:
+        """
+        Yield the completion text chunk by chunk as the model produces it.
+        A cached response is yielded in one piece; a fully received stream is
+        cached, one abandoned by the consumer is not.
+        """
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        temperature = params.pop("temperature", self.temperature)
+
+        cache = get_llm_cache()
+        key = None
+        if settings.llm_cache_enabled and not cache_bypassed():
+            key = cache.make_key(self.model, temperature, messages, params or None)
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info(f"[LLMCache] Hit for {self.model} ({key[:12]}), streaming cached response")
+                record_llm_call(self.model, 0, 0, "hit")
+                yield cached
+                return
+        else:
+            cache.record_bypass()
+
+        response = litellm.completion(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            api_key=self.api_key,
+            base_url=self.base_url,
+            stream=True,
+            **params,
+        )
+        parts = []
+        try:
+            for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        finally:
+            _close_stream(response)
+            self._record(messages, "".join(parts), "miss" if key is not None else "bypass")
+
+        if key is not None and parts:
+            cache.put(key, self.model, "".join(parts))
+
+    def _record(self, messages, response, cache: str):
+        """Count prompt and completion tokens locally and report them for the current stage."""
+        prompt_tokens = sum(
+            count_tokens(m["content"]) for m in normalise_messages(messages) if isinstance(m["content"], str)
+        )
+        completion_tokens = count_tokens(response) if isinstance(response, str) else 0
+        record_llm_call(self.model, prompt_tokens, completion_tokens, cache)
+
+
+def _close_stream(response):
+    """Release the HTTP connection of a stream the consumer stopped reading early."""
+    for obj in (getattr(response, "completion_stream", None), response):
+        close = getattr(obj, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception:
+                pass
+            return
@@ -16,6 +16,99 @@ class Settings(BaseSettings):
     # Local dev mode toggle
     local_mode: bool = True
 
+    # Load spaCy, crewai and the agents in a background task at startup instead
+    # of on the first request (turn off to keep --reload cycles light)
+    warm_up_on_startup: bool = True
+
+    # PDF extraction: worker processes for page-parallel text extraction
+    # (1 disables the pool) and the page count below which the serial path is used
+    pdf_extract_workers: int = min(4, os.cpu_count() or 1)
+    pdf_parallel_min_pages: int = 12
+
+    # Heading detection: "nlp" (regex + spaCy), "layout" (font metadata) or "auto"
+    # (layout, falling back to nlp when fewer than layout_min_headings are found)
+    heading_mode: str = "nlp"
+    layout_min_headings: int = 3
+
+    # spaCy pipeline used for heading detection
+    spacy_model: str = "en_core_web_sm"
+    # Long documents are parsed in paragraph-aligned chunks streamed through nlp.pipe
+    heading_nlp_chunk_chars: int = 50_000
+    heading_nlp_batch_size: int = 4
+    heading_nlp_n_process: int = 1
+
+    # On-disk cache of extracted sections, keyed by PDF content hash
+    section_cache_enabled: bool = True
+    section_cache_max_mb: int = 256
+
+    # LLM response cache (keyed by model, temperature and normalised messages)
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+    llm_cache_max_entries: int = 5000
+
+    # Chat model backend: "openai" (litellm) or "stub" (deterministic local answers
+    # for offline benchmarks), with an optional simulated latency per stub call
+    llm_backend: str = "openai"
+    stub_llm_latency_ms: int = 0
+
+    # Content-addressed store of CodingFlow stage outputs (summary, code), so a rerun
+    # only recomputes the stages downstream of what changed; sections are in the section cache
+    artifact_store_enabled: bool = True
+    artifact_store_max_mb: int = 512
+
+    # Max tokens of section text handed to the summary stage (0 = no limit)
+    summary_token_budget: int = 6000
+
+    # CodingFlow extraction stage: "direct" (Python, no LLM call) or "agent" (crew task)
+    flow_extraction_mode: str = "direct"
+    # Validate generated code with the QuantConnect static analyser (tools/qc_analyser),
+    # not just a syntax check; its error findings drive refinement
+    code_static_analysis: bool = True
+    # Refinement LLM calls allowed when local validation of the generated code fails
+    flow_max_refine_attempts: int = 2
+
+    # Speculative code generation: candidates streamed at once from the same summary,
+    # first one passing validation wins (1 disables). Each candidate is capped at
+    # flow_candidate_max_tokens and all of them together at flow_candidates_token_budget
+    flow_code_candidates: int = 1
+    flow_candidate_max_tokens: int = 4000
+    flow_candidates_token_budget: int = 12000
+
+    # Lean stub sandbox (tools/lean_sandbox): synthetic daily bars fed to an algorithm,
+    # and the wall-clock, CPU and address-space limits of its subprocess
+    sandbox_bars: int = 252
+    sandbox_timeout_seconds: int = 20
+    sandbox_cpu_seconds: int = 10
+    sandbox_memory_mb: int = 1024
+    # Smoke-test algorithms in the sandbox before handing them to Lean
+    sandbox_gate_backtests: bool = True
+
+    # Lean backtests (core/backtest_jobs): runs at once, the rest queue, and the
+    # time after which a run is stopped
+    backtest_max_concurrent: int = 1
+    backtest_timeout_seconds: int = 3600
+    # Live Lean output: rotating per-job log under USER_WORKDIR/backtests (written by a
+    # thread, with lines dropped past backtest_log_write_queue pending), lines replayed
+    # to clients that connect late, and lines queued per client before dropping the oldest
+    backtest_log_max_mb: int = 20
+    backtest_log_backups: int = 2
+    backtest_log_write_queue: int = 10000
+    backtest_stream_replay_lines: int = 1000
+    backtest_stream_client_queue: int = 1000
+
+    # Bulk validation of code folders (tools/bulk_validator): worker processes, and
+    # the cache of results keyed by file content hash so unchanged files are skipped
+    bulk_validation_workers: int = min(4, os.cpu_count() or 1)
+    validation_cache_enabled: bool = True
+    validation_cache_max_entries: int = 20000
+
+    # Max CodingFlow runs at once across jobs, /coder/process and batches; the rest queue
+    max_concurrent_flows: int = 2
+
+    # Batch ingestion: documents extracted at once, and documents in the LLM stages at once
+    batch_extract_concurrency: int = 2
+    batch_llm_concurrency: int = 2
+
     USER_WORKDIR: str = os.getenv(
         "USER_WORKDIR",
         os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "user_workdir"))
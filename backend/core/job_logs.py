@@ -0,0 +1,188 @@
+# core/job_logs.py
+
+import asyncio
+import logging
+import os
+import queue
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import AsyncIterator, Dict, List, Optional, Set
+
+logger = logging.getLogger("job_logs")
+
+# How long a finished job's channel stays around for clients that connect right after it ends
+CLOSED_CHANNEL_TTL_SECONDS = 60
+
+
+class _Subscriber:
+    """One client's bounded queue; when it falls behind, the oldest lines are dropped."""
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def push(self, line: Optional[str]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(line)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Hands records to the writer thread; when its queue is full, lines are counted and dropped."""
+
+    def __init__(self, records: queue.Queue):
+        super().__init__(records)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.dropped:
+            try:
+                self.queue.put_nowait(self.prepare(logging.makeLogRecord(
+                    {"msg": f"[{self.dropped} lines not written: disk too slow]", "levelno": logging.WARNING}
+                )))
+                self.dropped = 0
+            except queue.Full:
+                pass
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _FileWriter(QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # from stop(), off the event loop: may wait for room
+
+
+class JobLogChannel:
+    """
+    Output of one running job: every line goes to a rotating file on disk, a
+    ring buffer replayed to clients that join late, and the queue of each
+    live subscriber. Publishing never blocks, so a slow client cannot stall
+    the job, and neither can the disk: the file is written by a thread that
+    drains a bounded queue. Use from the event loop thread only.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        path: str,
+        replay_lines: int,
+        client_queue: int,
+        max_bytes: int,
+        backups: int,
+        write_queue: int = 10_000,
+    ):
+        self.job_id = job_id
+        self.path = path
+        self.client_queue = client_queue
+        self.closed = False
+        self.status: Optional[str] = None
+        self._buffer: deque = deque(maxlen=replay_lines)
+        self._subscribers: Set[_Subscriber] = set()
+        self._file = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        self._file.setFormatter(logging.Formatter("%(asctime)s %(message)s", "%Y-%m-%d %H:%M:%S"))
+        self._records = _DroppingQueueHandler(queue.Queue(maxsize=write_queue))
+        self._writer = _FileWriter(self._records.queue, self._file)
+        self._writer.start()
+
+    def publish(self, line: str):
+        if self.closed:
+            return
+        self._buffer.append(line)
+        self._records.handle(logging.makeLogRecord({"msg": line, "levelno": logging.INFO, "levelname": "INFO"}))
+        for subscriber in self._subscribers:
+            subscriber.push(line)
+
+    def close(self, status: str):
+        """End the stream: subscribers get the remaining lines, then stop."""
+        if self.closed:
+            return
+        self.closed = True
+        self.status = status
+        for subscriber in self._subscribers:
+            subscriber.push(None)
+        # The writer drains what is queued and the file is closed off the event loop
+        asyncio.get_running_loop().run_in_executor(None, self._stop_writer)
+
+    def _stop_writer(self):
+        self._writer.stop()
+        self._file.close()
+
+    async def follow(self) -> AsyncIterator[str]:
+        """Replay the buffered lines, then yield new ones until the channel closes."""
+        subscriber = _Subscriber(self.client_queue)
+        backlog, closed = list(self._buffer), self.closed
+        if not closed:
+            self._subscribers.add(subscriber)
+        try:
+            for line in backlog:
+                yield line
+            if closed:
+                return
+            while True:
+                line = await subscriber.queue.get()
+                if subscriber.dropped:
+                    yield f"[{subscriber.dropped} lines skipped: client too slow, see the job log file]"
+                    subscriber.dropped = 0
+                if line is None:
+                    return
+                yield line
+        finally:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+
+class JobLogs:
+    """
+    Registry of the log channels of one job kind, with the per-job files in `folder`.
+    """
+
+    def __init__(
+        self, folder: str, replay_lines: int, client_queue: int, max_bytes: int, backups: int, write_queue: int = 10_000
+    ):
+        self.folder = folder
+        self.replay_lines = replay_lines
+        self.client_queue = client_queue
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.write_queue = write_queue
+        self._channels: Dict[str, JobLogChannel] = {}
+
+    def log_path(self, job_id: str) -> str:
+        return os.path.join(self.folder, f"{job_id}.log")
+
+    def open(self, job_id: str) -> JobLogChannel:
+        os.makedirs(self.folder, exist_ok=True)
+        channel = JobLogChannel(
+            job_id, self.log_path(job_id), self.replay_lines, self.client_queue, self.max_bytes, self.backups,
+            self.write_queue,
+        )
+        self._channels[job_id] = channel
+        return channel
+
+    def get(self, job_id: str) -> Optional[JobLogChannel]:
+        return self._channels.get(job_id)
+
+    def close(self, job_id: str, status: str):
+        channel = self._channels.get(job_id)
+        if channel is None:
+            return
+        channel.close(status)
+        asyncio.get_running_loop().call_later(CLOSED_CHANNEL_TTL_SECONDS, self._forget, job_id, channel)
+
+    def _forget(self, job_id: str, channel: JobLogChannel):
+        if self._channels.get(job_id) is channel:
+            del self._channels[job_id]
+
+    def read_tail(self, job_id: str, lines: Optional[int] = None) -> List[str]:
+        """Last lines of a job's log file (blocking I/O: call from a worker thread)."""
+        path = self.log_path(job_id)
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return [line.rstrip("\n") for line in deque(f, maxlen=lines or self.replay_lines)]
@@ -0,0 +1,232 @@
+# core/jobs.py
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from core.config import settings
+
+logger = logging.getLogger("jobs")
+
+DB_PATH = os.path.join(settings.USER_WORKDIR, "jobs.db")
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised by job runners that notice their cancel event between steps."""
+
+
+class JobStore:
+    """
+    SQLite table of jobs of every kind, so queued and running work survives a restart.
+    """
+
+    COLUMNS = ("id", "kind", "status", "params", "result", "error", "created", "started", "finished")
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    started REAL,
+                    finished REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_kind ON jobs (kind, created)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def _row(self, row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+    def create(self, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, created) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params), time.time()),
+            )
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def list(self, kind: str, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE kind = ? ORDER BY created DESC LIMIT ?",
+                (kind, limit),
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def unfinished(self, kind: str) -> List[Dict[str, Any]]:
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE kind = ? AND status IN (?, ?) ORDER BY created",
+                (kind, QUEUED, RUNNING),
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+
+_job_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    global _job_store
+    if _job_store is None:
+        _job_store = JobStore()
+    return _job_store
+
+
+# runner(job_id, params, cancel_event) -> JSON-serialisable result
+JobRunner = Callable[[str, Dict[str, Any], threading.Event], Awaitable[Any]]
+
+
+class JobQueue:
+    """
+    Runs jobs of one kind in the background, at most `max_concurrent` at a time;
+    the rest wait in the queue. Runners get a threading.Event that is set on
+    cancellation so code running in worker threads can stop between steps.
+    Runners that only await on the event loop (e.g. a subprocess) can be
+    marked `interruptible`, so cancelling a running job cancels its task.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        runner: JobRunner,
+        max_concurrent: int,
+        store: Optional[JobStore] = None,
+        interruptible: bool = False,
+    ):
+        self.kind = kind
+        self.runner = runner
+        self.max_concurrent = max(1, max_concurrent)
+        self.interruptible = interruptible
+        self._store = store
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._running: set = set()
+
+    @property
+    def store(self) -> JobStore:
+        return self._store or get_job_store()
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one of the queue's concurrency slots, for work started outside the queue."""
+        async with self._slots:
+            yield
+
+    def submit(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a job. Call from the event loop (an async endpoint), not a worker thread."""
+        asyncio.get_running_loop()  # raises here, before a row is left queued with no task
+        job = self.store.create(self.kind, params)
+        self._schedule(job["id"], params)
+        logger.info(f"[JOBS] {self.kind} job {job['id']} queued")
+        return job
+
+    def _schedule(self, job_id: str, params: Dict[str, Any]):
+        self._cancel_events[job_id] = threading.Event()
+        task = asyncio.create_task(self._run(job_id, params))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._forget(job_id))
+
+    def _forget(self, job_id: str):
+        self._tasks.pop(job_id, None)
+        self._cancel_events.pop(job_id, None)
+        self._running.discard(job_id)
+
+    async def _run(self, job_id: str, params: Dict[str, Any]):
+        cancel = self._cancel_events[job_id]
+        try:
+            async with self._slots:
+                if cancel.is_set():
+                    raise JobCancelled()
+                self._running.add(job_id)
+                self.store.update(job_id, status=RUNNING, started=time.time())
+                logger.info(f"[JOBS] {self.kind} job {job_id} running")
+                result = await self.runner(job_id, params, cancel)
+            self.store.update(job_id, status=DONE, result=result, finished=time.time())
+            logger.info(f"[JOBS] {self.kind} job {job_id} done")
+        except JobCancelled:
+            self.store.update(job_id, status=CANCELLED, finished=time.time())
+            logger.info(f"[JOBS] {self.kind} job {job_id} cancelled")
+        except asyncio.CancelledError:
+            if cancel.is_set():
+                self.store.update(job_id, status=CANCELLED, finished=time.time())
+                logger.info(f"[JOBS] {self.kind} job {job_id} cancelled")
+                return
+            # Not cancelled by a user: the server is shutting down or reloading.
+            # Leave the job queued so resume() runs it again in the next process.
+            self.store.update(job_id, status=QUEUED, started=None)
+            logger.info(f"[JOBS] {self.kind} job {job_id} interrupted by shutdown, will resume")
+            raise
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, error=str(e), finished=time.time())
+            logger.exception(f"[JOBS] {self.kind} job {job_id} failed")
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job. Returns False when it is unknown to
+        this process or already finished.
+
+        A queued job is dropped at once. A running job only gets its cancel
+        event set: work in a worker thread cannot be interrupted, so the
+        runner stops at its next checkpoint and keeps its slot until then.
+        Running jobs of an interruptible queue are cancelled at once too.
+        """
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            return False
+        self._cancel_events[job_id].set()
+        if self.interruptible or job_id not in self._running:
+            task.cancel()
+        return True
+
+    async def resume(self):
+        """Re-queue jobs left queued or running by a previous process."""
+        jobs = self.store.unfinished(self.kind)
+        for job in jobs:
+            if job["id"] in self._tasks:
+                continue
+            self.store.update(job["id"], status=QUEUED, started=None)
+            self._schedule(job["id"], job["params"])
+        if jobs:
+            logger.info(f"[JOBS] Resumed {len(jobs)} unfinished {self.kind} job(s)")
@@ -0,0 +1,169 @@
+# core/llm_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Union
+
+from core.config import settings
+from core.metrics import record_cache
+
+logger = logging.getLogger("llm_cache")
+
+CACHE_DIR = os.path.join(settings.USER_WORKDIR, "cache")
+DB_PATH = os.path.join(CACHE_DIR, "llm_responses.db")
+
+# Set for the duration of a request that must hit the model (e.g. ?no_cache=true).
+# Context variables follow the request into asyncio.to_thread and the flow's own loop.
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def llm_cache_bypass(enabled: bool = True):
+    """Skip the response cache for every LLM call made inside this block."""
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_bypassed() -> bool:
+    """Whether the current request asked to skip cached model output."""
+    return _bypass.get()
+
+
+def normalise_messages(messages: Union[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Reduce a prompt to the parts that determine the answer, with whitespace noise removed."""
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    normalised = []
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, str):
+            content = "\n".join(line.rstrip() for line in content.replace("\r\n", "\n").strip().split("\n"))
+        normalised.append({"role": message.get("role", "user"), "content": content})
+    return normalised
+
+
+class LLMResponseCache:
+    """
+    SQLite store of model responses keyed by model, temperature and the
+    normalised message list. Entries expire after `ttl` seconds and the
+    least recently used ones are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, ttl: Optional[int] = None, max_entries: Optional[int] = None):
+        self.db_path = db_path
+        self.ttl = ttl if ttl is not None else settings.llm_cache_ttl_seconds
+        self.max_entries = max_entries if max_entries is not None else settings.llm_cache_max_entries
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    @staticmethod
+    def make_key(model: str, temperature: Optional[float], messages, tools: Any = None) -> str:
+        payload = json.dumps(
+            {
+                "model": model,
+                "temperature": temperature,
+                "messages": normalise_messages(messages),
+                "tools": tools,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                record_cache("llm", "miss")
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        record_cache("llm", "hit")
+        return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", (key, model, response, now, now))
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypassed += 1
+        record_cache("llm", "bypass")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock, self._connect() as conn:
+            count, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(response)), 0) FROM responses"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": count,
+                "size_bytes": size,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "path": self.db_path,
+            }
+
+    def purge(self) -> int:
+        with self._lock, self._connect() as conn:
+            return conn.execute("DELETE FROM responses").rowcount
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Return the process-wide response cache, creating it on first use."""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache()
+        return _llm_cache
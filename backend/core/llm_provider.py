@@ -1,29 +1,48 @@
-from pathlib import Path
-import sqlite3
-from langchain_community.chat_models import ChatOpenAI
+import threading
+from typing import Dict, Tuple
 from core.config import settings
+from core.cached_llm import CachedLLM
+from core.llm_settings import get_active_llm_setting
+from core.stub_llm import StubLLM
 
-DB_PATH = Path("core/llm_config.db")
+TEMPERATURE = 0.3
 
-def get_llm(role: str = "store") -> ChatOpenAI:
+# One client per (model, temperature), reused across flows so the underlying
+# HTTP connection pool is shared instead of rebuilt on every call
+_clients: Dict[Tuple[str, float], CachedLLM] = {}
+_clients_lock = threading.Lock()
+
+def get_llm(role: str = "store") -> CachedLLM:
     """
     Retrieve the active LLM for a given role ('manager' or 'store').
 
-    Falls back to .env MODEL_NAME if not found in DB.
+    Falls back to .env MODEL_NAME if not found in DB. The setting is read
+    from memory and refreshed after /settings/llm changes it. The returned
+    model answers repeated prompts from the response cache (see core/llm_cache).
+    With LLM_BACKEND=stub every role gets the offline StubLLM instead.
     """
     assert role in ("manager", "store"), "role must be 'manager' or 'store'"
 
+    if settings.llm_backend == "stub":
+        with _clients_lock:
+            llm = _clients.get(("stub", TEMPERATURE))
+            if llm is None:
+                llm = _clients[("stub", TEMPERATURE)] = StubLLM(model="stub", temperature=TEMPERATURE)
+        return llm
+
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute(f"SELECT {role} FROM llm_settings LIMIT 1")
-            row = cursor.fetchone()
-            model_name = row[0] if row and row[0] else settings.model_name
+        model_name = get_active_llm_setting().get(role) or settings.model_name
     except Exception:
         model_name = settings.model_name
 
-    return ChatOpenAI(
-        model=model_name,
-        api_key=settings.openai_api_key,
-        temperature=0.3
-    )
+    key = (model_name, TEMPERATURE)
+    with _clients_lock:
+        llm = _clients.get(key)
+        if llm is None:
+            llm = CachedLLM(
+                model=model_name,
+                api_key=settings.openai_api_key,
+                temperature=TEMPERATURE
+            )
+            _clients[key] = llm
+    return llm
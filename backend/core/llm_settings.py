@@ -1,13 +1,21 @@
 import sqlite3
+import threading
 from pathlib import Path
 import os
+from typing import Optional
 
 DB_PATH = Path(__file__).parent / "llm_config.db"
 DEFAULT_MANAGER = "gpt-4o"
 DEFAULT_STORE = "gpt-3.5-turbo"
 
+# In-memory copy of the active setting, dropped by set_active_llm
+_active_setting: Optional[dict] = None
+_setting_lock = threading.Lock()
+_db_ready = False
+
 # === Ensure DB and table exist, insert defaults if empty ===
 def init_llm_settings_db():
+    global _db_ready
     create_table = """
         CREATE TABLE IF NOT EXISTS llm_settings (
             manager TEXT NOT NULL,
@@ -23,29 +31,44 @@ def init_llm_settings_db():
     with sqlite3.connect(DB_PATH) as conn:
         conn.execute(create_table)
         conn.execute(insert_default, (DEFAULT_MANAGER, DEFAULT_STORE))
+    _db_ready = True
     print("✅ LLM settings DB initialized")
 
-# === Fetch current active setting ===
+# Initialised on first use rather than at import, to keep app startup cheap
+def _ensure_db():
+    if not _db_ready:
+        init_llm_settings_db()
+
+# === Fetch current active setting (served from memory after the first read) ===
 def get_active_llm_setting() -> dict:
-    with sqlite3.connect(DB_PATH) as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT manager, store FROM llm_settings LIMIT 1")
-        row = cur.fetchone()
-        if not row:
-            raise ValueError("No LLM settings found")
-        return {"manager": row[0], "store": row[1]}
+    global _active_setting
+    with _setting_lock:
+        if _active_setting is None:
+            _ensure_db()
+            with sqlite3.connect(DB_PATH) as conn:
+                cur = conn.cursor()
+                cur.execute("SELECT manager, store FROM llm_settings LIMIT 1")
+                row = cur.fetchone()
+                if not row:
+                    raise ValueError("No LLM settings found")
+                _active_setting = {"manager": row[0], "store": row[1]}
+        return dict(_active_setting)
+
+def invalidate_llm_setting():
+    global _active_setting
+    with _setting_lock:
+        _active_setting = None
 
 # === Update manager or store ===
 def set_active_llm(field: str, model_name: str):
     if field not in ("manager", "store"):
         raise ValueError("Field must be 'manager' or 'store'")
 
+    _ensure_db()
     with sqlite3.connect(DB_PATH) as conn:
         conn.execute(f"""
             UPDATE llm_settings
             SET {field} = ?
         """, (model_name,))
+    invalidate_llm_setting()
     print(f"✅ Updated {field} to {model_name}")
-
-# Run on import
-init_llm_settings_db()
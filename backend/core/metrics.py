@@ -0,0 +1,83 @@
+# core/metrics.py
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+__all__ = [
+    "CONTENT_TYPE_LATEST",
+    "generate_latest",
+    "stage_timer",
+    "current_stage",
+    "record_llm_call",
+    "record_cache",
+]
+
+TIME_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+STAGE_WALL_SECONDS = Histogram(
+    "qcfs_stage_wall_seconds", "Wall-clock time per pipeline stage", ["stage", "model"], buckets=TIME_BUCKETS
+)
+STAGE_CPU_SECONDS = Histogram(
+    "qcfs_stage_cpu_seconds", "CPU time of the calling thread per pipeline stage", ["stage", "model"],
+    buckets=TIME_BUCKETS,
+)
+STAGE_ERRORS = Counter("qcfs_stage_errors_total", "Pipeline stages that raised", ["stage", "model"])
+LLM_PROMPT_TOKENS = Histogram(
+    "qcfs_llm_prompt_tokens", "Prompt tokens per LLM call", ["stage", "model"], buckets=TOKEN_BUCKETS
+)
+LLM_COMPLETION_TOKENS = Histogram(
+    "qcfs_llm_completion_tokens", "Completion tokens per LLM call", ["stage", "model"], buckets=TOKEN_BUCKETS
+)
+LLM_CALLS = Counter("qcfs_llm_calls_total", "LLM calls by cache outcome", ["stage", "model", "cache"])
+CACHE_REQUESTS = Counter("qcfs_cache_requests_total", "Cache lookups by outcome", ["cache", "result"])
+
+# Stage the current thread/task is in, so LLM calls made deep inside crewai
+# are attributed to the flow stage that triggered them
+_current_stage: ContextVar[str] = ContextVar("metrics_stage", default="unscoped")
+
+
+def current_stage() -> str:
+    return _current_stage.get()
+
+
+class StageRecord:
+    """Mutable labels of a running stage; the model may only be known once the stage has started."""
+
+    def __init__(self, stage: str, model: str):
+        self.stage = stage
+        self.model = model
+
+
+@contextmanager
+def stage_timer(stage: str, model: Optional[str] = None):
+    """Measure wall and CPU time of a stage and scope LLM call metrics to it."""
+    record = StageRecord(stage, model or "none")
+    token = _current_stage.set(stage)
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield record
+    except BaseException:
+        STAGE_ERRORS.labels(record.stage, record.model).inc()
+        raise
+    finally:
+        _current_stage.reset(token)
+        STAGE_WALL_SECONDS.labels(record.stage, record.model).observe(time.perf_counter() - wall_start)
+        STAGE_CPU_SECONDS.labels(record.stage, record.model).observe(time.thread_time() - cpu_start)
+
+
+def record_llm_call(model: str, prompt_tokens: int, completion_tokens: int, cache: str):
+    """Record one LLM call; `cache` is 'hit', 'miss' or 'bypass'."""
+    stage = current_stage()
+    LLM_CALLS.labels(stage, model, cache).inc()
+    if cache != "hit":
+        LLM_PROMPT_TOKENS.labels(stage, model).observe(prompt_tokens)
+        LLM_COMPLETION_TOKENS.labels(stage, model).observe(completion_tokens)
+
+
+def record_cache(cache: str, result: str):
+    CACHE_REQUESTS.labels(cache, result).inc()
@@ -0,0 +1,51 @@
+# core/nlp_provider.py
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, Tuple
+
+from core.config import settings
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+
+logger = logging.getLogger("nlp_provider")
+
+# Heading detection only needs sentence boundaries, so these pipes are never run
+DISABLED_PIPES: Tuple[str, ...] = ("ner", "lemmatizer")
+
+_models: Dict[str, "Language"] = {}
+_lock = threading.Lock()
+
+
+def get_nlp(model: str = None) -> "Language":
+    """
+    Return the shared spaCy pipeline for `model`, loading it once per process.
+
+    The pipeline is only used for inference, which spaCy supports from several
+    threads at once, so concurrent flows share the same instance. spaCy itself
+    is imported here, on first use, since importing it costs seconds at startup.
+    """
+    model = model or settings.spacy_model
+    nlp = _models.get(model)
+    if nlp is not None:
+        return nlp
+
+    with _lock:
+        # Another thread may have finished loading while we waited
+        nlp = _models.get(model)
+        if nlp is None:
+            import spacy
+
+            logger.info(f"[NLP] Loading spaCy model '{model}' (disabled: {', '.join(DISABLED_PIPES)})")
+            nlp = spacy.load(model, exclude=list(DISABLED_PIPES))
+            _models[model] = nlp
+    return nlp
+
+
+def preload_nlp(model: str = None):
+    """Warm the registry, e.g. from the FastAPI lifespan, so the first request doesn't pay for loading."""
+    try:
+        get_nlp(model)
+    except Exception as e:
+        logger.error(f"[NLP] Could not preload spaCy model: {e}")
@@ -0,0 +1,137 @@
+# core/section_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from core.config import settings
+from core.metrics import record_cache
+
+logger = logging.getLogger("section_cache")
+
+CACHE_DIR = os.path.join(settings.USER_WORKDIR, "cache")
+DB_PATH = os.path.join(CACHE_DIR, "sections.db")
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hash a file in chunks so large PDFs are never fully loaded in memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(content_hash: str, version: str, config: Dict[str, Any]) -> str:
+    """Combine the PDF content hash with the extractor version and its output-affecting config."""
+    payload = json.dumps({"sha256": content_hash, "version": version, "config": config}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SectionCache:
+    """
+    Persistent cache of PDFAnalyserTool section lists, stored in SQLite.
+    Entries are evicted least-recently-used first once the total payload size
+    exceeds `max_bytes`.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_bytes: Optional[int] = None):
+        self.db_path = db_path
+        self.max_bytes = max_bytes if max_bytes is not None else settings.section_cache_max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sections (
+                    key TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_sections_access ON sections (last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT payload FROM sections WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                record_cache("sections", "miss")
+                return None
+            conn.execute("UPDATE sections SET last_access = ? WHERE key = ?", (time.time(), key))
+        record_cache("sections", "hit")
+        return json.loads(row[0])
+
+    def put(self, key: str, content_hash: str, version: str, sections: List[Dict[str, Any]]):
+        payload = json.dumps(sections)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.warning(f"[SectionCache] Entry of {size} bytes exceeds cache size, not stored")
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sections VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, content_hash, version, payload, size, now, now),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM sections").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in conn.execute("SELECT key, size FROM sections ORDER BY last_access ASC").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM sections WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.info(f"[SectionCache] Evicted {evicted} entries, {total} bytes remain")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock, self._connect() as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM sections").fetchone()
+        return {"entries": count, "size_bytes": total, "max_bytes": self.max_bytes, "path": self.db_path}
+
+    def entries(self) -> List[Dict[str, Any]]:
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, content_hash, version, size, created, last_access "
+                "FROM sections ORDER BY last_access DESC"
+            ).fetchall()
+        keys = ("key", "content_hash", "version", "size", "created", "last_access")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def delete(self, key: str) -> bool:
+        with self._lock, self._connect() as conn:
+            return conn.execute("DELETE FROM sections WHERE key = ?", (key,)).rowcount > 0
+
+    def purge(self) -> int:
+        with self._lock, self._connect() as conn:
+            return conn.execute("DELETE FROM sections").rowcount
+
+
+_section_cache: Optional[SectionCache] = None
+_section_cache_lock = threading.Lock()
+
+
+def get_section_cache() -> SectionCache:
+    """Return the process-wide section cache, creating it on first use."""
+    global _section_cache
+    with _section_cache_lock:
+        if _section_cache is None:
+            _section_cache = SectionCache()
+        return _section_cache
@@ -0,0 +1,94 @@
+# core/stub_llm.py
+
+import hashlib
+import json
+import re
+import time
+from typing import Iterator
+
+from core.config import settings
+from core.cached_llm import CachedLLM
+from core.llm_cache import normalise_messages
+
+CODE_PROMPT_PATTERN = re.compile(r"GeneratedCode|QuantConnect Python (?:code|algorithm)")
+FILENAME_PATTERN = re.compile(r"Filename should be: (\S+\.py)")
+
+STUB_ALGORITHM = '''from AlgorithmImports import *
+
+
+class StubMomentumAlgorithm(QCAlgorithm):
+    """Deterministic placeholder produced by the stub LLM ({digest})."""
+
+    def Initialize(self):
+        self.SetStartDate(2020, 1, 1)
+        self.SetEndDate(2021, 1, 1)
+        self.SetCash(100000)
+        self.symbol = self.AddEquity("SPY", Resolution.Daily).Symbol
+        self.momentum = self.MOMP(self.symbol, {period}, Resolution.Daily)
+        self.SetWarmUp({period})
+
+    def OnData(self, data):
+        if self.IsWarmingUp or not self.momentum.IsReady:
+            return
+        if self.momentum.Current.Value > 0 and not self.Portfolio.Invested:
+            self.SetHoldings(self.symbol, 1.0)
+        elif self.momentum.Current.Value < 0 and self.Portfolio.Invested:
+            self.Liquidate(self.symbol)
+'''
+
+
+class StubLLM(CachedLLM):
+    """
+    Offline stand-in for the chat model, selected with LLM_BACKEND=stub.
+
+    Answers are derived from a hash of the prompt, so the same prompt always
+    gets the same answer. Code prompts get a small valid QuantConnect
+    algorithm as GeneratedCode JSON, and every other prompt gets a
+    SummaryResponse JSON. Answers use the ReAct "Final Answer:" format so
+    agents with tools accept them without calling a tool. Nothing leaves the
+    process and the response cache is never used, but calls are still
+    reported to the stage metrics.
+    """
+
+    def call(self, messages, *args, **kwargs):
+        response = "Thought: I now know the final answer\nFinal Answer: " + self._answer(messages)
+        self._simulate_latency()
+        self._record(messages, response, "bypass")
+        return response
+
+    def stream(self, messages, **params) -> Iterator[str]:
+        payload = json.loads(self._answer(messages))
+        text = f"```python\n{payload['code']}```" if "code" in payload else payload["summary"]
+        self._simulate_latency()
+        parts = []
+        try:
+            for chunk in re.findall(r"\S*\s*", text):
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+        finally:
+            self._record(messages, "".join(parts), "bypass")
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def _answer(self, messages) -> str:
+        prompt = "\n".join(
+            m["content"] for m in normalise_messages(messages) if isinstance(m["content"], str)
+        )
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        if CODE_PROMPT_PATTERN.search(prompt):
+            match = FILENAME_PATTERN.search(prompt)
+            code = STUB_ALGORITHM.format(digest=digest[:12], period=10 + int(digest[:2], 16) % 50)
+            return json.dumps({"code": code, "filename": match.group(1) if match else None})
+        words = re.findall(r"[A-Za-z]{4,}", prompt)
+        start = int(digest[:8], 16) % max(1, len(words))
+        summary = " ".join(words[start:start + 120]) or "No content."
+        return json.dumps({"filename": "stub", "summary": summary})
+
+    def _simulate_latency(self):
+        if settings.stub_llm_latency_ms > 0:
+            time.sleep(settings.stub_llm_latency_ms / 1000)
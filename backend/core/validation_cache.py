@@ -0,0 +1,103 @@
+# core/validation_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from core.config import settings
+from core.metrics import record_cache
+
+logger = logging.getLogger("validation_cache")
+
+CACHE_DIR = os.path.join(settings.USER_WORKDIR, "cache")
+DB_PATH = os.path.join(CACHE_DIR, "validation.db")
+
+
+def make_validation_key(content_hash: str, config: Dict[str, Any]) -> str:
+    """Combine the code content hash with the checks that were run on it."""
+    payload = json.dumps({"sha256": content_hash, "config": config}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ValidationCache:
+    """
+    SQLite store of code validation results keyed by content hash and check
+    configuration, so bulk sweeps skip files that did not change. The least
+    recently used entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, max_entries: Optional[int] = None):
+        self.db_path = db_path
+        self.max_entries = max_entries if max_entries is not None else settings.validation_cache_max_entries
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    content_hash TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_access ON results (last_access)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT payload FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                record_cache("validation", "miss")
+                return None
+            conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+        record_cache("validation", "hit")
+        return json.loads(row[0])
+
+    def put(self, key: str, content_hash: str, result: Dict[str, Any]):
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, content_hash, json.dumps(result), now, now),
+            )
+            count = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM results WHERE key IN "
+                    "(SELECT key FROM results ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock, self._connect() as conn:
+            count, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM results"
+            ).fetchone()
+        return {"entries": count, "size_bytes": size, "max_entries": self.max_entries, "path": self.db_path}
+
+    def purge(self) -> int:
+        with self._lock, self._connect() as conn:
+            return conn.execute("DELETE FROM results").rowcount
+
+
+_validation_cache: Optional[ValidationCache] = None
+_validation_cache_lock = threading.Lock()
+
+
+def get_validation_cache() -> ValidationCache:
+    """Return the process-wide validation cache, creating it on first use."""
+    global _validation_cache
+    with _validation_cache_lock:
+        if _validation_cache is None:
+            _validation_cache = ValidationCache()
+        return _validation_cache
@@ -0,0 +1,119 @@
+# flows/batch.py
+
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from core.config import settings
+from core.logger_config import setup_logger
+from flows.jobs import coding_jobs, run_coding_flow
+from models.batch_models import BatchDocument, BatchStatus
+from models.code_models import GeneratedCode
+
+logger = setup_logger().getChild("batch")
+
+CODES_DIR = os.path.join(settings.USER_WORKDIR, "codes")
+
+_batches: Dict[str, BatchStatus] = {}
+_tasks: Dict[str, asyncio.Task] = {}  # keep running batches referenced
+
+# Shared by every batch, so two concurrent batches don't double the load.
+# Created lazily so they bind to the running event loop.
+_extract_slots: Optional[asyncio.Semaphore] = None
+_llm_slots: Optional[asyncio.Semaphore] = None
+
+
+def _slots():
+    global _extract_slots, _llm_slots
+    if _extract_slots is None:
+        _extract_slots = asyncio.Semaphore(max(1, settings.batch_extract_concurrency))
+        _llm_slots = asyncio.Semaphore(max(1, settings.batch_llm_concurrency))
+    return _extract_slots, _llm_slots
+
+
+def start_batch(pdf_paths: List[str], heading_mode: Optional[str] = None) -> BatchStatus:
+    """Register a batch and start processing it in the background."""
+    batch = BatchStatus(
+        batch_id=uuid.uuid4().hex,
+        created_at=datetime.now(),
+        documents=[BatchDocument(name=os.path.basename(p), pdf_path=p) for p in pdf_paths],
+    )
+    _batches[batch.batch_id] = batch
+    task = asyncio.create_task(_run_batch(batch, heading_mode))
+    _tasks[batch.batch_id] = task
+    task.add_done_callback(lambda _: _tasks.pop(batch.batch_id, None))
+    logger.info(f"[BATCH] {batch.batch_id} started with {len(pdf_paths)} documents")
+    return batch
+
+
+def get_batch(batch_id: str) -> Optional[BatchStatus]:
+    return _batches.get(batch_id)
+
+
+def list_batches() -> List[BatchStatus]:
+    return sorted(_batches.values(), key=lambda b: b.created_at, reverse=True)
+
+
+async def _run_batch(batch: BatchStatus, heading_mode: Optional[str]):
+    await asyncio.gather(*(_process_document(batch, doc, heading_mode) for doc in batch.documents))
+    batch.status = "done"
+    failed = sum(doc.status == "failed" for doc in batch.documents)
+    logger.info(f"[BATCH] {batch.batch_id} finished: {len(batch.documents) - failed} done, {failed} failed")
+
+
+def _extract_sections(pdf_path: str, heading_mode: Optional[str]) -> List[Dict]:
+    # Imported in the worker thread: the tool pulls in crewai on first use
+    from tools.PDFAnalyserTool import PDFAnalyserTool
+
+    return PDFAnalyserTool()._run(pdf_path, heading_mode)
+
+
+async def _process_document(batch: BatchStatus, doc: BatchDocument, heading_mode: Optional[str]):
+    extract_slots, llm_slots = _slots()
+    try:
+        async with extract_slots:
+            _progress(batch, doc, "extracting")
+            sections = await asyncio.to_thread(_extract_sections, doc.pdf_path, heading_mode)
+        if not sections:
+            raise ValueError("no sections could be extracted")
+
+        async with llm_slots, coding_jobs.slot():
+            _progress(batch, doc, "generating")
+            inputs = {"pdf_path": doc.pdf_path, "heading_mode": heading_mode, "sections": sections}
+            result: GeneratedCode = await asyncio.to_thread(run_coding_flow, inputs)
+
+        doc.code_file = _write_code(result, doc)
+        _progress(batch, doc, "done")
+    except Exception as e:
+        doc.error = str(e)
+        _progress(batch, doc, "failed")
+        logger.exception(f"[BATCH] {batch.batch_id} {doc.name} failed")
+
+
+def _progress(batch: BatchStatus, doc: BatchDocument, status: str):
+    doc.status = status
+    now = datetime.now()
+    if status == "extracting" and doc.started_at is None:
+        doc.started_at = now
+    if status in ("done", "failed"):
+        doc.finished_at = now
+    logger.info(
+        f"[BATCH] {batch.batch_id} {doc.name}: {status} ({batch.finished}/{len(batch.documents)} finished)"
+    )
+
+
+def _write_code(result: GeneratedCode, doc: BatchDocument) -> str:
+    """Save the generated code into the codes folder without overwriting earlier results."""
+    os.makedirs(CODES_DIR, exist_ok=True)
+    filename = result.filename or os.path.splitext(doc.name)[0] + ".py"
+    base, ext = os.path.splitext(os.path.basename(filename))
+    path = os.path.join(CODES_DIR, base + ext)
+    counter = 1
+    while os.path.exists(path):
+        path = os.path.join(CODES_DIR, f"{base}_{counter}{ext}")
+        counter += 1
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(result.code)
+    return path
@@ -1,120 +1,528 @@
-# flows/code.py – v1.1 - inherits from legacy v0.3
+# flows/code.py – v1.4 - inherits from legacy v0.3
 
+import contextvars
 import os
 import re
 import pprint
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
 
 from crewai import Crew, Task, Process
 from crewai.flow.flow import Flow, start
 from pydantic import BaseModel, ValidationError
 
 from models.code_models import SummaryResponse, GeneratedCode
+from core.artifact_store import artifact_digest, get_artifact_store, make_artifact_key
+from core.config import settings
+from core.jobs import JobCancelled
+from core.llm_cache import cache_bypassed
 from core.llm_provider import get_llm
 from core.logger_config import setup_logger
+from core.metrics import stage_timer
+from core.section_cache import file_sha256
+from tools.PDFAnalyserTool import PDFAnalyserTool
+from tools.code_tools import SummaryTool, CodeGenerationTool, CodeValidationTool
+from utils.tokens import count_tokens
 
-from agents.extract_agents import pdf_analysis_agent
-from agents.code_agents import summary_generator_agent, code_generator_agent, code_validator_agent, code_refinement_agent
+from agents import code_agents, extract_agents
 
 logger = setup_logger().getChild("coding_flow")
 logger.info("[FLOW] Initializing PDF-to-QuantConnect flow")
 
+# "direct" runs PDFAnalyserTool in Python and hands its sections to the summary
+# stage; "agent" lets pdf_analysis_agent call the tool inside the crew.
+EXTRACTION_MODES = ("direct", "agent")
+
+AGENT_FACTORIES = {**extract_agents.AGENT_FACTORIES, **code_agents.AGENT_FACTORIES}
+
+# Task prompts; part of the artifact keys, so editing them invalidates stored stages
+SUMMARY_PROMPT = "Generate a concise summary from the extracted sections below."
+CODE_PROMPT = "Generate QuantConnect Python code from the summary and the extracted paper sections below."
+
+CODE_BLOCK_PATTERN = re.compile(r"```(?:python|py)?[ \t]*\n(.*?)(?:```|$)", re.DOTALL)
+
+def extract_code_block(text: str) -> str:
+    """Return the first fenced code block of a model answer, or the whole answer if it has none."""
+    match = CODE_BLOCK_PATTERN.search(text)
+    return (match.group(1) if match else text).strip()
+
+def _sections_context(sections_text: str) -> str:
+    """The extracted sections appended to a code prompt, so details the summary dropped stay available."""
+    return f"\n\n### Extracted Sections (for reference):\n{sections_text}" if sections_text else ""
+
+def _agent_prompt(agent) -> Dict[str, str]:
+    """The parts of an agent that end up in its system prompt."""
+    return {"role": agent.role, "goal": agent.goal, "backstory": agent.backstory}
+
 class CodingState(BaseModel):
+    sections: Optional[List[Dict[str, Any]]] = None
+    # Sections as handed to the summary and code stages: the token-budgeted
+    # SummaryTool selection, or the extraction agent's answer in agent mode
+    sections_text: Optional[str] = None
     result: Optional[GeneratedCode] = None
+    validation: Optional[str] = None
+    refine_attempts: int = 0
+    reused_stages: List[str] = []
 
 class CodingFlow(Flow[CodingState]):
     """
     Refactored version of the legacy script pipeline using CrewAI.
     Parses a PDF to extract sections, synthesize a summary, and produce QuantConnect code.
+    The code is validated locally and only sent back to the model when validation fails.
+
+    Set `event_sink` to a callable(event, data) to receive stage transitions and,
+    with the 'stream' input, the tokens of the code-generation stage as they arrive.
+    Set `cancel_event` to stop the flow with JobCancelled at the next stage boundary.
+
+    With the 'code_candidates' input (or flow_code_candidates) above 1, the
+    code stage streams that many candidates at once and keeps the first one
+    that passes validation; streaming to the event sink then stays single-candidate.
+
+    Summary and code are kept in the artifact store (core/artifact_store), keyed
+    by the digests of their inputs and their model and prompt config, so a
+    rerun only recomputes the stages downstream of what changed. Extracted
+    sections are reused from the section cache (core/section_cache).
     """
 
+    event_sink: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    cancel_event: Optional[threading.Event] = None
+
     @start()
     def run_crew(self) -> GeneratedCode:
         pdf_path = self.inputs.get("pdf_path")
         if not pdf_path:
             raise ValueError("CodingFlow requires 'pdf_path' input")
-        logger.info(f"[CODING_FLOW] Starting pipeline for: {pdf_path}")
+        heading_mode = self.inputs.get("heading_mode") or settings.heading_mode
+        extraction_mode = self.inputs.get("extraction_mode") or settings.flow_extraction_mode
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"extraction_mode must be one of {EXTRACTION_MODES}")
+        stream = bool(self.inputs.get("stream"))
+        llm = get_llm(role="store")
+        logger.info(f"[CODING_FLOW] Starting pipeline for: {pdf_path} (extraction: {extraction_mode})")
 
-        # 1️⃣ Extract structured sections
-        extract_task = Task(
-            description=f"Extract structured sections from PDF: {pdf_path}",
-            expected_output="List of sections with heading, text, position, and type_hint",
-            agent=pdf_analysis_agent
+        if extraction_mode == "direct":
+            self._emit("stage", stage="extract")
+            # 1️⃣ Extract structured sections without an LLM round-trip,
+            # unless the caller (e.g. the batch runner) already did
+            with stage_timer("extract", model="direct"):
+                sections_digest = self._sections_stage(pdf_path, heading_mode)
+                self.state.sections_text = SummaryTool()._run(self.state.sections)
+
+            # 2️⃣ Summarize, with the sections handed over as context
+            self._check_cancelled()
+            self._emit("stage", stage="summary")
+            summary_key = make_artifact_key(
+                "summary",
+                {"sections": sections_digest},
+                {
+                    "model": llm.model,
+                    "temperature": llm.temperature,
+                    "agent": _agent_prompt(self._agent("summary_generator_agent")),
+                    "prompt": SUMMARY_PROMPT,
+                    "token_budget": settings.summary_token_budget,
+                },
+            )
+            with stage_timer("summary", model=llm.model):
+                stored = self._load_artifact("summary", summary_key)
+                if stored is not None:
+                    summary_digest, summary = stored[0], SummaryResponse.model_validate(stored[1])
+                else:
+                    summary = self._summarise(pdf_path)
+                    summary_digest = self._save_artifact("summary", summary_key, summary.model_dump())
+        else:
+            # 1️⃣ Extract with the agent's tool calls, as its own crew run; not
+            # memoized, since the tool calls are not visible to the flow
+            self._emit("stage", stage="extract")
+            with stage_timer("extract", model=llm.model):
+                self.state.sections_text = self._extract_with_agent(pdf_path, heading_mode)
+
+            # 2️⃣ Summarize the agent's extraction
+            self._check_cancelled()
+            self._emit("stage", stage="summary")
+            with stage_timer("summary", model=llm.model):
+                summary = self._summarise(pdf_path)
+            summary_digest = artifact_digest(summary.model_dump())
+
+        # 3️⃣ Generate Code (with its own crew, or streamed directly from the model)
+        base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+        safe_base = re.sub(r"[^A-Za-z0-9_-]", "_", base_name)[:40]
+        filename = safe_base + ".py"
+        max_attempts = self.inputs.get("max_refine_attempts", settings.flow_max_refine_attempts)
+        code_key = make_artifact_key(
+            "code",
+            {"summary": summary_digest, "sections": artifact_digest(self.state.sections_text)},
+            {
+                "model": llm.model,
+                "temperature": llm.temperature,
+                "agent": _agent_prompt(self._agent("code_generator_agent")),
+                "prompt": CODE_PROMPT,
+                "tool_prompt": CodeGenerationTool()._run(""),
+                "refine_agent": _agent_prompt(self._agent("code_refinement_agent")),
+                "max_refine_attempts": max_attempts,
+                "static_analysis": settings.code_static_analysis,
+            },
         )
 
-        # 2️⃣ Summarize
+        self._check_cancelled()
+        logger.info("[CODING_FLOW] Generating QuantConnect code from summary")
+        self._emit("stage", stage="code")
+        stored = self._load_artifact("code", code_key)
+        if stored is not None:
+            # Only validated code is stored, so the validate/refine stages are skipped too
+            self.state.result = GeneratedCode.model_validate(stored[1])
+            self.state.result.filename = filename
+            self.state.validation = "ok"
+            if stream:
+                self._emit("token", text=self.state.result.code)
+            return self.finalize()
+
+        candidates = self.inputs.get("code_candidates") or settings.flow_code_candidates
+        with stage_timer("code", model=llm.model):
+            # The code stage sees the sections too, not just the summary of them
+            sections_text = self.state.sections_text or ""
+            if stream:
+                self.state.result = self._stream_code(summary.summary, filename, sections_text)
+            elif candidates > 1:
+                self.state.result = self._speculate_code(summary.summary, filename, candidates, sections_text)
+            else:
+                self.state.result = self._generate_code(summary.summary, filename, sections_text)
+
+        # 4️⃣ Validate locally, 5️⃣ refine only while validation fails
+        self._validate_and_refine(max_attempts)
+        if self.state.validation == "ok":
+            self._save_artifact("code", code_key, self.state.result.model_dump())
+
+        return self.finalize()
+
+    def _sections_stage(self, pdf_path: str, heading_mode: str) -> str:
+        """
+        Set state.sections from the inputs or the PDF and return their digest.
+        Extracted sections are stored once, in the section cache that
+        PDFAnalyserTool keeps by content hash, not in the artifact store too.
+        """
+        if self.inputs.get("sections"):
+            self.state.sections = self.inputs["sections"]
+        else:
+            content_hash = self.inputs.get("content_hash") or file_sha256(pdf_path)
+            self.state.sections = self._extract_sections(pdf_path, heading_mode, content_hash)
+        return artifact_digest(self.state.sections)
+
+    def _summarise(self, pdf_path: str) -> SummaryResponse:
         summary_task = Task(
-            description="Generate a concise summary from extracted sections",
+            description=f"{SUMMARY_PROMPT}\n\n{self.state.sections_text}",
             expected_output="SummaryResponse",
-            context=[extract_task],
             output_pydantic=SummaryResponse,
-            agent=summary_generator_agent
+            agent=self._agent("summary_generator_agent")
         )
+        crew = Crew(
+            agents=[self._agent("summary_generator_agent")],
+            tasks=[summary_task],
+            manager_llm=get_llm(role="manager"),
+            process=Process.sequential,
+            verbose=True
+        )
+        logger.info("[CODING_FLOW] Kicking off Crew...")
+        # The description embeds raw paper text, which must not go through
+        # crewai's {placeholder} interpolation, hence no kickoff inputs
+        return self._to_summary(crew.kickoff(), summary_task, pdf_path)
 
-        # 3️⃣ Generate Code
-        base_name = os.path.splitext(os.path.basename(pdf_path))[0]
-        safe_base = re.sub(r"[^A-Za-z0-9_-]", "_", base_name)[:40]
-        filename = safe_base + ".py"
-        logger.info("[CODING_FLOW] Generating QuantConnect code from summary")
+    def _extract_with_agent(self, pdf_path: str, heading_mode: str) -> str:
+        """Agent extraction mode: pdf_analysis_agent calls PDFAnalyserTool and answers with the sections."""
+        extract_task = Task(
+            description=f"Extract structured sections from PDF: {pdf_path} using heading_mode='{heading_mode}'",
+            expected_output="List of sections with heading, text, position, and type_hint",
+            agent=self._agent("pdf_analysis_agent")
+        )
+        crew = Crew(
+            agents=[self._agent("pdf_analysis_agent")],
+            tasks=[extract_task],
+            manager_llm=get_llm(role="manager"),
+            process=Process.sequential,
+            verbose=True
+        )
+        logger.info("[CODING_FLOW] Kicking off extraction Crew...")
+        return crew.kickoff(inputs={"pdf_path": pdf_path}).raw
+
+    def _to_summary(self, output, summary_task: Task, pdf_path: str) -> SummaryResponse:
+        summary = summary_task.output.pydantic if summary_task.output else None
+        if isinstance(summary, SummaryResponse):
+            return summary
+        return SummaryResponse(filename=os.path.basename(pdf_path), summary=output.raw)
+
+    def _load_artifact(self, stage: str, key: str):
+        """(digest, payload) of a stored stage output, unless the store is off or bypassed."""
+        if not settings.artifact_store_enabled or cache_bypassed():
+            return None
+        try:
+            stored = get_artifact_store().get(key)
+        except Exception as e:
+            logger.warning(f"[CODING_FLOW] Artifact store unavailable: {e}")
+            return None
+        if stored is not None:
+            logger.info(f"[CODING_FLOW] Reusing stored {stage} ({stored[0][:12]})")
+            self.state.reused_stages.append(stage)
+            self._emit("stage", stage=stage, reused=True)
+        return stored
+
+    def _save_artifact(self, stage: str, key: str, payload: Any) -> str:
+        """Store a stage output and return its digest, which keys the stages below it."""
+        if settings.artifact_store_enabled:
+            try:
+                return get_artifact_store().put(key, stage, payload)
+            except Exception as e:
+                logger.warning(f"[CODING_FLOW] Could not store {stage} artifact: {e}")
+        return artifact_digest(payload)
+
+    def _extract_sections(
+        self, pdf_path: str, heading_mode: Optional[str], content_hash: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Deterministic extraction stage. The flow itself is kicked off in a worker
+        thread by the router, so this blocking call never runs on the event loop.
+        """
+        logger.info("[CODING_FLOW] Extracting sections directly with PDFAnalyserTool")
+        sections = PDFAnalyserTool()._run(pdf_path, heading_mode=heading_mode, content_hash=content_hash)
+        if not sections:
+            raise ValueError(f"No sections could be extracted from {pdf_path}")
+        return sections
+
+    def _validate_and_refine(self, max_attempts: int):
+        """
+        Check the current code with CodeValidationTool and, while it fails, ask
+        the refinement agent for a fix, at most `max_attempts` times. The
+        static-analysis findings are the refinement feedback; warnings alone
+        never cost a model call.
+        """
+        validator = CodeValidationTool()
+        self._emit("stage", stage="validate")
+        self._validate(validator)
+
+        while self.state.validation != "ok" and self.state.refine_attempts < max_attempts:
+            self._check_cancelled()
+            self.state.refine_attempts += 1
+            self._emit("stage", stage="refine", attempt=self.state.refine_attempts, error=self.state.validation)
+            logger.info(
+                f"[CODING_FLOW] Validation failed ({self.state.validation}), "
+                f"refinement attempt {self.state.refine_attempts}/{max_attempts}"
+            )
+            with stage_timer("refine", model=get_llm(role="store").model):
+                self.state.result = self._refine(self.state.result, self.state.validation)
+            self._validate(validator)
+
+        if self.state.validation == "ok":
+            logger.info(f"[CODING_FLOW] Code validated after {self.state.refine_attempts} refinement(s)")
+        else:
+            logger.warning(f"[CODING_FLOW] Code still invalid after {max_attempts} refinement(s): {self.state.validation}")
+
+    def _validate(self, validator: CodeValidationTool):
+        """Analyse the current code, attach the report to the result and record the verdict."""
+        with stage_timer("validate"):
+            report = validator.report(self.state.result.code)
+        self.state.result.analysis = report
+        self.state.validation = "ok" if report.ok else report.feedback()
+        if report.findings:
+            self._emit("analysis", **report.model_dump())
+
+    def _generate_code(self, summary: str, filename: str, sections_text: str = "") -> GeneratedCode:
+        """
+        Code-generation stage as its own crew run, so its time and tokens are
+        measured apart from the summary. The summary and the sections go into
+        the description as-is; kickoff gets no inputs, so braces in them are
+        left alone.
+        """
         code_task = Task(
-            description=f"Generate QuantConnect Python code from summary. Filename should be: {filename}",
+            description=(
+                f"{CODE_PROMPT} Filename should be: {filename}\n\n"
+                f"{summary}"
+                f"{_sections_context(sections_text)}"
+            ),
             expected_output="GeneratedCode JSON",
-            context=[summary_task],
             output_pydantic=GeneratedCode,
-            agent=code_generator_agent
+            agent=self._agent("code_generator_agent")
         )
-
-        # 4️⃣ Validate syntax only
-        validate_task = Task(
-            description="Validate the generated code using Python AST. Return 'ok' or the error.",
-            expected_output="'ok' or error message",
-            context=[code_task],
-            agent=code_validator_agent
+        crew = Crew(
+            agents=[self._agent("code_generator_agent")],
+            tasks=[code_task],
+            process=Process.sequential,
+            verbose=True
         )
+        return self._to_generated_code(crew.kickoff())
+
+    def _code_messages(self, summary: str, sections_text: str = "") -> List[Dict[str, str]]:
+        """Chat messages for calling the code generator's model directly, outside a crew."""
+        return [
+            {"role": "system", "content": self._agent("code_generator_agent").backstory},
+            {
+                "role": "user",
+                "content": CodeGenerationTool()._run(summary)
+                + _sections_context(sections_text)
+                + "\nReturn only the complete Python code in a single ```python block.",
+            },
+        ]
+
+    def _stream_code(self, summary: str, filename: str, sections_text: str = "") -> GeneratedCode:
+        """
+        Code-generation stage without the crew: call the model directly and
+        forward every token to the event sink as it arrives. Cancelling closes
+        the stream at the next token, since this is the longest stage.
+        """
+        parts = []
+        stream = get_llm(role="store").stream(self._code_messages(summary, sections_text))
+        try:
+            for chunk in stream:
+                self._check_cancelled()
+                parts.append(chunk)
+                self._emit("token", text=chunk)
+        finally:
+            stream.close()
+        return GeneratedCode(code=extract_code_block("".join(parts)), filename=filename)
+
+    def _speculate_code(
+        self, summary: str, filename: str, candidates: int, sections_text: str = ""
+    ) -> GeneratedCode:
+        """
+        Stream `candidates` generations of the same prompt concurrently, at
+        increasing temperatures, and return the first that passes
+        CodeValidationTool. The other streams are closed as soon as a winner
+        is found or the shared token budget runs out. If none is valid, the
+        first completed candidate is returned and goes through refinement;
+        if the budget ran out before any completed, the longest partial
+        candidate is used when it validates, else one sequential generation.
+        """
+        llm = get_llm(role="store")
+        messages = self._code_messages(summary, sections_text)
+        validator = CodeValidationTool()
+        stop = threading.Event()  # a winner was found, or the stage is over
+        exhausted = threading.Event()  # the shared token budget ran out
+        budget_lock = threading.Lock()
+        budget = {"left": settings.flow_candidates_token_budget}
+        partials: Dict[int, List[str]] = {}
+
+        def generate(index: int, temperature: float):
+            parts = partials.setdefault(index, [])
+            stream = llm.stream(messages, temperature=temperature, max_tokens=settings.flow_candidate_max_tokens)
+            try:
+                for chunk in stream:
+                    if stop.is_set() or exhausted.is_set() or (
+                        self.cancel_event is not None and self.cancel_event.is_set()
+                    ):
+                        return None
+                    with budget_lock:
+                        budget["left"] -= count_tokens(chunk)
+                        if budget["left"] < 0:
+                            exhausted.set()
+                            logger.warning(f"[CODING_FLOW] Candidate token budget exhausted at candidate {index}")
+                            return None
+                    parts.append(chunk)
+            finally:
+                stream.close()
+            code = GeneratedCode(code=extract_code_block("".join(parts)), filename=filename)
+            return index, code, validator._run(code.code)
+
+        base = llm.temperature if llm.temperature is not None else 0.3
+        temperatures = [min(1.0, base + 0.2 * i) for i in range(candidates)]
+        logger.info(f"[CODING_FLOW] Generating {candidates} code candidates at temperatures {temperatures}")
+        fallback = None
+        executor = ThreadPoolExecutor(max_workers=candidates, thread_name_prefix="code-candidate")
+        try:
+            # A context copy per candidate, so the cache bypass and the metrics
+            # stage of this flow apply to its LLM calls too
+            futures = [
+                executor.submit(contextvars.copy_context().run, generate, i, t)
+                for i, t in enumerate(temperatures)
+            ]
+            for future in as_completed(futures):
+                try:
+                    outcome = future.result()
+                except Exception:
+                    logger.exception("[CODING_FLOW] Code candidate failed")
+                    continue
+                if outcome is None:
+                    continue
+                index, code, validation = outcome
+                self._emit("candidate", index=index, validation=validation)
+                if validation == "ok":
+                    logger.info(f"[CODING_FLOW] Candidate {index} is valid, cancelling the others")
+                    return code
+                fallback = fallback or code
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self._check_cancelled()
+        if fallback is not None:
+            logger.warning("[CODING_FLOW] No candidate passed validation, refining the first one")
+            return fallback
+
+        best = max(("".join(parts) for parts in partials.values()), key=len, default="")
+        partial = GeneratedCode(code=extract_code_block(best), filename=filename)
+        if partial.code and validator._run(partial.code) == "ok":
+            logger.warning("[CODING_FLOW] No candidate completed within the token budget, using the longest partial one")
+            return partial
+        logger.warning("[CODING_FLOW] No candidate completed within the token budget, generating one sequentially")
+        return self._generate_code(summary, filename, sections_text)
 
-        # 5️⃣ Refine if validation failed
+    def _agent(self, name: str):
+        """
+        This run's own instance of an agent, built on first use with the active
+        model. crewai agents keep per-task executor state, so flows running at
+        once in the worker pool must not share them.
+        """
+        agents = self.__dict__.setdefault("_run_agents", {})
+        if name not in agents:
+            agents[name] = AGENT_FACTORIES[name]()
+        return agents[name]
+
+    def _check_cancelled(self):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            logger.info("[CODING_FLOW] Cancelled")
+            raise JobCancelled()
+
+    def _emit(self, event: str, **data):
+        if self.event_sink is not None:
+            try:
+                self.event_sink(event, data)
+            except Exception:
+                logger.exception(f"[CODING_FLOW] Event sink failed for '{event}'")
+
+    def _refine(self, code: GeneratedCode, error: str) -> GeneratedCode:
         refine_task = Task(
-            description="If the previous validation returned an error, fix the QuantConnect code and return the corrected GeneratedCode JSON.",
+            description=(
+                "The QuantConnect code below failed validation with these findings:\n"
+                f"{error}\n\n"
+                "Fix the code and return the corrected GeneratedCode JSON"
+                f" (keep the filename '{code.filename}').\n\n"
+                f"```python\n{code.code}\n```"
+            ),
             expected_output="Validated GeneratedCode JSON",
-            context=[code_task, validate_task],
             output_pydantic=GeneratedCode,
-            agent=code_refinement_agent
+            agent=self._agent("code_refinement_agent")
         )
-
         crew = Crew(
-            agents=[
-                pdf_analysis_agent,
-                summary_generator_agent,
-                code_generator_agent,
-                code_validator_agent,
-                code_refinement_agent
-            ],
-            tasks=[
-                extract_task,
-                summary_task,
-                code_task,
-                validate_task,
-                refine_task
-            ],
-            manager_llm=get_llm(role="manager"),
+            agents=[self._agent("code_refinement_agent")],
+            tasks=[refine_task],
             process=Process.sequential,
             verbose=True
         )
+        refined = self._to_generated_code(crew.kickoff())
+        if not refined.filename:
+            refined.filename = code.filename
+        return refined
 
-        logger.info("[CODING_FLOW] Kicking off Crew...")
-        raw = crew.kickoff(inputs={"pdf_path": pdf_path})
-
+    def _to_generated_code(self, output) -> GeneratedCode:
+        if isinstance(output.pydantic, GeneratedCode):
+            return output.pydantic
         try:
-            self.state.result = GeneratedCode.model_validate_json(raw.raw)
+            return GeneratedCode.model_validate_json(output.raw)
         except ValidationError:
             logger.exception("Validation to GeneratedCode failed")
             raise
 
-        return self.finalize()
-
     def finalize(self) -> GeneratedCode:
         if self.state.result is None:
             raise ValueError("CodingFlow produced no result")
         logger.info("[CODING_FLOW] Returning finalized result")
+        self._emit("stage", stage="done")
         logger.debug(pprint.pformat(self.state.result.model_dump()))
         return self.state.result
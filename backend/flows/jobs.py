@@ -0,0 +1,44 @@
+# flows/jobs.py
+
+import asyncio
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from core.config import settings
+from core.jobs import JobQueue
+from core.llm_cache import llm_cache_bypass
+from models.code_models import GeneratedCode
+
+FLOW_INPUTS = ("pdf_path", "heading_mode", "content_hash", "extraction_mode", "code_candidates")
+
+
+def run_coding_flow(
+    inputs: Dict[str, Any],
+    event_sink: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    cancel_event: Optional[threading.Event] = None,
+) -> GeneratedCode:
+    """
+    Build and run a CodingFlow. Blocking, so callers run it in a worker thread;
+    flows.code (crewai, the agents) is imported here on first use, which keeps
+    it off both the import path of the app and the event loop.
+    """
+    from flows.code import CodingFlow
+
+    flow = CodingFlow()
+    flow.inputs = inputs
+    flow.event_sink = event_sink
+    flow.cancel_event = cancel_event
+    return flow.kickoff()
+
+
+async def _run_coding_job(job_id: str, params: Dict[str, Any], cancel: threading.Event) -> Dict[str, Any]:
+    inputs = {name: params.get(name) for name in FLOW_INPUTS}
+    with llm_cache_bypass(params.get("no_cache", False)):
+        result = await asyncio.to_thread(run_coding_flow, inputs, cancel_event=cancel)
+    return result.model_dump()
+
+
+# Every CodingFlow run takes a slot of this queue: submitted jobs through the
+# queue itself, /coder/process and batch documents through `coding_jobs.slot()`.
+# Load spikes wait here instead of piling up in the default thread pool.
+coding_jobs = JobQueue("coding", _run_coding_job, settings.max_concurrent_flows)
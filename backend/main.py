@@ -1,18 +1,28 @@
 import logging
 import asyncio
-from contextlib import asynccontextmanager
+import time
+from contextlib import aclosing, asynccontextmanager
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
 from routers.coder import router as coder
 from routers.filemanager import router as filemanager
 from routers.llmloader import router as llmloader
 from routers.backtester import router as backtester  # Import the new backtester router
+from routers.cache import router as cache
 from core.logstream import log_ws_manager
 from core.logger_config import setup_logger, set_main_event_loop
 from core.stdout_stream import intercept_stdout
 from core.config import settings
+from core.llm_settings import init_llm_settings_db
+from core.nlp_provider import preload_nlp
+from core.metrics import CONTENT_TYPE_LATEST, generate_latest
+from flows.jobs import coding_jobs
+from core.backtest_jobs import backtest_jobs, backtest_logs
+from tools.bulk_validator import validation_jobs
+from tools.pdf_pages import shutdown_extract_pools
+from core.jobs import FINISHED_STATES
 
 # ──────────────────────────────────────────────
 # 1️⃣ Setup stdout & logging
@@ -23,12 +33,36 @@ setup_logger()
 # ──────────────────────────────────────────────
 # 2️⃣ Async lifespan for app-wide init
 # ──────────────────────────────────────────────
+def warm_up():
+    """
+    Pay the first flow's start-up costs ahead of time: the LLM settings DB,
+    the spaCy model, and crewai with the agents and their LLM clients.
+    """
+    started = time.perf_counter()
+    try:
+        init_llm_settings_db()
+        preload_nlp()
+        import flows.code  # noqa: F401 – crewai, tools and agents
+    except Exception:
+        logging.getLogger("main").exception("Warm-up failed, components will load on first use")
+        return
+    logging.getLogger("main").info(f"🔥 Warm-up finished in {time.perf_counter() - started:.1f}s")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     loop = asyncio.get_event_loop()
     set_main_event_loop(loop)
     logging.getLogger("main").info("🔧 AsyncIO event loop initialized")
+    if settings.warm_up_on_startup:
+        # In the background, so the server accepts requests at once; a request
+        # arriving earlier simply waits for the same imports
+        app.state.warm_up = asyncio.create_task(asyncio.to_thread(warm_up))
+    await coding_jobs.resume()  # pick up jobs interrupted by the last shutdown
+    await backtest_jobs.resume()
+    await validation_jobs.resume()
     yield
+    await asyncio.to_thread(shutdown_extract_pools)
 
 # ──────────────────────────────────────────────
 # 3️⃣ Create the app
@@ -56,6 +90,7 @@ app.include_router(filemanager)
 app.include_router(coder)
 app.include_router(llmloader)  # ✅ Now active
 app.include_router(backtester)  # ✅ Added the new backtester router
+app.include_router(cache)
 
 # ──────────────────────────────────────────────
 # 6️⃣ WebSocket log stream
@@ -81,6 +116,42 @@ async def log_stream(websocket: WebSocket):
     except WebSocketDisconnect:
         log_ws_manager.disconnect(websocket)
 
+# ──────────────────────────────────────────────
+# 6️⃣b Live output of a backtest job
+# ──────────────────────────────────────────────
+@app.websocket("/ws/backtests/{job_id}")
+async def backtest_stream(websocket: WebSocket, job_id: str):
+    """
+    Follow a backtest's Lean output line by line: buffered lines first, then
+    live ones until the job ends. A finished job gets the tail of its log file.
+    """
+    await websocket.accept()
+    try:
+        announced_queue = False
+        while (channel := backtest_logs.get(job_id)) is None:
+            job = backtest_jobs.store.get(job_id)
+            if job is None or job["kind"] != "backtest":
+                await websocket.close(code=4404, reason="Job not found")
+                return
+            if job["status"] in FINISHED_STATES:
+                for line in await asyncio.to_thread(backtest_logs.read_tail, job_id):
+                    await websocket.send_text(line)
+                await websocket.send_text(f"[backtest {job['status']}]")
+                await websocket.close()
+                return
+            if not announced_queue:
+                await websocket.send_text("[backtest queued, waiting for a slot]")
+                announced_queue = True
+            await asyncio.sleep(1)
+
+        async with aclosing(channel.follow()) as lines:
+            async for line in lines:
+                await websocket.send_text(line)
+        await websocket.send_text(f"[backtest {channel.status}]")
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
 # ──────────────────────────────────────────────
 # 7️⃣ Manual log ping
 # ──────────────────────────────────────────────
@@ -90,7 +161,14 @@ def log_test():
     return {"status": "ok"}
 
 # ──────────────────────────────────────────────
-# 8️⃣ Entry point
+# 8️⃣ Prometheus metrics (stage timings, LLM tokens, cache hits)
+# ──────────────────────────────────────────────
+@app.get("/metrics")
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# ──────────────────────────────────────────────
+# 9️⃣ Entry point
 # ──────────────────────────────────────────────
 if __name__ == "__main__":
     import uvicorn
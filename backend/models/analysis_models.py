@@ -0,0 +1,35 @@
+# models/analysis_models.py
+
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class Finding(BaseModel):
+    """
+    One problem reported by the QuantConnect static analyser.
+    """
+    check: str = Field(..., description="Check that produced the finding, e.g. 'orders' or 'undefined_name'")
+    severity: Literal["error", "warning"]
+    message: str
+    line: Optional[int] = None
+
+
+class AnalysisReport(BaseModel):
+    """
+    Result of statically analysing a generated algorithm. `ok` is False when
+    any finding is an error; warnings alone do not fail the code.
+    """
+    ok: bool
+    algorithm_class: Optional[str] = None
+    findings: List[Finding] = []
+
+    @property
+    def errors(self) -> List[Finding]:
+        return [f for f in self.findings if f.severity == "error"]
+
+    def feedback(self) -> str:
+        """Findings as plain text, one per line, for a refinement prompt."""
+        return "\n".join(
+            f"- [{f.severity}] {f.message}" + (f" (line {f.line})" if f.line else "") for f in self.findings
+        )
@@ -0,0 +1,23 @@
+# models/backtest_models.py
+
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BacktestResult(BaseModel):
+    """
+    Outcome of a finished Lean backtest job.
+    """
+    file: str = Field(..., description="Algorithm file that was backtested")
+    returncode: int
+    duration_seconds: float
+    statistics: Dict[str, str] = Field(default_factory=dict, description="STATISTICS:: lines of the Lean log")
+    output_tail: List[str] = Field(default_factory=list, description="Last lines Lean printed")
+    log_file: Optional[str] = Field(None, description="Full Lean output (rotated beyond backtest_log_max_mb)")
+
+
+class BacktestTriggered(BaseModel):
+    status: str = "backtest started"
+    file: str
+    job_id: str
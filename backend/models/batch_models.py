@@ -0,0 +1,33 @@
+# models/batch_models.py
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BatchDocument(BaseModel):
+    """
+    Progress of one PDF inside a batch.
+    """
+    name: str = Field(..., description="PDF file name")
+    pdf_path: str = Field(..., description="Absolute path of the PDF being processed")
+    status: str = Field("queued", description="queued | extracting | generating | done | failed")
+    code_file: Optional[str] = Field(None, description="Path of the generated code in the codes folder")
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class BatchStatus(BaseModel):
+    """
+    Progress of a whole batch ingestion run.
+    """
+    batch_id: str
+    created_at: datetime
+    status: str = Field("running", description="running | done")
+    documents: List[BatchDocument] = []
+
+    @property
+    def finished(self) -> int:
+        return sum(doc.status in ("done", "failed") for doc in self.documents)
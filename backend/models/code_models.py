@@ -4,6 +4,8 @@ from pydantic import BaseModel, Field
 
 from typing import Optional, Dict, Any
 
+from models.analysis_models import AnalysisReport
+
 
 
 class SummaryResponse(BaseModel):
@@ -29,4 +31,5 @@ class GeneratedCode(BaseModel):
     filename: Optional[str] = None
     language: Optional[str] = "python"
     backtest: Optional[Dict[str, Any]] = None  # ✅ Fix: add key/value types
+    analysis: Optional[AnalysisReport] = None  # static analysis of `code`, set by CodingFlow
 
@@ -0,0 +1,38 @@
+# models/job_models.py
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+class JobStatus(BaseModel):
+    """
+    State of a background job, as persisted in the job table.
+    """
+    job_id: str
+    kind: str = Field(..., description="Job type, e.g. 'coding'")
+    status: str = Field(..., description="queued | running | done | failed | cancelled")
+    file: Optional[str] = Field(None, description="Input file the job works on")
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_record(cls, job: Dict[str, Any]) -> "JobStatus":
+        params = job.get("params") or {}
+        return cls(
+            job_id=job["id"],
+            kind=job["kind"],
+            status=job["status"],
+            file=params.get("file"),
+            error=job.get("error"),
+            created_at=_timestamp(job["created"]),
+            started_at=_timestamp(job.get("started")),
+            finished_at=_timestamp(job.get("finished")),
+        )
@@ -0,0 +1,78 @@
+# models/sandbox_models.py
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SandboxOrder(BaseModel):
+    """
+    An order placed by the algorithm during a sandbox run. Orders fill at once
+    at the synthetic bar close; `status` is Invalid when nothing could be filled.
+    """
+    time: str
+    symbol: str
+    quantity: float
+    type: str
+    status: str
+    price: float
+    tag: str = ""
+
+
+class SandboxError(BaseModel):
+    """
+    An exception raised by the algorithm, with the Lean event it came from.
+    """
+    stage: str = Field(
+        ...,
+        description=(
+            "import | Initialize | OnSecuritiesChanged | Consolidator | ScheduledEvent | Framework | OnData "
+            "| OnEndOfAlgorithm | sandbox"
+        ),
+    )
+    type: str
+    message: str
+    line: Optional[int] = None
+    traceback: str = ""
+
+
+class SandboxReport(BaseModel):
+    """
+    Result of running an algorithm against the Lean API stubs on synthetic bars.
+    `ok` requires a clean run that placed at least one order, or, when the
+    algorithm uses API the stubs lack (`unsupported_api`), a clean run up to it.
+    """
+    ok: bool
+    algorithm_class: Optional[str] = None
+    initialized: bool = False
+    bars_processed: int = 0
+    order_count: int = 0
+    orders: List[SandboxOrder] = []
+    ignored_warmup_orders: int = 0
+    errors: List[SandboxError] = []
+    unsupported_api: List[str] = []  # Lean API the stubs lack or do not simulate
+    logs: List[str] = []
+    output: str = ""
+    final_portfolio_value: Optional[float] = None
+    timed_out: bool = False
+    duration_ms: float = 0.0
+
+    def feedback(self) -> str:
+        """Why the run was rejected, as plain text for an error message or prompt."""
+        if self.ok:
+            if self.unsupported_api:
+                return f"Sandbox run passed, up to API it does not support: {', '.join(self.unsupported_api)}."
+            return "Sandbox run passed."
+        lines = [
+            f"- {e.stage}: {e.type}: {e.message}" + (f" (line {e.line})" if e.line else "")
+            for e in self.errors
+        ]
+        if not self.errors and self.order_count == 0:
+            lines.append(f"- No orders were placed over {self.bars_processed} synthetic bars")
+        return "\n".join(lines)
+
+
+class SandboxRequest(BaseModel):
+    code: str = Field(..., description="Python source of a QuantConnect algorithm")
+    bars: Optional[int] = Field(None, ge=1, le=5000, description="Synthetic daily bars to feed (default: settings.sandbox_bars)")
+    seed: int = Field(7, description="Seed of the synthetic price walk")
@@ -0,0 +1,35 @@
+# models/validation_models.py
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from models.analysis_models import AnalysisReport
+from models.sandbox_models import SandboxReport
+
+
+class FileValidation(BaseModel):
+    """
+    Validation result of one code file in a bulk sweep.
+    """
+    file: str = Field(..., description="Path relative to the validated folder")
+    sha256: str
+    ok: bool
+    cached: bool = Field(False, description="Result reused from an earlier sweep of the same content")
+    analysis: Optional[AnalysisReport] = None
+    sandbox: Optional[SandboxReport] = Field(None, description="Sandbox run, when requested and the static checks passed")
+    error: Optional[str] = Field(None, description="Why the file could not be validated at all")
+    duration_ms: float = 0.0
+
+
+class FolderValidation(BaseModel):
+    """
+    Result of validating every code file in a folder.
+    """
+    folder: str
+    total: int
+    passed: int
+    failed: int
+    cached: int
+    duration_ms: float
+    results: List[FileValidation] = []
@@ -1,11 +1,17 @@
 # routers/backtester.py
 
+import asyncio
 import os
-import sys
-import subprocess
-from shutil import which
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from typing import List
+from fastapi import APIRouter, HTTPException, Query
+from core.backtest_jobs import backtest_jobs
+from core.config import settings
+from core.jobs import FINISHED_STATES, DONE
 from core.logger_config import setup_logger
+from models.backtest_models import BacktestResult, BacktestTriggered
+from models.job_models import JobStatus
+from models.sandbox_models import SandboxReport, SandboxRequest
+from tools.lean_sandbox import run_sandbox, run_sandbox_file
 
 router = APIRouter(
     prefix="/backtester",
@@ -16,25 +22,6 @@ logger = setup_logger().getChild("backtester")
 
 LEAN_FOLDER = "/home/slmar/projects/lean/Algorithm.Python"
 
-def _run_backtest(cmd: list[str], env: dict[str, str], latest: str):
-    """Background task: run Lean backtest and log results."""
-    try:
-        proc = subprocess.run(
-            cmd,
-            check=True,
-            capture_output=True,
-            text=True,
-            env=env,
-            timeout=3600,  # adjust if your backtest needs more time
-        )
-        logger.info(f"[BACKTESTER] {latest} finished. stdout:\n{proc.stdout}")
-        if proc.stderr:
-            logger.warning(f"[BACKTESTER] {latest} stderr:\n{proc.stderr}")
-    except subprocess.TimeoutExpired:
-        logger.error(f"[BACKTESTER] {latest} timed out")
-    except subprocess.CalledProcessError as e:
-        logger.error(f"[BACKTESTER] {latest} failed:\n{e.stderr}")
-
 def get_latest_py() -> str | None:
     """Return the newest .py file in LEAN_FOLDER, or None if empty."""
     try:
@@ -46,11 +33,25 @@ def get_latest_py() -> str | None:
         logger.error(f"[BACKTESTER] Couldn’t list files: {ex}")
         raise HTTPException(500, "Error reading lean algorithm folder")
 
-@router.post("/trigger-backtest")
-def trigger_backtest(background_tasks: BackgroundTasks):
+@router.post("/sandbox", response_model=SandboxReport)
+def sandbox(request: SandboxRequest):
+    """
+    Smoke-test an algorithm against the Lean API stubs on synthetic bars and
+    report the exceptions it raised and the orders it placed. Takes
+    milliseconds to seconds, against minutes for a Lean backtest.
+    """
+    return run_sandbox(request.code, bars=request.bars, seed=request.seed)
+
+@router.post("/trigger-backtest", response_model=BacktestTriggered, status_code=202)
+async def trigger_backtest(
+    skip_sandbox: bool = Query(False, description="Start Lean even if the sandbox smoke-test fails"),
+):
     """
-    Start a Lean backtest of the newest .py in the Algorithm.Python folder,
-    then return immediately. The actual work happens in the background.
+    Queue a Lean backtest of the newest .py in the Algorithm.Python folder
+    and return its job id immediately. At most `backtest_max_concurrent`
+    backtests run at once; the rest wait in the queue.
+    The algorithm is first run in the stub sandbox, and broken code is
+    rejected with 422 before Lean is started.
     """
     latest = get_latest_py()
     if not latest:
@@ -58,18 +59,69 @@ def trigger_backtest(background_tasks: BackgroundTasks):
 
     script = os.path.join(LEAN_FOLDER, latest)
 
-    # Locate the lean CLI in your venv or on PATH
-    venv_bin = os.path.dirname(sys.executable)
-    lean_cli = which("lean") or os.path.join(venv_bin, "lean")
-    if not os.path.isfile(lean_cli):
-        lean_cli = os.path.join(venv_bin, "lean")
+    if settings.sandbox_gate_backtests and not skip_sandbox:
+        report = await asyncio.to_thread(run_sandbox_file, script)
+        if not report.ok:
+            logger.warning(f"[BACKTESTER] Sandbox rejected {latest}:\n{report.feedback()}")
+            raise HTTPException(
+                422,
+                detail={
+                    "message": f"{latest} failed the sandbox smoke-test",
+                    "file": latest,
+                    "sandbox": report.model_dump(),
+                },
+            )
+
+    job = backtest_jobs.submit({"file": latest, "script": script})
+    logger.info(f"[BACKTESTER] Queued backtest of {latest} as job {job['id']}")
+    return BacktestTriggered(file=latest, job_id=job["id"])
+
+
+@router.get("/jobs", response_model=List[JobStatus])
+def list_backtest_jobs(limit: int = Query(100, ge=1, le=1000)):
+    """
+    List backtest jobs, newest first.
+    """
+    return [JobStatus.from_record(job) for job in backtest_jobs.store.list("backtest", limit)]
+
 
-    # Prepare env so it sees your venv first
-    env = os.environ.copy()
-    env["PATH"] = venv_bin + os.pathsep + env.get("PATH", "")
+def _get_backtest_job(job_id: str) -> dict:
+    job = backtest_jobs.store.get(job_id)
+    if job is None or job["kind"] != "backtest":
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
 
-    cmd = [lean_cli, "backtest", script]
-    logger.info(f"[BACKTESTER] Scheduling background task: {' '.join(cmd)}")
-    background_tasks.add_task(_run_backtest, cmd, env, latest)
 
-    return {"status": "backtest started", "file": latest}
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+def get_backtest_job(job_id: str):
+    """
+    Status of a backtest job.
+    """
+    return JobStatus.from_record(_get_backtest_job(job_id))
+
+
+@router.get("/jobs/{job_id}/result", response_model=BacktestResult)
+def get_backtest_job_result(job_id: str):
+    """
+    Statistics and output tail of a finished backtest; 409 while it is still queued or running.
+    """
+    job = _get_backtest_job(job_id)
+    if job["status"] not in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if job["status"] != DONE:
+        raise HTTPException(status_code=409, detail=job["error"] or f"Job {job['status']}")
+    return BacktestResult.model_validate(job["result"])
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobStatus)
+async def cancel_backtest_job(job_id: str):
+    """
+    Cancel a queued backtest, or stop the Lean process of a running one.
+    """
+    job = _get_backtest_job(job_id)
+    if job["status"] in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    if not backtest_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not active in this process")
+    logger.info(f"[BACKTESTER] Cancellation requested for job {job_id}")
+    return JobStatus.from_record(backtest_jobs.store.get(job_id))
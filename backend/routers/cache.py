@@ -0,0 +1,103 @@
+# routers/cache.py
+
+from fastapi import APIRouter, HTTPException
+
+from core.artifact_store import get_artifact_store
+from core.llm_cache import get_llm_cache
+from core.logger_config import setup_logger
+from core.section_cache import get_section_cache
+from core.validation_cache import get_validation_cache
+
+router = APIRouter(
+    prefix="/cache",
+    tags=["Cache"],
+)
+
+logger = setup_logger().getChild("cache")
+
+
+@router.get("/sections")
+def inspect_section_cache(entries: bool = False):
+    """
+    Return size statistics of the extracted-sections cache, optionally with its entries.
+    """
+    cache = get_section_cache()
+    result = {"stats": cache.stats()}
+    if entries:
+        result["entries"] = cache.entries()
+    return result
+
+
+@router.delete("/sections")
+def purge_section_cache():
+    """
+    Remove every cached section list.
+    """
+    removed = get_section_cache().purge()
+    logger.info(f"[CACHE] Purged {removed} section cache entries")
+    return {"status": "purged", "removed": removed}
+
+
+@router.delete("/sections/{key}")
+def delete_section_cache_entry(key: str):
+    """
+    Remove a single cached section list by key.
+    """
+    if not get_section_cache().delete(key):
+        raise HTTPException(status_code=404, detail="Cache entry not found")
+    logger.info(f"[CACHE] Deleted section cache entry {key}")
+    return {"status": "deleted", "key": key}
+
+
+@router.get("/llm")
+def inspect_llm_cache():
+    """
+    Return size, TTL and hit/miss counters of the LLM response cache.
+    """
+    return {"stats": get_llm_cache().stats()}
+
+
+@router.delete("/llm")
+def purge_llm_cache():
+    """
+    Remove every cached LLM response.
+    """
+    removed = get_llm_cache().purge()
+    logger.info(f"[CACHE] Purged {removed} LLM cache entries")
+    return {"status": "purged", "removed": removed}
+
+
+@router.get("/artifacts")
+def inspect_artifact_store():
+    """
+    Return blob count, size and per-stage entry counts of the stage artifact store.
+    """
+    return {"stats": get_artifact_store().stats()}
+
+
+@router.delete("/artifacts")
+def purge_artifact_store():
+    """
+    Remove every stored stage output, so the next runs recompute all stages.
+    """
+    removed = get_artifact_store().purge()
+    logger.info(f"[CACHE] Purged {removed} stage artifact entries")
+    return {"status": "purged", "removed": removed}
+
+
+@router.get("/validation")
+def inspect_validation_cache():
+    """
+    Return size statistics of the bulk code validation cache.
+    """
+    return {"stats": get_validation_cache().stats()}
+
+
+@router.delete("/validation")
+def purge_validation_cache():
+    """
+    Remove every cached validation result, so the next sweep re-checks all files.
+    """
+    removed = get_validation_cache().purge()
+    logger.info(f"[CACHE] Purged {removed} validation cache entries")
+    return {"status": "purged", "removed": removed}
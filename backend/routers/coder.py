@@ -1,12 +1,25 @@
 # routers/coder.py
 
 import os
+import json
 import asyncio
-from fastapi import APIRouter, HTTPException, UploadFile, File
+import threading
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File, Form, Query
+from fastapi.responses import StreamingResponse
 from core.config import settings
+from core.llm_cache import llm_cache_bypass
 from core.logger_config import setup_logger
-from flows.code import CodingFlow
+from flows.batch import start_batch, get_batch, list_batches
+from flows.jobs import coding_jobs, run_coding_flow
+from core.jobs import FINISHED_STATES, DONE, JobCancelled
+from models.batch_models import BatchStatus
+from models.job_models import JobStatus
 from models.code_models import GeneratedCode
+from models.validation_models import FolderValidation
+from tools.bulk_validator import CODES_DIR, validation_jobs
+from tools.section_engine import HEADING_MODES
+from utils.file_manager import save_uploaded_file
 
 router = APIRouter(
     prefix="/coder",
@@ -15,35 +28,337 @@ router = APIRouter(
 
 logger = setup_logger().getChild("coder")
 
+DOWNLOADS_DIR = os.path.join(settings.USER_WORKDIR, "downloads")
+ARTICLES_DIR = os.path.join(settings.USER_WORKDIR, "articles")
+
+
+def validate_heading_mode(heading_mode: Optional[str]):
+    if heading_mode is not None and heading_mode not in HEADING_MODES:
+        raise HTTPException(status_code=400, detail=f"heading_mode must be one of {HEADING_MODES}")
+
+
+async def save_upload(file: UploadFile) -> Tuple[str, str]:
+    """Stream an uploaded PDF into the downloads folder and return (path, sha256)."""
+    try:
+        pdf_path, content_hash = await save_uploaded_file(file, DOWNLOADS_DIR)
+        logger.info(f"[CODER] Stored PDF at {pdf_path} (sha256 {content_hash[:12]})")
+    except Exception as e:
+        logger.error(f"[CODER] Failed saving PDF: {e}")
+        raise HTTPException(status_code=500, detail="Could not save uploaded PDF.")
+    return pdf_path, content_hash
+
 @router.post("/process", response_model=GeneratedCode)
 async def process_pdf_and_generate_code(
-    file: UploadFile = File(..., description="PDF to convert into trading algorithm")
+    file: UploadFile = File(..., description="PDF to convert into trading algorithm"),
+    heading_mode: Optional[str] = Query(
+        None, description="Heading detection mode: 'nlp', 'layout' or 'auto' (default from settings)"
+    ),
+    no_cache: bool = Query(False, description="Bypass the LLM response cache for this request"),
+    code_candidates: Optional[int] = Query(
+        None, ge=1, le=8, description="Code candidates generated in parallel, first valid wins (default from settings)"
+    ),
 ):
     """
     Upload a PDF, run the unified Extract+Code Crew flow, and return the generated code.
     """
+    validate_heading_mode(heading_mode)
+
     # 1️⃣ Save the uploaded PDF
-    downloads_dir = os.path.join(settings.USER_WORKDIR, "downloads")
-    os.makedirs(downloads_dir, exist_ok=True)
-    pdf_path = os.path.join(downloads_dir, file.filename)
-    try:
-        content = await file.read()
-        with open(pdf_path, "wb") as f:
-            f.write(content)
-        logger.info(f"[CODER] Saved PDF to {pdf_path}")
-    except Exception as e:
-        logger.error(f"[CODER] Failed saving PDF: {e}")
-        raise HTTPException(status_code=500, detail="Could not save uploaded PDF.")
+    pdf_path, content_hash = await save_upload(file)
 
     # 2️⃣ Execute unified Extract+Code flow
-    flow = CodingFlow()
-    flow.inputs = {"pdf_path": pdf_path}
+    inputs = {
+        "pdf_path": pdf_path,
+        "heading_mode": heading_mode,
+        "content_hash": content_hash,
+        "code_candidates": code_candidates,
+    }
 
     try:
-        result: GeneratedCode = await asyncio.to_thread(flow.kickoff)
+        async with coding_jobs.slot():
+            with llm_cache_bypass(no_cache):
+                result: GeneratedCode = await asyncio.to_thread(run_coding_flow, inputs)
         logger.info(f"[CODER] Generated code file: {result.filename}")
     except Exception as e:
         logger.exception("[CODER] Flow execution failed")
         raise HTTPException(status_code=500, detail=str(e))
 
     return result
+
+
+@router.post("/process/stream")
+async def process_pdf_and_stream_code(
+    request: Request,
+    file: UploadFile = File(..., description="PDF to convert into trading algorithm"),
+    heading_mode: Optional[str] = Query(None, description="Heading detection mode: 'nlp', 'layout' or 'auto'"),
+    no_cache: bool = Query(False, description="Bypass the LLM response cache for this request"),
+):
+    """
+    Same as /coder/process, but answers with a Server-Sent Events stream:
+    `stage` events at each stage transition, `token` events carrying the
+    generated code as the model writes it, `analysis` events with the static
+    analyser's findings, then a final `result` (GeneratedCode) or `error` event.
+    The flow is cancelled at its next stage boundary if the client disconnects.
+    """
+    validate_heading_mode(heading_mode)
+    pdf_path, content_hash = await save_upload(file)
+
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def sink(event: str, data: dict):
+        # Called from the flow's worker thread
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    inputs = {"pdf_path": pdf_path, "heading_mode": heading_mode, "content_hash": content_hash, "stream": True}
+    cancel = threading.Event()
+
+    async def run_flow():
+        try:
+            await events.put(("stage", {"stage": "queued"}))
+            async with coding_jobs.slot():
+                if cancel.is_set():
+                    logger.info("[CODER] Client left while the stream was queued, flow not started")
+                    return
+                with llm_cache_bypass(no_cache):
+                    result: GeneratedCode = await asyncio.to_thread(
+                        run_coding_flow, inputs, event_sink=sink, cancel_event=cancel
+                    )
+            logger.info(f"[CODER] Streamed code file: {result.filename}")
+            await events.put(("result", result.model_dump()))
+        except JobCancelled:
+            logger.info("[CODER] Streaming flow cancelled")
+        except Exception as e:
+            logger.exception("[CODER] Streaming flow execution failed")
+            await events.put(("error", {"detail": str(e)}))
+        finally:
+            await events.put((None, None))
+
+    flow_task = asyncio.create_task(run_flow())
+
+    async def event_stream():
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(events.get(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    continue
+                if event is None:
+                    break
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            # Client gone (disconnect, or the response task cancelled): stop the flow
+            if not flow_task.done():
+                cancel.set()
+                logger.info("[CODER] Stream client disconnected, cancelling its flow")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_coding_job(
+    file: UploadFile = File(..., description="PDF to convert into trading algorithm"),
+    heading_mode: Optional[str] = Query(None, description="Heading detection mode: 'nlp', 'layout' or 'auto'"),
+    no_cache: bool = Query(False, description="Bypass the LLM response cache for this job"),
+    code_candidates: Optional[int] = Query(
+        None, ge=1, le=8, description="Code candidates generated in parallel, first valid wins (default from settings)"
+    ),
+):
+    """
+    Queue an Extract+Code flow and return its job id immediately.
+    At most `max_concurrent_flows` flows run at once; the rest wait in the queue.
+    """
+    validate_heading_mode(heading_mode)
+    pdf_path, content_hash = await save_upload(file)
+    job = coding_jobs.submit({
+        "file": os.path.basename(pdf_path),
+        "pdf_path": pdf_path,
+        "content_hash": content_hash,
+        "heading_mode": heading_mode,
+        "no_cache": no_cache,
+        "code_candidates": code_candidates,
+    })
+    return JobStatus.from_record(job)
+
+
+@router.get("/jobs", response_model=List[JobStatus])
+def list_coding_jobs(limit: int = Query(100, ge=1, le=1000)):
+    """
+    List coding jobs, newest first.
+    """
+    return [JobStatus.from_record(job) for job in coding_jobs.store.list("coding", limit)]
+
+
+def _get_coding_job(job_id: str) -> dict:
+    job = coding_jobs.store.get(job_id)
+    if job is None or job["kind"] != "coding":
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+def get_coding_job(job_id: str):
+    """
+    Status of a coding job.
+    """
+    return JobStatus.from_record(_get_coding_job(job_id))
+
+
+@router.get("/jobs/{job_id}/result", response_model=GeneratedCode)
+def get_coding_job_result(job_id: str):
+    """
+    Generated code of a finished job; 409 while it is still queued or running.
+    """
+    job = _get_coding_job(job_id)
+    if job["status"] not in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if job["status"] != DONE:
+        raise HTTPException(status_code=409, detail=job["error"] or f"Job {job['status']}")
+    return GeneratedCode.model_validate(job["result"])
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobStatus)
+async def cancel_coding_job(job_id: str):
+    """
+    Cancel a queued job, or stop a running one at its next stage boundary.
+    """
+    job = _get_coding_job(job_id)
+    if job["status"] in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    if not coding_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not active in this process")
+    logger.info(f"[CODER] Cancellation requested for job {job_id}")
+    return JobStatus.from_record(coding_jobs.store.get(job_id))
+
+
+@router.post("/batch", response_model=BatchStatus, status_code=202)
+async def process_batch(
+    files: Optional[List[UploadFile]] = File(None, description="PDFs to convert into trading algorithms"),
+    folder: Optional[str] = Form(
+        None, description="Folder under USER_WORKDIR/articles whose PDFs should be processed ('' for the root)"
+    ),
+    heading_mode: Optional[str] = Query(None, description="Heading detection mode: 'nlp', 'layout' or 'auto'"),
+):
+    """
+    Start a batch run over uploaded PDFs and/or a folder of articles.
+    Returns immediately; poll /coder/batch/{batch_id} for per-document progress.
+    Generated code is written to the codes folder.
+    """
+    validate_heading_mode(heading_mode)
+
+    pdf_paths = [(await save_upload(f))[0] for f in files or []]
+
+    if folder is not None:
+        articles_root = os.path.realpath(ARTICLES_DIR)
+        folder_path = os.path.realpath(os.path.join(articles_root, folder))
+        if os.path.commonpath([articles_root, folder_path]) != articles_root:
+            raise HTTPException(status_code=400, detail="Folder must be inside the articles folder")
+        if not os.path.isdir(folder_path):
+            raise HTTPException(status_code=404, detail=f"Folder not found: {folder}")
+        pdf_paths += [
+            os.path.join(folder_path, name)
+            for name in sorted(os.listdir(folder_path))
+            if name.lower().endswith(".pdf") and os.path.isfile(os.path.join(folder_path, name))
+        ]
+
+    if not pdf_paths:
+        raise HTTPException(status_code=400, detail="No PDFs to process")
+
+    return start_batch(pdf_paths, heading_mode)
+
+
+@router.get("/batch", response_model=List[BatchStatus])
+def list_batch_runs():
+    """
+    List batch runs started since the server came up, newest first.
+    """
+    return list_batches()
+
+
+@router.get("/batch/{batch_id}", response_model=BatchStatus)
+def get_batch_status(batch_id: str):
+    """
+    Per-document progress of a batch run.
+    """
+    batch = get_batch(batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return batch
+
+
+@router.post("/validate", response_model=JobStatus, status_code=202)
+async def validate_codes_folder(
+    folder: str = Query("", description="Folder under USER_WORKDIR/codes to validate ('' for the root)"),
+    sandbox: bool = Query(False, description="Also run files that pass the static checks in the Lean stub sandbox"),
+    force: bool = Query(False, description="Re-check files whose content was validated before"),
+    workers: Optional[int] = Query(None, ge=1, le=32, description="Worker processes (default from settings)"),
+):
+    """
+    Queue a sweep of every .py file in a codes folder, checked across a
+    process pool with the checks of CodeValidationTool, and return its job
+    id immediately. Results are cached by file content hash, so unchanged
+    files are reported from the cache.
+    """
+    codes_root = os.path.realpath(CODES_DIR)
+    folder_path = os.path.realpath(os.path.join(codes_root, folder))
+    if os.path.commonpath([codes_root, folder_path]) != codes_root:
+        raise HTTPException(status_code=400, detail="Folder must be inside the codes folder")
+    if not os.path.isdir(folder_path):
+        raise HTTPException(status_code=404, detail=f"Folder not found: {folder}")
+
+    job = validation_jobs.submit({
+        "file": folder or "codes",
+        "folder_path": folder_path,
+        "sandbox": sandbox,
+        "force": force,
+        "workers": workers,
+    })
+    return JobStatus.from_record(job)
+
+
+def _get_validation_job(job_id: str) -> dict:
+    job = validation_jobs.store.get(job_id)
+    if job is None or job["kind"] != "validation":
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/validate/{job_id}", response_model=JobStatus)
+def get_validation_job(job_id: str):
+    """
+    Status of a validation sweep.
+    """
+    return JobStatus.from_record(_get_validation_job(job_id))
+
+
+@router.get("/validate/{job_id}/result", response_model=FolderValidation)
+def get_validation_result(job_id: str):
+    """
+    Report of a finished validation sweep; 409 while it is still queued or running.
+    """
+    job = _get_validation_job(job_id)
+    if job["status"] not in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if job["status"] != DONE:
+        raise HTTPException(status_code=409, detail=job["error"] or f"Job {job['status']}")
+    return FolderValidation.model_validate(job["result"])
+
+
+@router.post("/validate/{job_id}/cancel", response_model=JobStatus)
+async def cancel_validation_job(job_id: str):
+    """
+    Cancel a queued sweep, or stop a running one after the files being checked.
+    """
+    job = _get_validation_job(job_id)
+    if job["status"] in FINISHED_STATES:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    if not validation_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not active in this process")
+    logger.info(f"[CODER] Cancellation requested for validation job {job_id}")
+    return JobStatus.from_record(validation_jobs.store.get(job_id))
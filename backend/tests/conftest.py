@@ -0,0 +1,19 @@
+# tests/conftest.py
+#
+# Settings are read once at import, so the environment is set up here, before
+# any app module is imported: a throwaway USER_WORKDIR, no startup warm-up and
+# no crewai telemetry.
+#
+#   cd backend && python -m pytest -q tests
+
+import os
+import sys
+import tempfile
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ["USER_WORKDIR"] = tempfile.mkdtemp(prefix="qcfs-tests-")
+os.environ["WARM_UP_ON_STARTUP"] = "false"
+os.environ["OTEL_SDK_DISABLED"] = "true"
+os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,47 @@
+# tests/test_coding_flow.py
+
+import threading
+
+import pytest
+
+import flows.code
+from core.jobs import JobCancelled
+from flows.code import CodingFlow
+
+
+def test_each_flow_run_builds_its_own_agents():
+    first, second = CodingFlow(), CodingFlow()
+
+    agent = first._agent("code_generator_agent")
+    assert first._agent("code_generator_agent") is agent
+    assert second._agent("code_generator_agent") is not agent
+
+
+def test_cancel_stops_the_code_stream_mid_generation(monkeypatch):
+    produced, closed = [], []
+
+    class FakeLLM:
+        def stream(self, messages, **params):
+            try:
+                for i in range(1000):
+                    produced.append(i)
+                    yield f"token{i} "
+            finally:
+                closed.append(True)
+
+    monkeypatch.setattr(flows.code, "get_llm", lambda role="store": FakeLLM())
+    flow = CodingFlow()
+    flow.cancel_event = threading.Event()
+    tokens = []
+
+    def sink(event, data):
+        tokens.append(data["text"])
+        if len(tokens) == 3:
+            flow.cancel_event.set()  # e.g. the SSE client disconnected
+
+    flow.event_sink = sink
+    with pytest.raises(JobCancelled):
+        flow._stream_code("summary", "algo.py")
+    assert len(tokens) == 3
+    assert len(produced) == 4
+    assert closed == [True]
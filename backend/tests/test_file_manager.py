@@ -0,0 +1,35 @@
+# tests/test_file_manager.py
+
+import asyncio
+import hashlib
+import io
+
+from fastapi import UploadFile
+
+from utils.file_manager import save_uploaded_file
+
+
+def _upload(content: bytes, filename: str, folder: str):
+    return asyncio.run(save_uploaded_file(UploadFile(io.BytesIO(content), filename=filename), folder))
+
+
+def _sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def test_same_name_with_other_content_keeps_the_stored_file(tmp_path):
+    first_path, first_hash = _upload(b"%PDF first paper", "paper.pdf", str(tmp_path))
+    second_path, second_hash = _upload(b"%PDF second paper", "paper.pdf", str(tmp_path))
+
+    assert first_path != second_path
+    assert _sha256(first_path) == first_hash
+    assert _sha256(second_path) == second_hash
+
+
+def test_same_content_is_stored_once(tmp_path):
+    first_path, first_hash = _upload(b"%PDF paper", "paper.pdf", str(tmp_path))
+    second_path, second_hash = _upload(b"%PDF paper", "copy.pdf", str(tmp_path))
+
+    assert (second_path, second_hash) == (first_path, first_hash)
+    assert sorted(p.name for p in tmp_path.iterdir() if not p.name.startswith(".")) == ["paper.pdf"]
@@ -0,0 +1,49 @@
+# tests/test_pdf_loader.py
+
+import pytest
+
+import tools.PDFAnalyserTool
+import tools.pdf_pages
+from benchmarks.bench_pipeline import synthetic_pdf
+from tools.PDFAnalyserTool import PDFLoader
+
+
+@pytest.fixture
+def pdfs(tmp_path):
+    paths = []
+    for pages in (6, 8):
+        path = str(tmp_path / f"synthetic_{pages}p.pdf")
+        synthetic_pdf(path, pages, seed=pages)
+        paths.append(path)
+    return paths
+
+
+def test_parallel_extraction_reuses_one_spawned_pool(monkeypatch, pdfs):
+    monkeypatch.setattr(tools.PDFAnalyserTool.os, "cpu_count", lambda: 2)
+    started = []
+
+    def spy(workers):
+        started.append(tools.pdf_pages.get_extract_pool(workers))
+        return started[-1]
+
+    monkeypatch.setattr(tools.PDFAnalyserTool, "get_extract_pool", spy)
+    serial, parallel = PDFLoader(workers=1), PDFLoader(workers=2, min_parallel_pages=2)
+    try:
+        for path in pdfs:
+            assert parallel.load_pdf_with_layout(path) == serial.load_pdf_with_layout(path)
+    finally:
+        tools.pdf_pages.shutdown_extract_pools()
+
+    assert len(started) == 2 and started[0] is started[1]
+    assert started[0]._mp_context.get_start_method() == "spawn"
+
+
+def test_single_cpu_extracts_sequentially(monkeypatch, pdfs):
+    monkeypatch.setattr(tools.PDFAnalyserTool.os, "cpu_count", lambda: 1)
+
+    def no_pool(workers):
+        raise AssertionError("a pool was started on a single CPU")
+
+    monkeypatch.setattr(tools.PDFAnalyserTool, "get_extract_pool", no_pool)
+    text = PDFLoader(workers=4, min_parallel_pages=2).load_pdf(pdfs[0])
+    assert text.count("\n") >= 6
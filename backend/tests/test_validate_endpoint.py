@@ -0,0 +1,56 @@
+# tests/test_validate_endpoint.py
+
+import os
+import time
+
+from fastapi.testclient import TestClient
+
+from core.jobs import FINISHED_STATES
+from main import app
+from tools.bulk_validator import CODES_DIR
+
+VALID = '''from AlgorithmImports import *
+
+class Algo(QCAlgorithm):
+    def Initialize(self):
+        self.symbol = self.AddEquity("SPY").Symbol
+
+    def OnData(self, data):
+        if not self.Portfolio.Invested:
+            self.SetHoldings(self.symbol, 1)
+'''
+
+
+def _wait(client: TestClient, job_id: str) -> dict:
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        job = client.get(f"/coder/validate/{job_id}").json()
+        if job["status"] in FINISHED_STATES:
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"validation job {job_id} did not finish")
+
+
+def test_validate_queues_a_job_and_reports_the_folder():
+    folder = os.path.join(CODES_DIR, "validate-endpoint")
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, "valid.py"), "w") as f:
+        f.write(VALID)
+    with open(os.path.join(folder, "broken.py"), "w") as f:
+        f.write("x = (\n")
+
+    with TestClient(app) as client:
+        response = client.post("/coder/validate", params={"folder": "validate-endpoint", "workers": 1})
+        assert response.status_code == 202, response.text
+        job = _wait(client, response.json()["job_id"])
+        assert job["status"] == "done", job
+
+        report = client.get(f"/coder/validate/{job['job_id']}/result").json()
+        assert report["total"] == 2
+        assert {r["file"]: r["ok"] for r in report["results"]} == {"broken.py": False, "valid.py": True}
+
+
+def test_validate_rejects_folders_outside_codes():
+    with TestClient(app) as client:
+        response = client.post("/coder/validate", params={"folder": "../.."})
+        assert response.status_code == 400
@@ -8,6 +8,9 @@ from pydantic import BaseModel
 
 from crewai.tools import BaseTool
 
+from core.config import settings
+from tools.lean_sandbox import run_sandbox_file
+
 LEAN_FOLDER = "/home/slmar/projects/lean/Algorithm.Python"
 
 class LeanBacktestInput(BaseModel):
@@ -15,7 +18,10 @@ class LeanBacktestInput(BaseModel):
 
 class LeanBacktestTool(BaseTool):
     name: str = "lean_backtest"
-    description: str = "Run `lean backtest <file>` inside the project venv and return stdout/stderr."
+    description: str = (
+        "Run `lean backtest <file>` inside the project venv and return stdout/stderr. "
+        "The file is smoke-tested in a stub sandbox first and rejected if it fails."
+    )
     args_schema: Type[BaseModel] = LeanBacktestInput
 
     def _run(self, file_path: str) -> str:
@@ -23,6 +29,11 @@ class LeanBacktestTool(BaseTool):
         if not os.path.exists(script):
             return f"Error: file not found: {script}"
 
+        if settings.sandbox_gate_backtests:
+            report = run_sandbox_file(script)
+            if not report.ok:
+                return f"Sandbox rejected the algorithm before the backtest:\n{report.feedback()}"
+
         venv_bin = os.path.dirname(sys.executable)
         lean = os.path.join(venv_bin, "lean")
         if not os.path.isfile(lean):
@@ -1,29 +1,82 @@
 import logging
+import os
 import re
-from typing import List, Dict, Any, Optional
-from collections import defaultdict
-import pdfplumber
-import spacy
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Tuple
+from collections import Counter, defaultdict
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool
 
+from core.config import settings
+from core.nlp_provider import get_nlp
+from tools.pdf_pages import LineStyle, discard_extract_pool, extract_page_range, get_extract_pool, read_page
+from tools.section_engine import HEADING_MODES, SectionEngine
+from core.section_cache import get_section_cache, file_sha256, make_cache_key
+from core.metrics import stage_timer
+
+# Bump whenever a change to the pipeline alters the produced sections,
+# so entries cached by older versions are no longer hit.
+EXTRACTOR_VERSION = "1.2"
+
 
 # ------------------------------------------------------------------------------
 # Text Extraction Component
 # ------------------------------------------------------------------------------
 
 class PDFLoader:
+    def __init__(self, workers: Optional[int] = None, min_parallel_pages: Optional[int] = None):
+        self.workers = workers if workers is not None else settings.pdf_extract_workers
+        self.min_parallel_pages = (
+            min_parallel_pages if min_parallel_pages is not None else settings.pdf_parallel_min_pages
+        )
+
     def load_pdf(self, pdf_path: str) -> str:
-        text = ""
+        text, _ = self._load(pdf_path, layout=False)
+        return text
+
+    def load_pdf_with_layout(self, pdf_path: str) -> Tuple[str, List[LineStyle]]:
+        """Return the text together with the font style of every line, for layout heading detection."""
+        return self._load(pdf_path, layout=True)
+
+    def _load(self, pdf_path: str, layout: bool) -> Tuple[str, List[LineStyle]]:
+        import pdfplumber  # deferred: pdfminer is slow to import and only needed here
+
         try:
             with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+                page_count = len(pdf.pages)
+                # On a single CPU the workers only take turns, at the cost of
+                # pickling every page back to the parent
+                if self.workers <= 1 or (os.cpu_count() or 1) <= 1 or page_count < self.min_parallel_pages:
+                    pages = [read_page(page, layout) for page in pdf.pages]
+                else:
+                    pages = None
+            if pages is None:
+                pages = self._load_parallel(pdf_path, page_count, layout)
         except Exception as e:
             logging.error(f"[PDFLoader] Failed to load PDF: {e}")
-        return text
+            return "", []
+        text = "".join(t + "\n" for t, _ in pages if t)
+        return text, [style for _, styles in pages for style in styles]
+
+    def _load_parallel(self, pdf_path: str, page_count: int, layout: bool):
+        workers = min(self.workers, page_count)
+        # A few ranges per worker keeps the pool busy when page costs are uneven
+        step = max(1, -(-page_count // (workers * 4)))
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        logging.info(
+            f"[PDFLoader] Extracting {page_count} pages with {workers} workers ({len(ranges)} ranges)"
+        )
+        pool = get_extract_pool(self.workers)
+        futures = [pool.submit(extract_page_range, pdf_path, start, stop, layout) for start, stop in ranges]
+        try:
+            # Futures are consumed in submission order, so pages come back in document order
+            return [page for future in futures for page in future.result()]
+        except BrokenProcessPool:
+            discard_extract_pool(pool)  # a worker died, the next document gets a fresh pool
+            raise
+        finally:
+            for future in futures:
+                future.cancel()  # the rest of a failed document
 
 
 # ------------------------------------------------------------------------------
@@ -31,21 +84,14 @@ class PDFLoader:
 # ------------------------------------------------------------------------------
 
 class TextPreprocessor:
+    """Cleans raw PDF text in a single scan, see `SectionEngine.clean`."""
+
     def __init__(self):
-        self.url_pattern = re.compile(r'https?://\S+')
-        self.phrase_pattern = re.compile(r'Electronic copy available at: .*', re.IGNORECASE)
-        self.number_pattern = re.compile(r'^\d+\s*$', re.MULTILINE)
-        self.multinew_pattern = re.compile(r'\n+')
-        self.header_footer_pattern = re.compile(r'^\s*(Author|Title|Abstract)\s*$', re.MULTILINE | re.IGNORECASE)
+        self.engine = SectionEngine()
 
     def preprocess_text(self, text: str) -> str:
         try:
-            text = self.url_pattern.sub('', text)
-            text = self.phrase_pattern.sub('', text)
-            text = self.number_pattern.sub('', text)
-            text = self.multinew_pattern.sub('\n', text)
-            text = self.header_footer_pattern.sub('', text)
-            return text.strip()
+            return self.engine.clean(text)
         except Exception as e:
             logging.error(f"[TextPreprocessor] Error: {e}")
             return ""
@@ -56,19 +102,37 @@ class TextPreprocessor:
 # ------------------------------------------------------------------------------
 
 class HeadingDetector:
-    def __init__(self, model: str = "en_core_web_sm"):
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        chunk_chars: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        n_process: Optional[int] = None,
+    ):
         try:
-            self.nlp = spacy.load(model)
+            self.nlp = get_nlp(model)
         except Exception as e:
             logging.error(f"[HeadingDetector] Could not load spaCy model: {e}")
             raise
 
+        # Chunks must stay below spaCy's max_length or the pipeline refuses them
+        self.chunk_chars = min(chunk_chars or settings.heading_nlp_chunk_chars, self.nlp.max_length)
+        self.batch_size = batch_size or settings.heading_nlp_batch_size
+        self.n_process = n_process or settings.heading_nlp_n_process
+
         # Fallback regex patterns
         self.section_pattern = re.compile(
             r"^(?:\d{1,2}(\.\d{1,2})*\.?\s*)?[A-Z][A-Za-z\s\-]{3,}$"
         )
 
-    def detect_headings(self, text: str) -> List[str]:
+    def detect_headings(self, text: str, chunked: Optional[bool] = None) -> List[str]:
+        """
+        Detect heading candidates in cleaned text.
+
+        `chunked` streams paragraph-aligned chunks through `nlp.pipe` instead of
+        parsing the whole document at once; by default it is used whenever the
+        text is longer than one chunk.
+        """
         headings = set()
         lines = text.splitlines()
 
@@ -78,49 +142,137 @@ class HeadingDetector:
             if self.section_pattern.match(line):
                 headings.add(line)
 
+        if chunked is None:
+            chunked = len(text) > self.chunk_chars
+
         # NLP fallback: title-like short sentences
         try:
-            doc = self.nlp(text)
-            for sent in doc.sents:
-                sent_text = sent.text.strip()
-                if 2 <= len(sent_text.split()) <= 10 and sent_text.istitle():
-                    headings.add(sent_text)
+            if chunked:
+                docs = self.nlp.pipe(
+                    self._iter_chunks(text),
+                    batch_size=self.batch_size,
+                    n_process=self.n_process,
+                )
+            else:
+                docs = [self.nlp(text)]
+            for doc in docs:
+                headings.update(self._title_sentences(doc))
         except Exception as e:
             logging.warning(f"[HeadingDetector] NLP fallback failed: {e}")
 
         return list(headings)
 
+    def _title_sentences(self, doc) -> List[str]:
+        candidates = []
+        for sent in doc.sents:
+            sent_text = sent.text.strip()
+            if 2 <= len(sent_text.split()) <= 10 and sent_text.istitle():
+                candidates.append(sent_text)
+        return candidates
+
+    def _iter_chunks(self, text: str):
+        """
+        Yield chunks of at most `chunk_chars`, cut on paragraph (line) boundaries
+        so no heading is split across two chunks. A single paragraph longer than
+        a chunk is cut on the last whitespace that fits.
+        """
+        limit = self.chunk_chars
+        start = 0
+        length = len(text)
+        while start < length:
+            end = start + limit
+            if end >= length:
+                yield text[start:]
+                return
+            cut = text.rfind("\n", start, end)
+            if cut <= start:
+                cut = text.rfind(" ", start, end)
+            if cut <= start:
+                cut = end
+            yield text[start:cut]
+            start = cut + 1 if text[cut:cut + 1] in ("\n", " ") else cut
+
+
+# ------------------------------------------------------------------------------
+# Layout-based Heading Detection (no NLP model)
+# ------------------------------------------------------------------------------
+
+class LayoutHeadingDetector:
+    """
+    Detects headings from typesetting alone. Lines are clustered by font style
+    (size rounded to half a point, bold or not); the style covering the most
+    glyphs is body text, and rarely used styles that are larger, or bold at
+    body size, are treated as heading styles.
+    """
+
+    def __init__(self, size_ratio: float = 1.1, max_style_share: float = 0.2, max_words: int = 12):
+        self.size_ratio = size_ratio
+        self.max_style_share = max_style_share
+        self.max_words = max_words
+
+    def detect_headings(self, lines: List[LineStyle]) -> List[str]:
+        glyphs_per_style = Counter()
+        for line in lines:
+            glyphs_per_style[self._style(line)] += line.chars
+        if not glyphs_per_style:
+            return []
+
+        (body_size, body_bold), _ = glyphs_per_style.most_common(1)[0]
+        total = sum(glyphs_per_style.values())
+        heading_styles = {
+            (size, bold)
+            for (size, bold), count in glyphs_per_style.items()
+            if count / total <= self.max_style_share
+            and (size >= body_size * self.size_ratio or (bold and not body_bold and size >= body_size))
+        }
+
+        headings = []
+        for line in lines:
+            if self._style(line) in heading_styles and self._looks_like_heading(line.text):
+                headings.append(line.text)
+        return list(dict.fromkeys(headings))
+
+    def _style(self, line: LineStyle) -> Tuple[float, bool]:
+        return round(line.size * 2) / 2, line.bold
+
+    def _looks_like_heading(self, text: str) -> bool:
+        words = text.split()
+        return (
+            0 < len(words) <= self.max_words
+            and not text.endswith((".", ",", ";"))
+            and any(ch.isalpha() for ch in text)
+        )
+
 
 # ------------------------------------------------------------------------------
 # Section Splitting With Metadata
 # ------------------------------------------------------------------------------
 
 class SectionSplitter:
-    def split_into_sections(self, text: str, headings: List[str]) -> List[Dict[str, Any]]:
-        sections = []
-        current_section = {"heading": "Preamble", "text": "", "position": 0}
-        lines = text.split('\n')
-        position = 1
+    """Splits cleaned text on detected headings, see `SectionEngine.split`."""
 
-        for line in lines:
-            line = line.strip()
-            if line in headings:
-                sections.append(current_section)
-                current_section = {"heading": line, "text": "", "position": position}
-                position += 1
-            else:
-                current_section["text"] += line + " "
+    def __init__(self):
+        self.engine = SectionEngine()
 
-        sections.append(current_section)  # Append last section
-        return sections
+    def split_into_sections(self, text: str, headings: List[str]) -> List[Dict[str, Any]]:
+        return [
+            {"heading": sec.heading, "text": sec.text, "position": sec.position}
+            for sec in self.engine.split(text, headings)
+        ]
 
 
 # ------------------------------------------------------------------------------
 # Input Schema for Tool
 # ------------------------------------------------------------------------------
 
+
 class PDFAnalysisInput(BaseModel):
     pdf_path: str = Field(..., description="The absolute path to the PDF to be analyzed.")
+    heading_mode: Optional[str] = Field(
+        None,
+        description="Heading detection: 'nlp' (regex + spaCy), 'layout' (font metadata only) "
+                    "or 'auto' (layout, falling back to nlp when too few headings are found).",
+    )
 
 
 # ------------------------------------------------------------------------------
@@ -132,32 +284,93 @@ class PDFAnalyserTool(BaseTool):
     description: str = "Parses a PDF, detects sections, and returns structured content with section metadata."
     args_schema: Any = PDFAnalysisInput
 
-    def _run(self, pdf_path: str) -> List[Dict[str, Any]]:
-        logging.info(f"[PDFAnalyserTool] Analyzing PDF: {pdf_path}")
+    def _run(
+        self,
+        pdf_path: str,
+        heading_mode: Optional[str] = None,
+        content_hash: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        heading_mode = heading_mode or settings.heading_mode
+        if heading_mode not in HEADING_MODES:
+            raise ValueError(f"heading_mode must be one of {HEADING_MODES}")
+        logging.info(f"[PDFAnalyserTool] Analyzing PDF: {pdf_path} (headings: {heading_mode})")
+
+        cache_key = None
+        if settings.section_cache_enabled:
+            try:
+                content_hash = content_hash or file_sha256(pdf_path)
+                cache_key = make_cache_key(content_hash, EXTRACTOR_VERSION, self._extraction_config(heading_mode))
+                cached = get_section_cache().get(cache_key)
+                if cached is not None:
+                    logging.info(f"[PDFAnalyserTool] Cache hit for {content_hash[:12]}, skipping extraction")
+                    return cached
+            except Exception as e:
+                logging.warning(f"[PDFAnalyserTool] Section cache unavailable: {e}")
+                cache_key = None
+
+        sections = self._extract(pdf_path, heading_mode)
+
+        if cache_key is not None and sections:
+            try:
+                get_section_cache().put(cache_key, content_hash, EXTRACTOR_VERSION, sections)
+            except Exception as e:
+                logging.warning(f"[PDFAnalyserTool] Could not store sections in cache: {e}")
+        return sections
+
+    def _extraction_config(self, heading_mode: str) -> Dict[str, Any]:
+        """Settings that change the produced sections and therefore belong in the cache key."""
+        config = {"heading_mode": heading_mode}
+        if heading_mode != "layout":
+            config["spacy_model"] = settings.spacy_model
+            config["heading_nlp_chunk_chars"] = settings.heading_nlp_chunk_chars
+        if heading_mode != "nlp":
+            config["layout_min_headings"] = settings.layout_min_headings
+        return config
+
+    def _extract(self, pdf_path: str, heading_mode: str) -> List[Dict[str, Any]]:
         loader = PDFLoader()
-        preprocessor = TextPreprocessor()
-        heading_detector = HeadingDetector()
-        splitter = SectionSplitter()
+        engine = SectionEngine()
+
+        if heading_mode == "nlp":
+            with stage_timer("pdf_load"):
+                raw_text = loader.load_pdf(pdf_path)
+            clean_text = engine.clean(raw_text)
+            with stage_timer("headings", model=settings.spacy_model):
+                headings = HeadingDetector().detect_headings(clean_text)
+        else:
+            with stage_timer("pdf_load", model="layout"):
+                raw_text, line_styles = loader.load_pdf_with_layout(pdf_path)
+            clean_text = engine.clean(raw_text)
+            with stage_timer("headings", model="layout") as stage:
+                headings = LayoutHeadingDetector().detect_headings(line_styles)
+                if heading_mode == "auto" and len(headings) < settings.layout_min_headings:
+                    logging.info(
+                        f"[PDFAnalyserTool] Layout found {len(headings)} headings, falling back to NLP detection"
+                    )
+                    stage.model = settings.spacy_model
+                    headings = HeadingDetector().detect_headings(clean_text)
 
-        raw_text = loader.load_pdf(pdf_path)
-        clean_text = preprocessor.preprocess_text(raw_text)
-        headings = heading_detector.detect_headings(clean_text)
-        sections = splitter.split_into_sections(clean_text, headings)
+        with stage_timer("section_split"):
+            sections = engine.split(clean_text, headings)
 
         logging.info(f"[PDFAnalyserTool] Extracted {len(sections)} sections.")
         return [
             {
-                "heading": sec["heading"],
-                "position": sec["position"],
-                "text": sec["text"].strip(),
-                "type_hint": self._guess_type(sec["heading"])
+                "heading": sec.heading,
+                "position": sec.position,
+                "text": sec.text,
+                "type_hint": self._guess_type(sec.heading)
             }
-            for sec in sections if sec["text"].strip()
+            for sec in sections if sec.text
         ]
 
     def _guess_type(self, heading: str) -> str:
         lower = heading.lower()
-        if "intro" in lower:
+        if "reference" in lower or "bibliograph" in lower:
+            return "references"
+        elif "appendix" in lower:
+            return "appendix"
+        elif "intro" in lower:
             return "background"
         elif "method" in lower or "approach" in lower:
             return "methodology"
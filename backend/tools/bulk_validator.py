@@ -0,0 +1,244 @@
+# tools/bulk_validator.py
+#
+# Validates every generated algorithm in a folder across a process pool, with
+# the checks of CodeValidationTool and optionally a Lean sandbox run. Results
+# are cached by file content hash, so a repeat sweep only re-checks files that
+# changed (or all of them after a change to the checks themselves). The API
+# runs sweeps as `validation` jobs of the job queue.
+#
+#   cd backend && python -m tools.bulk_validator                 # USER_WORKDIR/codes
+#   cd backend && python -m tools.bulk_validator some/dir --sandbox --workers 8 --failed-only
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.config import settings
+from core.jobs import JobCancelled, JobQueue
+from core.validation_cache import get_validation_cache, make_validation_key
+from models.analysis_models import AnalysisReport
+from models.sandbox_models import SandboxReport
+from models.validation_models import FileValidation, FolderValidation
+from tools.qc_analyser import validate_code
+
+logger = logging.getLogger(__name__)
+
+CODES_DIR = os.path.join(settings.USER_WORKDIR, "codes")
+# Bump when the checks change in a way the settings below do not capture
+VALIDATOR_VERSION = "2"
+
+
+def validation_config(sandbox: bool) -> Dict[str, Any]:
+    """Everything besides the file content that decides a validation result."""
+    return {
+        "version": VALIDATOR_VERSION,
+        "static_analysis": settings.code_static_analysis,
+        "sandbox": sandbox,
+        "sandbox_bars": settings.sandbox_bars if sandbox else None,
+    }
+
+
+def find_code_files(folder: str) -> List[str]:
+    """Python files under `folder`, recursively, as paths relative to it."""
+    files = []
+    for root, dirs, names in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith((".", "__")))
+        files += [
+            os.path.relpath(os.path.join(root, name), folder) for name in sorted(names) if name.endswith(".py")
+        ]
+    return files
+
+
+def _validate_source(code: str, sandbox: bool) -> Dict[str, Any]:
+    """Worker: static checks, then the sandbox run only for code that passed them."""
+    analysis = validate_code(code)
+    result: Dict[str, Any] = {"ok": analysis.ok, "analysis": analysis.model_dump(), "sandbox": None}
+    if sandbox and analysis.ok:
+        from tools.lean_sandbox import run_sandbox  # deferred: only sweeps with --sandbox need it
+
+        report = run_sandbox(code)
+        result["ok"] = report.ok
+        result["sandbox"] = report.model_dump()
+    return result
+
+
+def _to_file_result(file: str, content_hash: str, result: Dict[str, Any], cached: bool, duration_ms: float):
+    return FileValidation(
+        file=file,
+        sha256=content_hash,
+        ok=result["ok"],
+        cached=cached,
+        analysis=AnalysisReport(**result["analysis"]),
+        sandbox=SandboxReport(**result["sandbox"]) if result["sandbox"] else None,
+        duration_ms=duration_ms,
+    )
+
+
+def validate_folder(
+    folder: str,
+    workers: Optional[int] = None,
+    sandbox: bool = False,
+    force: bool = False,
+    cancel_event: Optional[threading.Event] = None,
+) -> FolderValidation:
+    """
+    Validate every .py file under `folder`. Cached results are reused unless
+    `force` is set; the rest are checked in `workers` processes. Setting
+    `cancel_event` stops the sweep between files with JobCancelled.
+    """
+    started = time.perf_counter()
+    workers = workers or settings.bulk_validation_workers
+    config = validation_config(sandbox)
+    use_cache = settings.validation_cache_enabled
+    cache = get_validation_cache() if use_cache else None
+
+    results: Dict[str, FileValidation] = {}
+    pending: List[Tuple[str, str, str, str]] = []  # (file, sha256, cache key, code)
+    for file in find_code_files(folder):
+        try:
+            with open(os.path.join(folder, file), "rb") as f:
+                raw = f.read()
+            code = raw.decode("utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            results[file] = FileValidation(file=file, sha256="", ok=False, error=f"Could not read file: {e}")
+            continue
+        content_hash = hashlib.sha256(raw).hexdigest()
+        key = make_validation_key(content_hash, config)
+        cached = cache.get(key) if cache is not None and not force else None
+        if cached is not None:
+            results[file] = _to_file_result(file, content_hash, cached, cached=True, duration_ms=0.0)
+        else:
+            pending.append((file, content_hash, key, code))
+
+    def finish(file, content_hash, key, result, duration_ms):
+        # A sandbox timeout says more about the load on the machine than about the file
+        if cache is not None and not (result["sandbox"] or {}).get("timed_out"):
+            cache.put(key, content_hash, result)
+        results[file] = _to_file_result(file, content_hash, result, cached=False, duration_ms=duration_ms)
+
+    logger.info(
+        f"[BulkValidator] {len(results) + len(pending)} files in {folder}: "
+        f"{len(pending)} to check with {min(workers, max(1, len(pending)))} workers"
+    )
+    def check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            logger.info(f"[BulkValidator] Sweep of {folder} cancelled after {len(results)} files")
+            raise JobCancelled()
+
+    if workers <= 1 or len(pending) <= 1:
+        for file, content_hash, key, code in pending:
+            check_cancelled()
+            file_started = time.perf_counter()
+            finish(file, content_hash, key, _validate_source(code, sandbox), (time.perf_counter() - file_started) * 1000)
+    elif pending:
+        # Spawned, not forked: the server process has threads (the event loop,
+        # the flows' worker threads) whose locks a forked child would inherit
+        pool = ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)), mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            submitted = {
+                pool.submit(_validate_source, code, sandbox): (file, content_hash, key, time.perf_counter())
+                for file, content_hash, key, code in pending
+            }
+            for future in as_completed(submitted):
+                check_cancelled()
+                file, content_hash, key, file_started = submitted[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"[BulkValidator] {file} could not be validated: {e}")
+                    results[file] = FileValidation(file=file, sha256=content_hash, ok=False, error=str(e))
+                    continue
+                # Includes time spent queued behind other files
+                finish(file, content_hash, key, result, (time.perf_counter() - file_started) * 1000)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    ordered = [results[file] for file in sorted(results)]
+    passed = sum(r.ok for r in ordered)
+    return FolderValidation(
+        folder=folder,
+        total=len(ordered),
+        passed=passed,
+        failed=len(ordered) - passed,
+        cached=sum(r.cached for r in ordered),
+        duration_ms=round((time.perf_counter() - started) * 1000, 1),
+        results=ordered,
+    )
+
+
+async def _run_validation_job(job_id: str, params: Dict[str, Any], cancel: threading.Event) -> Dict[str, Any]:
+    report = await asyncio.to_thread(
+        validate_folder,
+        params["folder_path"],
+        workers=params.get("workers"),
+        sandbox=params.get("sandbox", False),
+        force=params.get("force", False),
+        cancel_event=cancel,
+    )
+    logger.info(
+        f"[BulkValidator] Job {job_id}: {report.total} files in {params['file']}: "
+        f"{report.failed} failed, {report.cached} cached"
+    )
+    return report.model_dump()
+
+
+# Sweeps from the API run as jobs, one at a time: each already spreads over
+# bulk_validation_workers processes
+validation_jobs = JobQueue("validation", _run_validation_job, 1)
+
+
+def _describe(result: FileValidation) -> str:
+    if result.error:
+        return f"  {result.error}"
+    lines = [f"  - [{f.severity}] {f.message}" + (f" (line {f.line})" if f.line else "")
+             for f in (result.analysis.findings if result.analysis else [])]
+    if result.sandbox is not None and not result.sandbox.ok:
+        lines += ["  sandbox:"] + ["  " + line for line in result.sandbox.feedback().splitlines()]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate every generated algorithm in a folder")
+    parser.add_argument("folder", nargs="?", default=CODES_DIR, help="folder to sweep (default: USER_WORKDIR/codes)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default from settings)")
+    parser.add_argument("--sandbox", action="store_true", help="also run files that pass in the Lean stub sandbox")
+    parser.add_argument("--force", action="store_true", help="ignore cached results")
+    parser.add_argument("--failed-only", action="store_true", help="only list files that failed")
+    parser.add_argument("--json", help="also write the full report as JSON to this file")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.folder):
+        parser.error(f"not a folder: {args.folder}")
+
+    report = validate_folder(args.folder, workers=args.workers, sandbox=args.sandbox, force=args.force)
+    for result in report.results:
+        if result.ok and args.failed_only:
+            continue
+        status = "ok  " if result.ok else "FAIL"
+        print(f"{status} {result.file}{' (cached)' if result.cached else ''}")
+        if not result.ok or result.analysis and result.analysis.findings:
+            print(_describe(result))
+    print(
+        f"\n{report.total} files: {report.passed} passed, {report.failed} failed, "
+        f"{report.cached} from cache, {report.duration_ms / 1000:.2f}s"
+    )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(report.model_dump_json(indent=2))
+        print(f"Saved {args.json}")
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
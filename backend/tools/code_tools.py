@@ -1,10 +1,14 @@
-import ast
 import logging
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
 from crewai.tools import BaseTool
 
+from core.config import settings
+from models.analysis_models import AnalysisReport
+from tools.qc_analyser import analyse_algorithm, validate_code
+from tools.section_ranker import select_sections
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,20 +37,32 @@ class ValidationInput(BaseModel):
 # TOOL IMPLEMENTATIONS
 # -------------------------------
 class SummaryTool(BaseTool):
-    """Formats structured PDF sections into a Markdown string."""
+    """Formats the most relevant structured PDF sections into a Markdown string."""
     name: str = "SummaryTool"
     description: str = "Formats sections into a single markdown string for summary agents"
     args_schema: type = SummaryInput
 
-    def _run(self, sections: List[Dict[str, Any]]) -> str:
+    def _run(self, sections: List[Dict[str, Any]], token_budget: Optional[int] = None) -> str:
         if not isinstance(sections, list):
             raise ValueError("SummaryTool expected a list of sections.")
 
-        output = []
+        valid = []
         for idx, section in enumerate(sections):
             if not isinstance(section, dict):
                 logger.warning(f"Skipping invalid section at index {idx}: {section}")
                 continue
+            valid.append(section)
+
+        # Rank sections and keep what fits the token budget (0 disables the cut)
+        budget = settings.summary_token_budget if token_budget is None else token_budget
+        if budget > 0:
+            selected = select_sections(valid, budget)
+            logger.info(f"SummaryTool kept {len(selected)}/{len(valid)} sections within {budget} tokens")
+        else:
+            selected = valid
+
+        output = []
+        for idx, section in enumerate(selected):
             heading = section.get("heading", f"Section {idx + 1}")
             text = section.get("text", "")
             output.append(f"### {heading}\n{text}")
@@ -74,18 +90,31 @@ class CodeGenerationTool(BaseTool):
 
 
 class CodeValidationTool(BaseTool):
-    """Validates Python code syntax using AST parsing."""
+    """
+    Validates QuantConnect Python code locally: syntax via AST parsing and,
+    with code_static_analysis on, the QuantConnect checks of tools/qc_analyser.
+    Returns 'ok' or the findings as text.
+    """
     name: str = "CodeValidationTool"
     description: str = "Validates Python code using AST"
     args_schema: type = ValidationInput
 
     def _run(self, code: str) -> str:
-        try:
-            ast.parse(code)
-            return "ok"
-        except SyntaxError as e:
-            logger.error(f"Syntax error during AST validation: {e}")
-            return f"SyntaxError: {e.msg} at line {e.lineno}, column {e.offset}"
-        except Exception as e:
-            logger.exception("Unexpected error during code validation")
-            return f"Validation failed: {str(e)}"
+        report = self.report(code)
+        return "ok" if report.ok else report.feedback()
+
+    def report(self, code: str) -> AnalysisReport:
+        return validate_code(code)
+
+
+class QCStaticAnalysisTool(BaseTool):
+    """Runs the deterministic QuantConnect static analyser and returns its report as JSON."""
+    name: str = "QCStaticAnalysisTool"
+    description: str = (
+        "Checks QuantConnect Python code without running it: QCAlgorithm subclass, Initialize/OnData, "
+        "reachable order calls, indicator registration and warm-up, undefined names"
+    )
+    args_schema: type = ValidationInput
+
+    def _run(self, code: str) -> str:
+        return analyse_algorithm(code).model_dump_json()
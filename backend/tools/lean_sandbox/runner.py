@@ -0,0 +1,271 @@
+# tools/lean_sandbox/runner.py
+#
+# Subprocess entry point of the Lean sandbox: applies resource limits, loads
+# the algorithm against the stub AlgorithmImports, feeds it synthetic daily
+# bars and writes a JSON report. Started by tools.lean_sandbox.run_sandbox:
+#
+#   python -I runner.py <algorithm.py> <report.json> --bars 252 --seed 7 --cpu 10 --memory-mb 1024
+
+import argparse
+import ast
+import importlib.util
+import inspect
+import io
+import json
+import os
+import sys
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import timedelta
+from typing import Optional, Set
+
+STUBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stubs")
+MAX_ORDERS_REPORTED = 50
+MAX_LOGS_REPORTED = 50
+
+
+def _limit_resources(cpu_seconds: int, memory_mb: int):
+    try:
+        import resource
+    except ImportError:  # not available on Windows; the parent's timeout still applies
+        return
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+
+
+def synthetic_bars(count: int, seed: int, start_price: float = 100.0):
+    """Geometric random walk of daily OHLCV rows, as an array of shape (count, 5)."""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.012, count)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.006, count)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.integers(500_000, 5_000_000, count).astype(float)
+    return np.column_stack((open_, high, low, close, volume))
+
+
+def _error(stage: str, exc: BaseException):
+    frames = traceback.extract_tb(exc.__traceback__)
+    # Keep the frames of the algorithm itself, not of the runner or the stubs
+    user_frames = [f for f in frames if os.path.basename(f.filename) == "algorithm.py"] or frames[-1:]
+    return {
+        "stage": stage,
+        "type": type(exc).__name__,
+        "message": str(exc),
+        "line": exc.lineno if isinstance(exc, SyntaxError) else user_frames[-1].lineno if user_frames else None,
+        "traceback": "".join(
+            traceback.format_exception_only(exc) if isinstance(exc, SyntaxError)
+            else traceback.format_list(user_frames[-5:])
+        ),
+    }
+
+
+def _unsupported_api(exc: BaseException, algorithm_path: str, lean) -> Optional[str]:
+    """
+    The Lean API an exception shows the stubs to lack, e.g. "QCAlgorithm.SetOptionChainProvider",
+    or None for an error of the algorithm itself. Gaps are missing attributes
+    of stub objects, PascalCase names AlgorithmImports would provide, and
+    names missing on the algorithm (or a model) that its own code never sets.
+    """
+    if isinstance(exc, NameError) and not isinstance(exc, UnboundLocalError):
+        name = getattr(exc, "name", None)
+        return name if name and name[:1].isupper() else None
+    if not isinstance(exc, AttributeError) or getattr(exc, "name", None) is None:
+        return None
+    name, obj = exc.name, getattr(exc, "obj", None)
+    owner = obj if isinstance(obj, type) else type(obj)
+    stub = next((c for c in owner.__mro__ if c.__module__ == lean.__name__), None)
+    if stub is None:
+        return None
+    if owner is not stub and not name[:1].isupper() and name in _own_names(algorithm_path):
+        return None  # an attribute the algorithm sets itself, used before it is set
+    return f"{stub.__name__}.{name}"
+
+
+def _own_names(algorithm_path: str) -> Set[str]:
+    """Attributes the algorithm assigns and the functions and classes it defines."""
+    with open(algorithm_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Store):
+            names.add(node.attr)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+    return names
+
+
+def _method(algorithm, *names):
+    for name in names:
+        method = getattr(type(algorithm), name, None)
+        if method is not None:
+            return getattr(algorithm, name)
+    return None
+
+
+def _call_model(model, name: str, *args):
+    """Call a framework model method, preferring the snake_case one a Python model defines itself."""
+    snake = "".join("_" + c.lower() if c.isupper() else c for c in name).lstrip("_")
+    method = _method(model, snake, name)
+    if method is None:
+        raise TypeError(f"{type(model).__name__} does not define {name}()")
+    return method(*args)
+
+
+def _run_framework(algorithm, data_slice):
+    """One bar of the algorithm framework: alphas, portfolio construction, risk management, execution."""
+    insights = []
+    for model in algorithm._alphas:
+        insights += list(_call_model(model, "Update", algorithm, data_slice) or [])
+    insights += getattr(algorithm, "sandbox_insights", [])
+    algorithm.sandbox_insights = []
+
+    targets = list(_call_model(algorithm._portfolio_construction, "CreateTargets", algorithm, insights) or [])
+    for model in algorithm._risk_management:
+        # Risk models return adjusted targets, which replace those for the same symbol
+        adjusted = {t.Symbol: t for t in _call_model(model, "ManageRisk", algorithm, targets) or []}
+        targets = [adjusted.pop(t.Symbol, t) for t in targets] + list(adjusted.values())
+    _call_model(algorithm._execution, "Execute", algorithm, targets)
+
+
+def run(algorithm_path: str, bars: int, seed: int) -> dict:
+    sys.path.insert(0, STUBS_DIR)
+    import AlgorithmImports as lean
+
+    report = {
+        "initialized": False, "bars_processed": 0, "errors": [], "orders": [], "order_count": 0, "unsupported_api": [],
+    }
+    started = time.perf_counter()
+    output = io.StringIO()
+    algorithm = None
+    stage = "import"
+    try:
+        with redirect_stdout(output), redirect_stderr(output):
+            spec = importlib.util.spec_from_file_location("algorithm", algorithm_path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+
+            classes = [
+                cls for _, cls in inspect.getmembers(module, inspect.isclass)
+                if issubclass(cls, lean.QCAlgorithm) and cls is not lean.QCAlgorithm
+                and cls.__module__ == module.__name__
+            ]
+            if not classes:
+                raise TypeError("No class deriving from QCAlgorithm was found")
+            report["algorithm_class"] = classes[0].__name__
+
+            stage = "Initialize"
+            algorithm = classes[0]()
+            initialize = _method(algorithm, "Initialize", "initialize")
+            if initialize is None:
+                raise AttributeError(f"{classes[0].__name__} does not define Initialize()")
+            initialize()
+            report["initialized"] = True
+
+            if not algorithm.Securities and algorithm.sandbox_unsimulated:
+                algorithm.AddEquity("SPY")  # universe selection is not run: SPY stands in for its picks
+            if algorithm._alphas:
+                stage = "OnSecuritiesChanged"
+                changes = lean.SecurityChanges(list(algorithm.Securities.values()), [])
+                for model in algorithm._alphas + [algorithm._portfolio_construction]:
+                    _call_model(model, "OnSecuritiesChanged", algorithm, changes)
+
+            stage = "OnData"
+            on_data = _method(algorithm, "OnData", "on_data")
+            data = synthetic_bars(bars, seed)
+            symbols = list(algorithm.Securities) or [lean.Symbol("SPY")]
+            algorithm.sandbox_history = []
+            for i, (open_, high, low, close, volume) in enumerate(data):
+                algorithm.Time = algorithm.UtcTime = algorithm.StartDate + timedelta(days=i)
+                algorithm.IsWarmingUp = i < algorithm.WarmUpBars
+                slice_bars = {}
+                for n, symbol in enumerate(symbols):
+                    # Every symbol follows the same walk, scaled so prices differ
+                    scale = 1 + 0.25 * n
+                    bar = lean.TradeBar(
+                        algorithm.Time, symbol, open_ * scale, high * scale, low * scale, close * scale, volume
+                    )
+                    security = algorithm.Securities.get(symbol)
+                    if security is not None:
+                        security.Price = security.Close = bar.Close
+                        security.Open, security.High, security.Low, security.Volume = bar.Open, bar.High, bar.Low, volume
+                        security.HasData = True
+                    slice_bars[symbol] = bar
+                    algorithm.sandbox_history.append(bar)
+                for indicator_symbol, indicator in algorithm._indicators:
+                    bar = slice_bars.get(indicator_symbol) if indicator_symbol is not None else None
+                    if bar is not None:
+                        indicator.Update(bar.EndTime, bar.Close)
+                stage = "Consolidator"
+                for consolidator_symbol, consolidator in list(algorithm._consolidators):
+                    bar = slice_bars.get(consolidator_symbol)
+                    if bar is not None:
+                        consolidator.Update(bar)
+                for callback in algorithm.Schedule.callbacks:
+                    stage = "ScheduledEvent"
+                    callback()
+                data_slice = lean.Slice(algorithm.Time, slice_bars)
+                if algorithm._alphas:
+                    stage = "Framework"
+                    _run_framework(algorithm, data_slice)
+                stage = "OnData"
+                if on_data is not None:
+                    on_data(data_slice)
+                report["bars_processed"] = i + 1
+
+            stage = "OnEndOfAlgorithm"
+            end = _method(algorithm, "OnEndOfAlgorithm", "on_end_of_algorithm")
+            if end is not None:
+                end()
+    except MemoryError as e:
+        report["errors"].append(_error(stage, e) | {"message": "memory limit exceeded"})
+    except Exception as e:
+        unsupported = _unsupported_api(e, algorithm_path, lean)
+        if unsupported is not None:
+            # A gap in the stubs, not in the algorithm: the run stops here without failing
+            report["unsupported_api"].append(f"{unsupported} (reached in {stage})")
+        else:
+            report["errors"].append(_error(stage, e))
+
+    if algorithm is not None:
+        report["unsupported_api"] = [
+            f"{name} (not simulated)" for name in getattr(algorithm, "sandbox_unsimulated", [])
+        ] + report["unsupported_api"]
+        orders = getattr(algorithm, "sandbox_orders", [])
+        report["order_count"] = len(orders)
+        report["orders"] = orders[:MAX_ORDERS_REPORTED]
+        report["ignored_warmup_orders"] = getattr(algorithm, "sandbox_ignored_orders", 0)
+        report["logs"] = getattr(algorithm, "sandbox_logs", [])[:MAX_LOGS_REPORTED]
+        try:
+            report["final_portfolio_value"] = round(algorithm.Portfolio.TotalPortfolioValue, 2)
+        except Exception:
+            pass
+    report["output"] = output.getvalue()[-4000:]
+    report["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run an algorithm against the Lean stubs")
+    parser.add_argument("algorithm")
+    parser.add_argument("report")
+    parser.add_argument("--bars", type=int, default=252)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--cpu", type=int, default=10)
+    parser.add_argument("--memory-mb", type=int, default=1024)
+    args = parser.parse_args()
+
+    _limit_resources(args.cpu, args.memory_mb)
+    report = run(args.algorithm, args.bars, args.seed)
+    with open(args.report, "w") as f:
+        json.dump(report, f, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1152 @@
+# tools/lean_sandbox/stubs/AlgorithmImports.py
+#
+# Lightweight stand-in for Lean's AlgorithmImports, used only by the sandbox
+# runner. It covers the parts of the API generated algorithms use most: the
+# QCAlgorithm set-up calls, securities and portfolio, common indicators,
+# consolidators, scheduling, the order methods and the algorithm framework
+# models. Orders fill at once at the bar close. Lean's snake_case API is
+# served from the PascalCase members.
+
+import math
+from collections import deque
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:  # History() then returns lists of bars
+    pd = None
+
+
+def _snake_case_member(getter, obj, name: str):
+    if not name.startswith("_") and name.islower():
+        pascal = "".join(part[:1].upper() + part[1:] for part in name.split("_"))
+        # Indicator helpers are acronyms: ema -> EMA, macd -> MACD
+        for candidate in (pascal, name.upper()):
+            try:
+                return getter(obj, candidate)
+            except AttributeError:
+                pass
+    owner = obj.__name__ if isinstance(obj, type) else f"'{type(obj).__name__}' object"
+    raise AttributeError(f"{owner} has no attribute '{name}'", name=name, obj=obj)
+
+
+class _SnakeCaseType(type):
+    """Same for class attributes: Insight.price, Symbol.create, PortfolioTarget.percent."""
+
+    def __getattr__(cls, name: str):
+        return _snake_case_member(type.__getattribute__, cls, name)
+
+
+class _SnakeCase(metaclass=_SnakeCaseType):
+    """Resolve snake_case attribute names (set_holdings, is_ready) to the PascalCase members."""
+
+    def __getattr__(self, name: str):
+        return _snake_case_member(object.__getattribute__, self, name)
+
+
+# ------------------------------------------------------------------------------
+# Enums and identifiers
+# ------------------------------------------------------------------------------
+
+class Resolution(Enum):
+    Tick = 0
+    Second = 1
+    Minute = 2
+    Hour = 3
+    Daily = 4
+    TICK, SECOND, MINUTE, HOUR, DAILY = Tick, Second, Minute, Hour, Daily
+
+
+class Market:
+    USA = "usa"
+    Oanda = "oanda"
+    FXCM = "fxcm"
+    GDAX = "gdax"
+    Binance = "binance"
+    Coinbase = "coinbase"
+
+
+class SecurityType(Enum):
+    Equity = 1
+    Forex = 2
+    Crypto = 3
+    Future = 4
+    Option = 5
+    Cfd = 6
+    Index = 7
+
+
+class OrderType(Enum):
+    Market = 0
+    Limit = 1
+    StopMarket = 2
+    StopLimit = 3
+    MarketOnOpen = 4
+    MarketOnClose = 5
+    LimitIfTouched = 6
+    TrailingStop = 7
+
+
+class OrderStatus(Enum):
+    New = 0
+    Submitted = 1
+    PartiallyFilled = 2
+    Filled = 3
+    Canceled = 5
+    Invalid = 7
+
+
+class OrderDirection(Enum):
+    Buy = 0
+    Sell = 1
+    Hold = 2
+
+
+class DataNormalizationMode(Enum):
+    Raw = 0
+    Adjusted = 1
+    SplitAdjusted = 2
+    TotalReturn = 3
+
+
+class BrokerageName(Enum):
+    Default = 0
+    InteractiveBrokersBrokerage = 1
+    QuantConnectBrokerage = 2
+    Alpaca = 3
+
+
+class AccountType(Enum):
+    Cash = 0
+    Margin = 1
+
+
+class MovingAverageType(Enum):
+    Simple = 0
+    Exponential = 1
+    Wilders = 2
+
+
+class Symbol(_SnakeCase):
+    def __init__(self, value: str, security_type: SecurityType = SecurityType.Equity):
+        self.Value = value.upper()
+        self.ID = self.Value
+        self.SecurityType = security_type
+
+    @staticmethod
+    def Create(ticker: str, security_type: SecurityType = SecurityType.Equity, market: str = Market.USA):
+        return Symbol(ticker, security_type)
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(self.Value)
+
+    def __str__(self):
+        return self.Value
+
+    __repr__ = __str__
+
+
+def _symbol(value) -> Symbol:
+    if isinstance(value, Symbol):
+        return value
+    if hasattr(value, "Symbol"):
+        return value.Symbol
+    return Symbol(str(value))
+
+
+# ------------------------------------------------------------------------------
+# Market data
+# ------------------------------------------------------------------------------
+
+class TradeBar(_SnakeCase):
+    def __init__(self, time, symbol, open, high, low, close, volume, period=timedelta(days=1)):
+        self.Time = time
+        self.EndTime = time + period
+        self.Symbol = symbol
+        self.Open, self.High, self.Low, self.Close, self.Volume = open, high, low, close, volume
+        self.Price = self.Value = close
+        self.Period = period
+
+
+class IndicatorDataPoint(_SnakeCase):
+    def __init__(self, time=None, value: float = 0.0):
+        self.Time = time
+        self.EndTime = time
+        self.Value = value
+
+
+class Slice(_SnakeCase):
+    def __init__(self, time, bars: Dict[Symbol, TradeBar]):
+        self.Time = time
+        self.Bars = bars
+        self.QuoteBars: Dict[Symbol, Any] = {}
+        self.Ticks: Dict[Symbol, Any] = {}
+
+    def __getitem__(self, symbol):
+        return self.Bars[_symbol(symbol)]
+
+    def __contains__(self, symbol):
+        return _symbol(symbol) in self.Bars
+
+    def ContainsKey(self, symbol) -> bool:
+        return symbol in self
+
+    def get(self, symbol, default=None):
+        return self.Bars.get(_symbol(symbol), default)
+
+    def Get(self, symbol):
+        return self.get(symbol)
+
+    def keys(self):
+        return self.Bars.keys()
+
+    def values(self):
+        return self.Bars.values()
+
+    def items(self):
+        return self.Bars.items()
+
+    def __iter__(self):
+        return iter(self.Bars)
+
+    def __len__(self):
+        return len(self.Bars)
+
+    @property
+    def HasData(self) -> bool:
+        return bool(self.Bars)
+
+
+# ------------------------------------------------------------------------------
+# Indicators
+# ------------------------------------------------------------------------------
+
+class IndicatorValue(_SnakeCase):
+    def __init__(self):
+        self.Value = 0.0
+        self.Time = None
+
+    def __float__(self):
+        return float(self.Value)
+
+
+class Indicator(_SnakeCase):
+    """Base of the stub indicators: keeps a window of inputs and recomputes on every update."""
+
+    def __init__(self, name: str, period: int):
+        self.Name = name
+        self.Period = max(1, int(period))
+        self.WarmUpPeriod = self.Period
+        self.Current = IndicatorValue()
+        self.Samples = 0
+        self.Window = deque(maxlen=self.Period + 1)
+        self.Updated = _Event()
+
+    @property
+    def IsReady(self) -> bool:
+        return self.Samples >= self.WarmUpPeriod
+
+    def Update(self, time=None, value=None) -> bool:
+        if value is None:
+            point = time  # Update(bar) / Update(IndicatorDataPoint)
+            time, value = getattr(point, "EndTime", None), getattr(point, "Close", getattr(point, "Value", point))
+        self.Samples += 1
+        self.Window.append(float(value))
+        self.Current.Value = self.Compute(np.asarray(self.Window))
+        self.Current.Time = time
+        self.Updated.fire(self, self.Current)
+        return self.IsReady
+
+    def Compute(self, window: np.ndarray) -> float:
+        return float(window[-1])
+
+    def Reset(self):
+        self.Samples = 0
+        self.Window.clear()
+        self.Current = IndicatorValue()
+
+    def __float__(self):
+        return float(self.Current.Value)
+
+    def __lt__(self, other):
+        return float(self) < float(other)
+
+    def __gt__(self, other):
+        return float(self) > float(other)
+
+
+class SimpleMovingAverage(Indicator):
+    def __init__(self, name_or_period, period: Optional[int] = None):
+        name, period = (name_or_period, period) if period is not None else ("SMA", name_or_period)
+        super().__init__(name, period)
+
+    def Compute(self, window):
+        return float(window[-self.Period:].mean())
+
+
+class ExponentialMovingAverage(SimpleMovingAverage):
+    def Compute(self, window):
+        alpha = 2.0 / (self.Period + 1)
+        if self.Samples == 1:
+            return float(window[-1])
+        return float(alpha * window[-1] + (1 - alpha) * self.Current.Value)
+
+
+class Momentum(SimpleMovingAverage):
+    def Compute(self, window):
+        return float(window[-1] - window[0]) if len(window) > 1 else 0.0
+
+
+class MomentumPercent(SimpleMovingAverage):
+    def Compute(self, window):
+        return float(window[-1] / window[0] - 1) * 100 if len(window) > 1 and window[0] else 0.0
+
+
+class RateOfChange(SimpleMovingAverage):
+    def Compute(self, window):
+        return float(window[-1] / window[0] - 1) if len(window) > 1 and window[0] else 0.0
+
+
+RateOfChangePercent = MomentumPercent
+
+
+class StandardDeviation(SimpleMovingAverage):
+    def Compute(self, window):
+        return float(window[-self.Period:].std())
+
+
+class Maximum(SimpleMovingAverage):
+    def Compute(self, window):
+        return float(window[-self.Period:].max())
+
+
+class Minimum(SimpleMovingAverage):
+    def Compute(self, window):
+        return float(window[-self.Period:].min())
+
+
+class Sum(SimpleMovingAverage):
+    def Compute(self, window):
+        return float(window[-self.Period:].sum())
+
+
+class RelativeStrengthIndex(SimpleMovingAverage):
+    def Compute(self, window):
+        changes = np.diff(window)
+        if not len(changes):
+            return 50.0
+        gains, losses = changes[changes > 0].sum(), -changes[changes < 0].sum()
+        return 100.0 if losses == 0 else float(100 - 100 / (1 + gains / losses))
+
+
+class AverageTrueRange(SimpleMovingAverage):
+    """Approximated from closes: the stub feeds a single price per bar."""
+
+    def Compute(self, window):
+        return float(np.abs(np.diff(window)).mean()) if len(window) > 1 else 0.0
+
+
+class AverageDirectionalIndex(RelativeStrengthIndex):
+    pass
+
+
+class CommodityChannelIndex(SimpleMovingAverage):
+    def Compute(self, window):
+        window = window[-self.Period:]
+        deviation = np.abs(window - window.mean()).mean()
+        return float((window[-1] - window.mean()) / (0.015 * deviation)) if deviation else 0.0
+
+
+class MovingAverageConvergenceDivergence(Indicator):
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9, *args):
+        super().__init__("MACD", slow)
+        self.WarmUpPeriod = slow + signal
+        self.Fast = ExponentialMovingAverage(fast)
+        self.Slow = ExponentialMovingAverage(slow)
+        self.Signal = ExponentialMovingAverage(signal)
+        self.Histogram = IndicatorValue()
+
+    def Compute(self, window):
+        self.Fast.Update(None, window[-1])
+        self.Slow.Update(None, window[-1])
+        macd = self.Fast.Current.Value - self.Slow.Current.Value
+        self.Signal.Update(None, macd)
+        self.Histogram.Value = macd - self.Signal.Current.Value
+        return float(macd)
+
+
+class BollingerBands(Indicator):
+    def __init__(self, period: int = 20, k: float = 2.0, *args):
+        super().__init__("BB", period)
+        self.K = k
+        self.MiddleBand, self.UpperBand, self.LowerBand = IndicatorValue(), IndicatorValue(), IndicatorValue()
+        self.StandardDeviation = IndicatorValue()
+
+    def Compute(self, window):
+        window = window[-self.Period:]
+        mean, std = float(window.mean()), float(window.std())
+        self.MiddleBand.Value, self.StandardDeviation.Value = mean, std
+        self.UpperBand.Value, self.LowerBand.Value = mean + self.K * std, mean - self.K * std
+        return mean
+
+
+class RollingWindow(_SnakeCase):
+    def __init__(self, size: int):
+        self.Size = size
+        self._items = deque(maxlen=size)
+
+    def Add(self, item):
+        self._items.appendleft(item)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    @property
+    def Count(self):
+        return len(self._items)
+
+    @property
+    def IsReady(self):
+        return len(self._items) == self.Size
+
+
+class _Event:
+    """C#-style event: handlers are attached with += and called on fire()."""
+
+    def __init__(self):
+        self._handlers = []
+
+    def __iadd__(self, handler):
+        self._handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        self._handlers.remove(handler)
+        return self
+
+    def fire(self, *args):
+        for handler in self._handlers:
+            handler(*args)
+
+
+class TradeBarConsolidator(_SnakeCase):
+    """Merges `period` daily bars (a count or a timedelta; one bar otherwise) and fires DataConsolidated."""
+
+    def __init__(self, period=None, *args, **kwargs):
+        if isinstance(period, timedelta):
+            self.BarCount = max(1, period.days)
+        elif isinstance(period, (int, float)) and not isinstance(period, bool):
+            self.BarCount = max(1, int(period))
+        else:  # a Resolution, or a calendar function
+            self.BarCount = 1
+        self.DataConsolidated = _Event()
+        self.Consolidated = None
+        self._pending: List[TradeBar] = []
+
+    def Update(self, bar: TradeBar):
+        self._pending.append(bar)
+        if len(self._pending) < self.BarCount:
+            return
+        first, last = self._pending[0], self._pending[-1]
+        self.Consolidated = TradeBar(
+            first.Time, last.Symbol, first.Open, max(b.High for b in self._pending),
+            min(b.Low for b in self._pending), last.Close, sum(b.Volume for b in self._pending),
+            last.EndTime - first.Time,
+        )
+        self._pending = []
+        self.DataConsolidated.fire(self, self.Consolidated)
+
+
+QuoteBarConsolidator = TickConsolidator = TradeBarConsolidator
+
+
+# ------------------------------------------------------------------------------
+# Securities, portfolio and orders
+# ------------------------------------------------------------------------------
+
+class SecurityHolding(_SnakeCase):
+    def __init__(self, security):
+        self._security = security
+        self.Quantity = 0.0
+        self.AveragePrice = 0.0
+
+    @property
+    def Invested(self) -> bool:
+        return self.Quantity != 0
+
+    @property
+    def IsLong(self) -> bool:
+        return self.Quantity > 0
+
+    @property
+    def IsShort(self) -> bool:
+        return self.Quantity < 0
+
+    @property
+    def HoldingsValue(self) -> float:
+        return self.Quantity * self._security.Price
+
+    @property
+    def AbsoluteQuantity(self) -> float:
+        return abs(self.Quantity)
+
+    @property
+    def UnrealizedProfit(self) -> float:
+        return (self._security.Price - self.AveragePrice) * self.Quantity
+
+    @property
+    def UnrealizedProfitPercent(self) -> float:
+        return self._security.Price / self.AveragePrice - 1 if self.AveragePrice else 0.0
+
+    @property
+    def Price(self) -> float:
+        return self._security.Price
+
+
+class Security(_SnakeCase):
+    def __init__(self, symbol: Symbol, resolution: Resolution):
+        self.Symbol = symbol
+        self.Resolution = resolution
+        self.Price = 0.0
+        self.Open = self.High = self.Low = self.Close = 0.0
+        self.Volume = 0.0
+        self.Holdings = SecurityHolding(self)
+        self.HasData = False
+        self.IsTradable = True
+
+    def SetLeverage(self, leverage: float):
+        self.Leverage = leverage
+
+    def SetDataNormalizationMode(self, mode):
+        pass
+
+    def SetFeeModel(self, model):
+        pass
+
+    def SetSlippageModel(self, model):
+        pass
+
+
+class SecurityManager(dict, _SnakeCase):
+    def __getitem__(self, key):
+        return dict.__getitem__(self, _symbol(key))
+
+    def __contains__(self, key):
+        return dict.__contains__(self, _symbol(key))
+
+    def ContainsKey(self, key) -> bool:
+        return key in self
+
+
+class SecurityPortfolioManager(dict, _SnakeCase):
+    def __init__(self, algorithm):
+        super().__init__()
+        self._algorithm = algorithm
+        self.Cash = 100000.0
+
+    def __getitem__(self, key):
+        return self._algorithm.Securities[key].Holdings
+
+    def __contains__(self, key):
+        return key in self._algorithm.Securities
+
+    def keys(self):
+        return self._algorithm.Securities.keys()
+
+    def values(self):
+        return [s.Holdings for s in self._algorithm.Securities.values()]
+
+    def items(self):
+        return [(symbol, s.Holdings) for symbol, s in self._algorithm.Securities.items()]
+
+    def __iter__(self):
+        return iter(self._algorithm.Securities)
+
+    @property
+    def TotalHoldingsValue(self) -> float:
+        return sum(h.HoldingsValue for h in self.values())
+
+    @property
+    def TotalPortfolioValue(self) -> float:
+        return self.Cash + self.TotalHoldingsValue
+
+    @property
+    def Invested(self) -> bool:
+        return any(h.Invested for h in self.values())
+
+    @property
+    def TotalUnrealizedProfit(self) -> float:
+        return sum(h.UnrealizedProfit for h in self.values())
+
+    @property
+    def MarginRemaining(self) -> float:
+        return self.Cash
+
+    def SetCash(self, cash: float):
+        self.Cash = float(cash)
+
+
+class OrderTicket(_SnakeCase):
+    def __init__(self, order_id: int, symbol: Symbol, quantity: float, order_type: OrderType, status: OrderStatus):
+        self.OrderId = order_id
+        self.Symbol = symbol
+        self.Quantity = quantity
+        self.OrderType = order_type
+        self.Status = status
+        self.QuantityFilled = quantity if status == OrderStatus.Filled else 0
+
+    def Cancel(self, tag: str = ""):
+        self.Status = OrderStatus.Canceled
+
+
+class OrderEvent(_SnakeCase):
+    def __init__(self, ticket: OrderTicket, price: float, time):
+        self.OrderId = ticket.OrderId
+        self.Symbol = ticket.Symbol
+        self.Status = ticket.Status
+        self.FillQuantity = ticket.QuantityFilled
+        self.FillPrice = price
+        self.Direction = OrderDirection.Buy if ticket.Quantity > 0 else OrderDirection.Sell
+        self.UtcTime = time
+
+
+# ------------------------------------------------------------------------------
+# Scheduling
+# ------------------------------------------------------------------------------
+
+class _Rules:
+    """DateRules / TimeRules: every rule fires once per bar in the sandbox."""
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _Rule(name)
+
+
+class _Rule:
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, *args, **kwargs):
+        return self
+
+
+class ScheduleManager(_SnakeCase):
+    def __init__(self):
+        self.callbacks = []
+
+    def On(self, date_rule, time_rule, callback):
+        self.callbacks.append(callback)
+
+
+class SubscriptionManager(_SnakeCase):
+    def __init__(self, algorithm):
+        self._algorithm = algorithm
+
+    def AddConsolidator(self, symbol, consolidator):
+        consolidators = self._algorithm._consolidators
+        if all(c is not consolidator for _, c in consolidators):
+            consolidators.append((_symbol(symbol), consolidator))
+
+    def RemoveConsolidator(self, symbol, consolidator):
+        self._algorithm._consolidators[:] = [
+            (s, c) for s, c in self._algorithm._consolidators if c is not consolidator
+        ]
+
+
+# ------------------------------------------------------------------------------
+# Algorithm framework
+# ------------------------------------------------------------------------------
+
+class InsightDirection(Enum):
+    Down = -1
+    Flat = 0
+    Up = 1
+    DOWN, FLAT, UP = Down, Flat, Up
+
+
+class InsightType(Enum):
+    Price = 0
+    Volatility = 1
+
+
+class Insight(_SnakeCase):
+    def __init__(self, symbol, period=None, type=InsightType.Price, direction=InsightDirection.Flat, *args, **kwargs):
+        self.Symbol = _symbol(symbol)
+        self.Period = period
+        self.Type = type
+        self.Direction = direction
+        self.Magnitude = args[0] if args else kwargs.get("magnitude")
+        self.Confidence = args[1] if len(args) > 1 else kwargs.get("confidence")
+        self.Weight = args[3] if len(args) > 3 else kwargs.get("weight")
+
+    @staticmethod
+    def Price(symbol, period=None, direction=InsightDirection.Flat, *args, **kwargs):
+        return Insight(symbol, period, InsightType.Price, direction, *args, **kwargs)
+
+
+class InsightCollection(list, _SnakeCase):
+    pass
+
+
+class SecurityChanges(_SnakeCase):
+    def __init__(self, added: List["Security"], removed: List["Security"]):
+        self.AddedSecurities = added
+        self.RemovedSecurities = removed
+
+
+class UniverseSettings(_SnakeCase):
+    def __init__(self):
+        self.Resolution = Resolution.Daily
+        self.Leverage = 1.0
+        self.FillForward = True
+        self.ExtendedMarketHours = False
+        self.MinimumTimeInUniverse = timedelta(days=1)
+        self.DataNormalizationMode = DataNormalizationMode.Adjusted
+
+
+class _FrameworkModel(_SnakeCase):
+    """Base of the framework models; the built-in ones take any constructor arguments."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def OnSecuritiesChanged(self, algorithm, changes):
+        pass
+
+
+class AlphaModel(_FrameworkModel):
+    def Update(self, algorithm, data) -> List[Insight]:
+        return []
+
+
+class PortfolioConstructionModel(_FrameworkModel):
+    def CreateTargets(self, algorithm, insights) -> List["PortfolioTarget"]:
+        return []
+
+
+class EqualWeightingPortfolioConstructionModel(PortfolioConstructionModel):
+    """Equal weight per symbol with an active insight: long for Up, short for Down."""
+
+    def __init__(self, *args, **kwargs):
+        self._latest: Dict[Symbol, Insight] = {}
+
+    def CreateTargets(self, algorithm, insights) -> List["PortfolioTarget"]:
+        for insight in insights:
+            self._latest[insight.Symbol] = insight
+        active = [i for i in self._latest.values() if i.Direction != InsightDirection.Flat]
+        weight = 1.0 / len(active) if active else 0.0
+        return [
+            PortfolioTarget.Percent(algorithm, insight.Symbol, insight.Direction.value * weight)
+            for insight in self._latest.values()
+        ]
+
+
+InsightWeightingPortfolioConstructionModel = ConfidenceWeightedPortfolioConstructionModel = \
+    MeanVarianceOptimizationPortfolioConstructionModel = BlackLittermanOptimizationPortfolioConstructionModel = \
+    RiskParityPortfolioConstructionModel = EqualWeightingPortfolioConstructionModel
+
+
+class NullPortfolioConstructionModel(PortfolioConstructionModel):
+    pass
+
+
+class ExecutionModel(_FrameworkModel):
+    def Execute(self, algorithm, targets):
+        pass
+
+
+class ImmediateExecutionModel(ExecutionModel):
+    def Execute(self, algorithm, targets):
+        for target in targets:
+            security = algorithm.Securities[target.Symbol] if target.Symbol in algorithm.Securities else None
+            quantity = target.Quantity - (security.Holdings.Quantity if security is not None else 0)
+            if quantity:
+                algorithm.MarketOrder(target.Symbol, quantity)
+
+
+VolumeWeightedAveragePriceExecutionModel = StandardDeviationExecutionModel = SpreadExecutionModel = \
+    ImmediateExecutionModel
+
+
+class NullExecutionModel(ExecutionModel):
+    pass
+
+
+class RiskManagementModel(_FrameworkModel):
+    def ManageRisk(self, algorithm, targets) -> List["PortfolioTarget"]:
+        return []
+
+
+NullRiskManagementModel = MaximumDrawdownPercentPerSecurity = MaximumDrawdownPercentPortfolio = \
+    MaximumUnrealizedProfitPercentPerSecurity = TrailingStopRiskManagementModel = \
+    MaximumSectorExposureRiskManagementModel = RiskManagementModel
+
+
+class NullAlphaModel(AlphaModel):
+    pass
+
+
+class UniverseSelectionModel(_FrameworkModel):
+    pass
+
+
+ManualUniverseSelectionModel = CoarseFundamentalUniverseSelectionModel = FineFundamentalUniverseSelectionModel = \
+    FundamentalUniverseSelectionModel = QC500UniverseSelectionModel = ETFConstituentsUniverseSelectionModel = \
+    UniverseSelectionModel
+
+
+# ------------------------------------------------------------------------------
+# Algorithm
+# ------------------------------------------------------------------------------
+
+class QCAlgorithm(_SnakeCase):
+    def __init__(self):
+        self.Securities = SecurityManager()
+        self.Portfolio = SecurityPortfolioManager(self)
+        self.Schedule = ScheduleManager()
+        self.DateRules = _Rules()
+        self.TimeRules = _Rules()
+        self.Time = datetime(2020, 1, 1)
+        self.UtcTime = self.Time
+        self.StartDate = self.Time
+        self.EndDate = None
+        self.IsWarmingUp = False
+        self.WarmUpBars = 0
+        self.LiveMode = False
+        self.Benchmark = None
+        self.DefaultOrderProperties = None
+        self.sandbox_orders: List[Dict[str, Any]] = []
+        self.sandbox_logs: List[str] = []
+        self.sandbox_ignored_orders = 0
+        self.SubscriptionManager = SubscriptionManager(self)
+        self.UniverseSettings = UniverseSettings()
+        self.sandbox_unsimulated: List[str] = []
+        self._indicators: List[Tuple[Optional[Symbol], Indicator]] = []
+        self._consolidators: List[Tuple[Symbol, TradeBarConsolidator]] = []
+        self._alphas: List[AlphaModel] = []
+        self._portfolio_construction: PortfolioConstructionModel = NullPortfolioConstructionModel()
+        self._execution: ExecutionModel = ImmediateExecutionModel()
+        self._risk_management: List[RiskManagementModel] = []
+        self._order_id = 0
+
+    # Set-up -------------------------------------------------------------------
+
+    def SetStartDate(self, *args):
+        self.StartDate = self.Time = args[0] if isinstance(args[0], datetime) else datetime(*args[:3])
+
+    def SetEndDate(self, *args):
+        self.EndDate = args[0] if isinstance(args[0], datetime) else datetime(*args[:3])
+
+    def SetCash(self, *args):
+        self.Portfolio.SetCash(args[-1])
+
+    def SetWarmUp(self, period, resolution=None):
+        self.WarmUpBars = period.days if isinstance(period, timedelta) else int(period)
+
+    SetWarmup = SetWarmUp
+
+    def SetBenchmark(self, benchmark):
+        self.Benchmark = benchmark
+
+    def SetBrokerageModel(self, *args):
+        pass
+
+    def SetTimeZone(self, *args):
+        pass
+
+    def SetSecurityInitializer(self, *args):
+        pass
+
+    # Algorithm framework: models run once per bar by the sandbox runner -------
+
+    def SetAlpha(self, model):
+        self._alphas = [model]
+
+    def AddAlpha(self, model):
+        self._alphas.append(model)
+
+    def SetPortfolioConstruction(self, model):
+        self._portfolio_construction = model
+
+    def SetExecution(self, model):
+        self._execution = model
+
+    def SetRiskManagement(self, model):
+        self._risk_management = [model]
+
+    def AddRiskManagement(self, model):
+        self._risk_management.append(model)
+
+    def EmitInsights(self, *insights):
+        self.sandbox_insights = getattr(self, "sandbox_insights", []) + list(insights)
+
+    # Universes are not selected in the sandbox; the securities added directly stand in
+
+    def _unsimulated(self, name: str):
+        if name not in self.sandbox_unsimulated:
+            self.sandbox_unsimulated.append(name)
+
+    def SetUniverseSelection(self, model):
+        self._unsimulated("SetUniverseSelection")
+
+    def AddUniverseSelection(self, model):
+        self._unsimulated("AddUniverseSelection")
+
+    def AddUniverse(self, *args, **kwargs):
+        self._unsimulated("AddUniverse")
+
+    def _add(self, ticker, resolution=Resolution.Daily, security_type=SecurityType.Equity, *args, **kwargs):
+        symbol = _symbol(ticker)
+        symbol.SecurityType = security_type
+        if symbol not in self.Securities:
+            self.Securities[symbol] = Security(symbol, resolution)
+        return self.Securities[symbol]
+
+    def AddEquity(self, ticker, resolution=Resolution.Daily, *args, **kwargs):
+        return self._add(ticker, resolution, SecurityType.Equity)
+
+    def AddForex(self, ticker, resolution=Resolution.Daily, *args, **kwargs):
+        return self._add(ticker, resolution, SecurityType.Forex)
+
+    def AddCrypto(self, ticker, resolution=Resolution.Daily, *args, **kwargs):
+        return self._add(ticker, resolution, SecurityType.Crypto)
+
+    def AddCfd(self, ticker, resolution=Resolution.Daily, *args, **kwargs):
+        return self._add(ticker, resolution, SecurityType.Cfd)
+
+    def AddIndex(self, ticker, resolution=Resolution.Daily, *args, **kwargs):
+        return self._add(ticker, resolution, SecurityType.Index)
+
+    def AddFuture(self, ticker, resolution=Resolution.Daily, *args, **kwargs):
+        return self._add(ticker, resolution, SecurityType.Future)
+
+    def AddSecurity(self, security_type, ticker, resolution=Resolution.Daily, *args, **kwargs):
+        return self._add(ticker, resolution, security_type)
+
+    # Logging ------------------------------------------------------------------
+
+    def Debug(self, message):
+        self.sandbox_logs.append(str(message))
+
+    Log = Error = Notify = Debug
+
+    def Plot(self, *args):
+        pass
+
+    def Record(self, *args):
+        pass
+
+    # Indicators ---------------------------------------------------------------
+
+    def _register(self, symbol, indicator: Indicator) -> Indicator:
+        self._indicators.append((_symbol(symbol) if symbol is not None else None, indicator))
+        return indicator
+
+    def RegisterIndicator(self, symbol, indicator, *args, **kwargs):
+        consolidator = kwargs.get("consolidator") or next(
+            (a for a in args if isinstance(a, TradeBarConsolidator)), None
+        )
+        if consolidator is None:
+            self._register(symbol, indicator)
+            return
+        consolidator.DataConsolidated += lambda sender, bar: indicator.Update(bar)
+        self.SubscriptionManager.AddConsolidator(symbol, consolidator)
+
+    def Consolidate(self, symbol, period, *args, **kwargs):
+        """Consolidate(symbol, period, handler) and Consolidate(symbol, period, tick_type, handler)."""
+        handler = kwargs.get("handler") or next((a for a in reversed(args) if callable(a)), None)
+        consolidator = TradeBarConsolidator(period)
+        if handler is not None:
+            consolidator.DataConsolidated += lambda sender, bar: handler(bar)
+        self.SubscriptionManager.AddConsolidator(symbol, consolidator)
+        return consolidator
+
+    def WarmUpIndicator(self, symbol, indicator, *args, **kwargs):
+        self._register(symbol, indicator)
+
+    def SMA(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, SimpleMovingAverage(period))
+
+    def EMA(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, ExponentialMovingAverage(period))
+
+    def RSI(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, RelativeStrengthIndex(period))
+
+    def MOM(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, Momentum(period))
+
+    def MOMP(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, MomentumPercent(period))
+
+    def ROC(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, RateOfChange(period))
+
+    def ROCP(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, RateOfChangePercent(period))
+
+    def STD(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, StandardDeviation(period))
+
+    def MAX(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, Maximum(period))
+
+    def MIN(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, Minimum(period))
+
+    def ATR(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, AverageTrueRange(period))
+
+    def ADX(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, AverageDirectionalIndex(period))
+
+    def CCI(self, symbol, period, *args, **kwargs):
+        return self._register(symbol, CommodityChannelIndex(period))
+
+    def MACD(self, symbol, fast=12, slow=26, signal=9, *args, **kwargs):
+        return self._register(symbol, MovingAverageConvergenceDivergence(fast, slow, signal))
+
+    def BB(self, symbol, period=20, k=2.0, *args, **kwargs):
+        return self._register(symbol, BollingerBands(period, k))
+
+    def History(self, symbols, periods=None, resolution=None, *args, **kwargs):
+        """Bars already fed to the algorithm; the sandbox has no data before the start date."""
+        wanted = {_symbol(s) for s in (symbols if isinstance(symbols, (list, tuple)) else [symbols])}
+        count = periods if isinstance(periods, int) else None
+        bars = [b for b in getattr(self, "sandbox_history", []) if b.Symbol in wanted]
+        bars = bars[-count:] if count else bars
+        if pd is None:
+            return bars
+        frame = pd.DataFrame(
+            [{"symbol": str(b.Symbol), "time": b.Time, "open": b.Open, "high": b.High,
+              "low": b.Low, "close": b.Close, "volume": b.Volume} for b in bars],
+            columns=["symbol", "time", "open", "high", "low", "close", "volume"],
+        )
+        return frame.set_index(["symbol", "time"])
+
+    # Orders -------------------------------------------------------------------
+
+    def _submit(self, symbol, quantity, order_type: OrderType, tag: str = "") -> OrderTicket:
+        symbol = _symbol(symbol)
+        self._order_id += 1
+        if self.IsWarmingUp:
+            self.sandbox_ignored_orders += 1
+            return OrderTicket(self._order_id, symbol, quantity, order_type, OrderStatus.Invalid)
+        if symbol not in self.Securities:
+            raise KeyError(f"{symbol} was not added with AddEquity/AddForex/... before ordering")
+        security = self.Securities[symbol]
+        quantity = float(quantity)
+        status = OrderStatus.Filled if quantity and security.Price > 0 else OrderStatus.Invalid
+        ticket = OrderTicket(self._order_id, symbol, quantity, order_type, status)
+        if status == OrderStatus.Filled:
+            holding = security.Holdings
+            new_quantity = holding.Quantity + quantity
+            if new_quantity and (holding.Quantity == 0 or (holding.Quantity > 0) == (quantity > 0)):
+                holding.AveragePrice = (
+                    holding.AveragePrice * holding.Quantity + security.Price * quantity
+                ) / new_quantity
+            elif new_quantity == 0:
+                holding.AveragePrice = 0.0
+            holding.Quantity = new_quantity
+            self.Portfolio.Cash -= quantity * security.Price
+        self.sandbox_orders.append({
+            "time": self.Time.isoformat(),
+            "symbol": str(symbol),
+            "quantity": quantity,
+            "type": order_type.name,
+            "status": status.name,
+            "price": security.Price,
+            "tag": tag,
+        })
+        handler = getattr(self, "OnOrderEvent", None) or getattr(self, "on_order_event", None)
+        if handler is not None and status == OrderStatus.Filled:
+            handler(OrderEvent(ticket, security.Price, self.Time))
+        return ticket
+
+    def MarketOrder(self, symbol, quantity, *args, tag: str = "", **kwargs):
+        return self._submit(symbol, quantity, OrderType.Market, tag)
+
+    Order = Buy = MarketOrder
+
+    def Sell(self, symbol, quantity, *args, **kwargs):
+        return self._submit(symbol, -abs(quantity), OrderType.Market)
+
+    def LimitOrder(self, symbol, quantity, limit_price=None, *args, **kwargs):
+        return self._submit(symbol, quantity, OrderType.Limit)
+
+    def StopMarketOrder(self, symbol, quantity, stop_price=None, *args, **kwargs):
+        return self._submit(symbol, quantity, OrderType.StopMarket)
+
+    def StopLimitOrder(self, symbol, quantity, *args, **kwargs):
+        return self._submit(symbol, quantity, OrderType.StopLimit)
+
+    def LimitIfTouchedOrder(self, symbol, quantity, *args, **kwargs):
+        return self._submit(symbol, quantity, OrderType.LimitIfTouched)
+
+    def TrailingStopOrder(self, symbol, quantity, *args, **kwargs):
+        return self._submit(symbol, quantity, OrderType.TrailingStop)
+
+    def MarketOnOpenOrder(self, symbol, quantity, *args, **kwargs):
+        return self._submit(symbol, quantity, OrderType.MarketOnOpen)
+
+    def MarketOnCloseOrder(self, symbol, quantity, *args, **kwargs):
+        return self._submit(symbol, quantity, OrderType.MarketOnClose)
+
+    def CalculateOrderQuantity(self, symbol, target: float) -> float:
+        security = self.Securities[_symbol(symbol)]
+        if security.Price <= 0:
+            return 0.0
+        target_quantity = math.floor(self.Portfolio.TotalPortfolioValue * float(target) / security.Price)
+        return target_quantity - security.Holdings.Quantity
+
+    def SetHoldings(self, symbol, target=None, liquidate_existing_holdings: bool = False, *args, **kwargs):
+        if isinstance(symbol, (list, tuple)):  # SetHoldings([PortfolioTarget, ...])
+            for portfolio_target in symbol:
+                self.SetHoldings(portfolio_target.Symbol, portfolio_target.Quantity)
+            return None
+        if liquidate_existing_holdings:
+            for other in list(self.Securities):
+                if other != _symbol(symbol):
+                    self.Liquidate(other)
+        quantity = self.CalculateOrderQuantity(symbol, target)
+        return self._submit(symbol, quantity, OrderType.Market) if quantity else None
+
+    def Liquidate(self, symbol=None, *args, **kwargs):
+        symbols = [_symbol(symbol)] if symbol is not None else list(self.Securities)
+        tickets = []
+        for s in symbols:
+            quantity = self.Securities[s].Holdings.Quantity if s in self.Securities else 0
+            if quantity:
+                tickets.append(self._submit(s, -quantity, OrderType.Market))
+        return tickets
+
+
+class PortfolioTarget(_SnakeCase):
+    def __init__(self, symbol, quantity: float):
+        self.Symbol = _symbol(symbol)
+        self.Quantity = quantity
+
+    @staticmethod
+    def Percent(algorithm: QCAlgorithm, symbol, percent: float) -> "PortfolioTarget":
+        symbol = _symbol(symbol)
+        if symbol not in algorithm.Securities:
+            return PortfolioTarget(symbol, 0.0)
+        held = algorithm.Securities[symbol].Holdings.Quantity
+        return PortfolioTarget(symbol, held + algorithm.CalculateOrderQuantity(symbol, percent))
+
+
+QCAlgorithmFramework = QCAlgorithm
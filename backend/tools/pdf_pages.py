@@ -0,0 +1,95 @@
+# tools/pdf_pages.py
+#
+# Page-level PDF text extraction and the process pool PDFLoader spreads long
+# documents over. Kept apart from PDFAnalyserTool so that spawned workers only
+# import pdfplumber, not crewai and the rest of the tool's dependencies.
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+class LineStyle(NamedTuple):
+    """Typesetting of one text line: median font size, whether every glyph is bold, glyph count."""
+    text: str
+    size: float
+    bold: bool
+    chars: int
+
+
+def _is_bold(fontname: str) -> bool:
+    name = fontname.lower()
+    return "bold" in name or "black" in name or "heavy" in name
+
+
+def read_page(page, layout: bool) -> Tuple[str, List[LineStyle]]:
+    text = page.extract_text() or ""
+    if not layout:
+        return text, []
+    styles = []
+    for line in page.extract_text_lines(strip=True, return_chars=True):
+        glyphs = [c for c in line["chars"] if not c["text"].isspace()]
+        if not glyphs:
+            continue
+        sizes = sorted(c["size"] for c in glyphs)
+        styles.append(LineStyle(
+            text=line["text"].strip(),
+            size=sizes[len(sizes) // 2],
+            bold=all(_is_bold(c.get("fontname", "")) for c in glyphs),
+            chars=len(glyphs),
+        ))
+    return text, styles
+
+
+def extract_page_range(pdf_path: str, start: int, stop: int, layout: bool = False):
+    """
+    Extract the pages [start, stop) in a worker process.
+    Each worker opens its own handle, pdfplumber objects are not picklable.
+    """
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        return [read_page(page, layout) for page in pdf.pages[start:stop]]
+
+
+def get_extract_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Return the process-wide extraction pool with `workers` processes, creating it on first use.
+
+    The pool outlives a document, so worker start-up is paid once per process
+    rather than once per PDF. Workers are spawned, not forked: the server
+    process has threads (the event loop, the flows' worker threads) whose locks
+    a forked child would inherit.
+    """
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            logger.info(f"[PDFLoader] Starting an extraction pool with {workers} workers")
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pools[workers] = pool
+        return pool
+
+
+def discard_extract_pool(pool: ProcessPoolExecutor):
+    """Forget a pool that broke (a worker died), so the next extraction starts a new one."""
+    with _pools_lock:
+        for workers, known in list(_pools.items()):
+            if known is pool:
+                del _pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_extract_pools():
+    """Stop the extraction workers, e.g. on app shutdown. A later extraction starts a new pool."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,416 @@
+# tools/qc_analyser.py
+#
+# Deterministic static checks of a generated QuantConnect algorithm. Runs on
+# the AST only, so it takes milliseconds and needs neither Lean nor a model.
+
+import ast
+import builtins
+import logging
+import re
+from typing import Dict, Iterator, List, Optional, Set
+
+from core.config import settings
+from models.analysis_models import AnalysisReport, Finding
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM_BASES = {"QCAlgorithm", "QCAlgorithmFramework"}
+
+ORDER_METHODS = {
+    "SetHoldings", "MarketOrder", "LimitOrder", "StopMarketOrder", "StopLimitOrder",
+    "LimitIfTouchedOrder", "TrailingStopOrder", "MarketOnOpenOrder", "MarketOnCloseOrder",
+    "ComboMarketOrder", "ComboLimitOrder", "Order", "Buy", "Sell", "Liquidate",
+}
+# Framework algorithms place orders through their portfolio construction model
+FRAMEWORK_METHODS = {"SetPortfolioConstruction", "AddAlpha", "SetAlpha", "SetExecution"}
+
+INDICATOR_HELPERS = {
+    "SMA", "EMA", "RSI", "MACD", "BB", "ATR", "MOM", "MOMP", "ROC", "ROCP", "ADX", "STD", "AROON",
+    "CCI", "WILR", "STO", "KAMA", "DEMA", "TEMA", "VWAP", "OBV", "MFI", "LWMA", "HMA", "KCH", "DCH",
+    "PPO", "TRIX", "LOGR", "MAX", "MIN", "SUM", "BETA", "APO", "AD", "ADOSC", "T3", "TRIMA",
+}
+INDICATOR_CLASSES = {
+    "SimpleMovingAverage", "ExponentialMovingAverage", "RelativeStrengthIndex",
+    "MovingAverageConvergenceDivergence", "BollingerBands", "AverageTrueRange", "Momentum",
+    "MomentumPercent", "RateOfChange", "RateOfChangePercent", "StandardDeviation",
+    "AverageDirectionalIndex", "CommodityChannelIndex", "Maximum", "Minimum", "Sum",
+}
+WARM_UP_CALLS = {"SetWarmUp", "SetWarmup", "WarmUpIndicator"}
+WARM_UP_ATTRIBUTES = {"IsReady", "IsWarmingUp"}
+REGISTER_CALLS = {"RegisterIndicator", "Update", "WarmUpIndicator"}
+SCHEDULE_CALLS = {"On"}
+# Ways of receiving data without OnData: consolidator handlers
+CONSOLIDATOR_CALLS = {"Consolidate", "AddConsolidator"}
+
+# Names `from AlgorithmImports import *` provides besides the CamelCase Lean types
+ALGORITHM_IMPORTS_NAMES = {
+    "np", "pd", "math", "json", "datetime", "timedelta", "date", "time", "statistics",
+    "List", "Dict", "Optional", "Tuple", "Union", "Any",
+}
+BUILTINS = set(dir(builtins)) | {"__name__", "__file__"}
+
+_SNAKE = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+def _with_snake(names: Set[str]) -> Set[str]:
+    """Add the snake_case spelling of every PascalCase Lean method (SetHoldings -> set_holdings)."""
+    return names | {_SNAKE.sub("_", name).lower() for name in names}
+
+
+ORDER_METHODS = _with_snake(ORDER_METHODS)
+FRAMEWORK_METHODS = _with_snake(FRAMEWORK_METHODS)
+INDICATOR_HELPERS = INDICATOR_HELPERS | {name.lower() for name in INDICATOR_HELPERS}
+WARM_UP_CALLS = _with_snake(WARM_UP_CALLS)
+WARM_UP_ATTRIBUTES = _with_snake(WARM_UP_ATTRIBUTES)
+REGISTER_CALLS = _with_snake(REGISTER_CALLS)
+SCHEDULE_CALLS = _with_snake(SCHEDULE_CALLS)
+CONSOLIDATOR_CALLS = _with_snake(CONSOLIDATOR_CALLS)
+
+
+# ------------------------------------------------------------------------------
+# AST helpers
+# ------------------------------------------------------------------------------
+
+def _base_name(node: ast.expr) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _is_false(test: ast.expr) -> bool:
+    return isinstance(test, ast.Constant) and not test.value
+
+
+def _live_statements(body: List[ast.stmt]) -> Iterator[ast.stmt]:
+    """Statements that can execute: nothing after return/raise/break/continue, no `if False:` bodies."""
+    for stmt in body:
+        if isinstance(stmt, (ast.If, ast.While)) and _is_false(stmt.test):
+            yield from _live_statements(stmt.orelse)
+            continue
+        yield stmt
+        if isinstance(stmt, (ast.Return, ast.Raise, ast.Break, ast.Continue)):
+            return
+
+
+def _live_nodes(func: ast.AST) -> Iterator[ast.AST]:
+    """Every node of a function body that is not dead code, nested blocks included."""
+    stack = list(_live_statements(func.body))
+    while stack:
+        node = stack.pop()
+        yield node
+        for name, value in ast.iter_fields(node):
+            if isinstance(value, list) and value and isinstance(value[0], ast.stmt):
+                stack.extend(_live_statements(value))
+            elif isinstance(value, list):
+                stack.extend(v for v in value if isinstance(v, ast.AST))
+            elif isinstance(value, ast.AST):
+                stack.append(value)
+
+
+def _method_name(call: ast.Call) -> Optional[str]:
+    return call.func.attr if isinstance(call.func, ast.Attribute) else None
+
+
+def _self_attr(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "self":
+        return node.attr
+    return None
+
+
+# ------------------------------------------------------------------------------
+# Checks
+# ------------------------------------------------------------------------------
+
+class QCAnalyser:
+    """
+    Statically checks a QuantConnect Python algorithm:
+
+    - a QCAlgorithm subclass exists, with Initialize and OnData
+    - an order call (or a framework portfolio model) is reachable from the
+      entry points, i.e. Initialize, the On* event handlers and callbacks
+      such as scheduled events
+    - indicators are registered with the engine and warmed up
+    - no undefined names are read
+
+    Both PascalCase and snake_case Lean APIs are recognised.
+    """
+
+    def analyse(self, code: str) -> AnalysisReport:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError as e:
+            finding = Finding(check="syntax", severity="error", message=f"SyntaxError: {e.msg}", line=e.lineno)
+            return AnalysisReport(ok=False, findings=[finding])
+
+        findings: List[Finding] = []
+        algorithm = self._algorithm_class(tree)
+        if algorithm is None:
+            findings.append(Finding(
+                check="algorithm_class", severity="error",
+                message="No class deriving from QCAlgorithm was found",
+            ))
+        else:
+            methods = {
+                node.name: node for node in algorithm.body
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            }
+            findings += self._check_entry_points(algorithm, methods)
+            reachable = self._reachable(tree, methods)
+            findings += self._check_orders(tree, reachable)
+            findings += self._check_indicators(reachable)
+        findings += self._check_names(tree)
+
+        return AnalysisReport(
+            ok=not any(f.severity == "error" for f in findings),
+            algorithm_class=algorithm.name if algorithm is not None else None,
+            findings=findings,
+        )
+
+    def _algorithm_class(self, tree: ast.Module) -> Optional[ast.ClassDef]:
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and any(_base_name(b) in ALGORITHM_BASES for b in node.bases):
+                return node
+        return None
+
+    def _check_entry_points(self, algorithm: ast.ClassDef, methods: Dict[str, ast.AST]) -> List[Finding]:
+        findings = []
+        if "Initialize" not in methods and "initialize" not in methods:
+            findings.append(Finding(
+                check="initialize", severity="error", line=algorithm.lineno,
+                message=f"{algorithm.name} does not define Initialize()",
+            ))
+        if "OnData" not in methods and "on_data" not in methods:
+            # Algorithms driven by scheduled events, consolidators or framework
+            # models can do without
+            calls = [n for n in ast.walk(algorithm) if isinstance(n, ast.Call)]
+            event_driven = any(
+                _method_name(n) in SCHEDULE_CALLS | CONSOLIDATOR_CALLS | FRAMEWORK_METHODS
+                # RegisterIndicator(symbol, indicator, consolidator)
+                or _method_name(n) in ("RegisterIndicator", "register_indicator")
+                and (len(n.args) >= 3 or any(k.arg == "consolidator" for k in n.keywords))
+                for n in calls
+            )
+            findings.append(Finding(
+                check="on_data", severity="warning" if event_driven else "error", line=algorithm.lineno,
+                message=f"{algorithm.name} does not define OnData()",
+            ))
+        return findings
+
+    def _reachable(self, tree: ast.Module, methods: Dict[str, ast.AST]) -> List[ast.AST]:
+        """
+        Functions that can run: the algorithm's entry points, then every method,
+        module-level function or class they reference, transitively.
+        """
+        module_units = {
+            node.name: node for node in tree.body
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+        }
+        pending = [
+            node for name, node in methods.items()
+            if name in ("Initialize", "initialize") or name.startswith(("On", "on_"))
+        ]
+        seen = {id(node) for node in pending}
+        reachable = []
+        while pending:
+            unit = pending.pop()
+            reachable.append(unit)
+            bodies = [unit] if not isinstance(unit, ast.ClassDef) else [
+                n for n in unit.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+            ]
+            for body in bodies:
+                for node in _live_nodes(body):
+                    # self.helper(...) calls and self.callback references alike
+                    target = methods.get(_self_attr(node)) if isinstance(node, ast.Attribute) else None
+                    if target is None and isinstance(node, ast.Name):
+                        target = module_units.get(node.id)
+                    if target is not None and id(target) not in seen:
+                        seen.add(id(target))
+                        pending.append(target)
+        return reachable
+
+    def _check_orders(self, tree: ast.Module, reachable: List[ast.AST]) -> List[Finding]:
+        live_calls = [n for unit in reachable for n in _live_nodes(unit) if isinstance(n, ast.Call)]
+        if any(_method_name(c) in ORDER_METHODS | FRAMEWORK_METHODS for c in live_calls):
+            return []
+        dead = [n for n in ast.walk(tree) if isinstance(n, ast.Call) and _method_name(n) in ORDER_METHODS]
+        if dead:
+            return [Finding(
+                check="orders", severity="error", line=dead[0].lineno,
+                message=(
+                    f"{_method_name(dead[0])}() is never reached from Initialize, OnData or an event handler, "
+                    "so the algorithm cannot trade"
+                ),
+            )]
+        return [Finding(
+            check="orders", severity="error",
+            message="No order call (SetHoldings, MarketOrder, Liquidate, ...) found, so the algorithm cannot trade",
+        )]
+
+    def _check_indicators(self, reachable: List[ast.AST]) -> List[Finding]:
+        nodes = [n for unit in reachable for n in _live_nodes(unit)]
+        call_names = {_method_name(n) for n in nodes if isinstance(n, ast.Call)}
+        helpers = [
+            n for n in nodes if isinstance(n, ast.Call) and _self_attr(n.func) in INDICATOR_HELPERS
+        ]
+        manual = [
+            n for n in nodes
+            if isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id in INDICATOR_CLASSES
+        ]
+        findings = []
+        if manual and not call_names & REGISTER_CALLS:
+            findings.append(Finding(
+                check="indicators", severity="warning", line=manual[0].lineno,
+                message=(
+                    f"{manual[0].func.id} is created but never registered (RegisterIndicator) "
+                    "or updated, so it will not receive data"
+                ),
+            ))
+        if helpers or manual:
+            warmed = call_names & WARM_UP_CALLS or any(
+                isinstance(n, ast.Attribute) and n.attr in WARM_UP_ATTRIBUTES for n in nodes
+            )
+            if not warmed:
+                first = (helpers or manual)[0]
+                findings.append(Finding(
+                    check="warm_up", severity="warning", line=first.lineno,
+                    message=(
+                        "Indicators are used without SetWarmUp() or an IsReady check, "
+                        "so early signals come from incomplete values"
+                    ),
+                ))
+        return findings
+
+    def _check_names(self, tree: ast.Module) -> List[Finding]:
+        star_imports = [
+            node.module for node in ast.walk(tree)
+            if isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names)
+        ]
+        if any(module != "AlgorithmImports" for module in star_imports):
+            return []  # names from an unknown star import cannot be resolved
+        lean_star = bool(star_imports)
+
+        findings, reported = [], set()
+        for name, line in sorted(_NameResolver(tree).unresolved(), key=lambda item: item[1]):
+            if name in BUILTINS or name in reported:
+                continue
+            if lean_star and (name[:1].isupper() or name in ALGORITHM_IMPORTS_NAMES):
+                continue
+            reported.add(name)
+            findings.append(Finding(
+                check="undefined_name", severity="error", line=line, message=f"Name '{name}' is not defined",
+            ))
+        return findings
+
+
+class _NameResolver:
+    """
+    Python scoping, simplified where it can only cause false negatives:
+    comprehension and lambda variables are treated as locals of the
+    enclosing function, and a name bound anywhere in a scope counts as
+    bound for the whole scope.
+    """
+
+    SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+    def __init__(self, tree: ast.Module):
+        self.tree = tree
+
+    def unresolved(self):
+        yield from self._scope(self.tree, [])
+
+    def _scope(self, node: ast.AST, enclosing: List[Set[str]]):
+        bound = self._bindings(node)
+        # Class bodies are not visible from their methods
+        chain = enclosing + [bound]
+        inner = chain if not isinstance(node, ast.ClassDef) else enclosing
+        for child in self._own_nodes(node):
+            if isinstance(child, self.SCOPES):
+                # Decorators, defaults and bases are evaluated in this scope
+                for expr in child.decorator_list + getattr(child, "bases", []) + self._defaults(child):
+                    yield from self._loads(expr, chain)
+                yield from self._scope(child, inner)
+            elif isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+                if not any(child.id in scope for scope in chain):
+                    yield child.id, child.lineno
+
+    def _loads(self, expr: ast.AST, chain: List[Set[str]]):
+        for node in ast.walk(expr):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                if not any(node.id in scope for scope in chain):
+                    yield node.id, node.lineno
+
+    def _defaults(self, node: ast.AST) -> List[ast.AST]:
+        if isinstance(node, ast.ClassDef):
+            return [k.value for k in node.keywords]
+        args = node.args
+        return [d for d in args.defaults + args.kw_defaults if d is not None]
+
+    def _own_nodes(self, scope: ast.AST) -> Iterator[ast.AST]:
+        """Nodes of a scope without descending into nested functions or classes (which are yielded)."""
+        stack = list(scope.body)
+        while stack:
+            node = stack.pop()
+            yield node
+            if isinstance(node, self.SCOPES):
+                continue
+            stack.extend(ast.iter_child_nodes(node))
+
+    def _bindings(self, scope: ast.AST) -> Set[str]:
+        bound: Set[str] = set()
+        if isinstance(scope, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            args = scope.args
+            for arg in args.posonlyargs + args.args + args.kwonlyargs + [args.vararg, args.kwarg]:
+                if arg is not None:
+                    bound.add(arg.arg)
+        for node in self._own_nodes(scope):
+            if isinstance(node, self.SCOPES):
+                bound.add(node.name)
+            elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+                bound.add(node.id)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                bound.update((a.asname or a.name).split(".")[0] for a in node.names if a.name != "*")
+            elif isinstance(node, (ast.Global, ast.Nonlocal)):
+                bound.update(node.names)
+            elif isinstance(node, ast.ExceptHandler) and node.name:
+                bound.add(node.name)
+            elif isinstance(node, ast.arg):
+                bound.add(node.arg)  # lambda parameters
+            elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+                bound.add(node.name)
+            elif isinstance(node, ast.MatchMapping) and node.rest:
+                bound.add(node.rest)
+        if isinstance(scope, ast.Module):
+            # Module-level `global` statements inside functions bind module names
+            for node in ast.walk(scope):
+                if isinstance(node, ast.Global):
+                    bound.update(node.names)
+        return bound
+
+
+def analyse_algorithm(code: str) -> AnalysisReport:
+    return QCAnalyser().analyse(code)
+
+
+def validate_code(code: str, static_analysis: Optional[bool] = None) -> AnalysisReport:
+    """
+    Local validation used by CodeValidationTool and bulk sweeps: the full
+    analyser with code_static_analysis on, otherwise a syntax check only.
+    """
+    if settings.code_static_analysis if static_analysis is None else static_analysis:
+        try:
+            return analyse_algorithm(code)
+        except Exception:
+            logger.exception("Static analysis failed, falling back to syntax check")
+    try:
+        ast.parse(code)
+        return AnalysisReport(ok=True)
+    except SyntaxError as e:
+        logger.error(f"Syntax error during AST validation: {e}")
+        message = f"SyntaxError: {e.msg} at line {e.lineno}, column {e.offset}"
+        return AnalysisReport(ok=False, findings=[Finding(check="syntax", severity="error", message=message)])
+    except Exception as e:
+        logger.exception("Unexpected error during code validation")
+        message = f"Validation failed: {str(e)}"
+        return AnalysisReport(ok=False, findings=[Finding(check="syntax", severity="error", message=message)])
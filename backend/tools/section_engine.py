@@ -0,0 +1,81 @@
+# tools/section_engine.py
+
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Iterable, List
+
+# URLs and the SSRN download banner are removed wherever they appear in a line.
+# Both contain a colon, which lets the scan skip the regex for most lines.
+_INLINE_NOISE = re.compile(r"https?://\S+|(?i:Electronic copy available at: .*)")
+
+# Heading detection modes accepted by PDFAnalyserTool. Kept here, away from the
+# tool's crewai and pdfplumber imports, so request validation stays cheap to import.
+HEADING_MODES = ("nlp", "layout", "auto")
+
+# Lines dropped entirely once stripped (page furniture left over by pdfplumber)
+_DROPPED_LINES = frozenset({"author", "title", "abstract"})
+
+
+@dataclass
+class Section:
+    """
+    A section of the cleaned buffer. The body is kept as a character span
+    [start, end) into the buffer and only materialised when `text` is read.
+    """
+    heading: str
+    position: int
+    start: int
+    end: int
+    buffer: str = field(repr=False)
+
+    @cached_property
+    def text(self) -> str:
+        if self.start >= self.end:
+            return ""
+        return self.buffer[self.start:self.end].replace("\n", " ").strip()
+
+
+class SectionEngine:
+    """
+    Single-pass text cleaning and section splitting.
+
+    `clean` applies every cleaning rule in one scan over the lines of the raw
+    text and returns a buffer with one stripped, non-empty line per row.
+    `split` walks that buffer once, looking lines up in a heading set, and
+    records section bodies as offsets rather than copying text around.
+    """
+
+    def clean(self, raw: str) -> str:
+        kept = []
+        for line in raw.split("\n"):
+            if ":" in line:
+                line = _INLINE_NOISE.sub("", line)
+            line = line.strip()
+            if not line or line.isdecimal() or line.lower() in _DROPPED_LINES:
+                continue
+            kept.append(line)
+        return "\n".join(kept)
+
+    def split(self, buffer: str, headings: Iterable[str]) -> List[Section]:
+        heading_set = {h.strip() for h in headings}
+        sections = []
+        heading, position, next_position = "Preamble", 0, 1
+        body_start = 0
+        length = len(buffer)
+        start = 0
+
+        while start < length:
+            end = buffer.find("\n", start)
+            if end == -1:
+                end = length
+            line = buffer[start:end]
+            if line in heading_set:
+                sections.append(Section(heading, position, body_start, start, buffer))
+                heading, position = line, next_position
+                next_position += 1
+                body_start = end + 1
+            start = end + 1
+
+        sections.append(Section(heading, position, body_start, length, buffer))
+        return sections
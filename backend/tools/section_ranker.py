@@ -0,0 +1,80 @@
+# tools/section_ranker.py
+
+import math
+import re
+from typing import Any, Dict, List
+
+from utils.tokens import count_tokens, truncate_to_tokens
+
+# How much a section of each type_hint (see PDFAnalyserTool._guess_type)
+# is worth to a strategy summary
+TYPE_WEIGHTS: Dict[str, float] = {
+    "methodology": 3.0,
+    "findings": 2.0,
+    "summary": 1.5,
+    "background": 1.0,
+    "interpretation": 1.0,
+    "general": 1.0,
+    "appendix": 0.3,
+    "references": 0.0,
+}
+PREAMBLE_WEIGHT = 0.3
+
+TRADING_KEYWORDS = re.compile(
+    r"\b(?:signal|momentum|moving average|crossover|indicator|entry|exit|stop[- ]loss|take[- ]profit|"
+    r"position|portfolio|rebalanc\w*|long|short|volatility|threshold|lookback|window|holding period|"
+    r"sharpe|drawdown|leverage|hedg\w*|risk|return|spread|mean[- ]revers\w*|trend|breakout|"
+    r"RSI|MACD|SMA|EMA|ATR|Bollinger|z-score|quantile|decile|rank\w*)\b",
+    re.IGNORECASE,
+)
+
+HEADING_OVERHEAD_TOKENS = 8  # "### heading" plus separators
+MIN_TRUNCATED_TOKENS = 200  # don't bother including smaller fragments of a section
+SHORT_SECTION_TOKENS = 50  # sections shorter than this are likely stray fragments
+
+
+def score_section(section: Dict[str, Any], tokens: int) -> float:
+    """
+    Relevance of a section to strategy summarisation: its type weight, scaled
+    up by the density of trading vocabulary and down for very short fragments.
+    """
+    heading = section.get("heading", "")
+    if heading == "Preamble":
+        weight = PREAMBLE_WEIGHT
+    else:
+        weight = TYPE_WEIGHTS.get(section.get("type_hint", "general"), 1.0)
+    if weight <= 0 or tokens <= 0:
+        return 0.0
+
+    hits = len(TRADING_KEYWORDS.findall(section.get("text", ""))) + 2 * len(TRADING_KEYWORDS.findall(heading))
+    density = 100 * hits / tokens  # keyword hits per 100 tokens
+    length_factor = min(1.0, tokens / SHORT_SECTION_TOKENS) * (1 + math.log10(1 + tokens / 1000))
+    return weight * (1 + density) * length_factor
+
+
+def select_sections(sections: List[Dict[str, Any]], token_budget: int) -> List[Dict[str, Any]]:
+    """
+    Keep the highest scoring sections that fit in `token_budget` tokens,
+    returned in document order. The best section that does not fit whole is
+    truncated into the remaining budget when enough of it is left.
+    """
+    scored = []
+    for idx, section in enumerate(sections):
+        tokens = count_tokens(section.get("text", ""))
+        scored.append((score_section(section, tokens), idx, tokens, section))
+
+    remaining = token_budget
+    chosen = []
+    for score, idx, tokens, section in sorted(scored, key=lambda s: (-s[0], s[1])):
+        if score <= 0 or remaining <= HEADING_OVERHEAD_TOKENS:
+            continue
+        cost = tokens + HEADING_OVERHEAD_TOKENS
+        if cost <= remaining:
+            chosen.append((idx, section))
+            remaining -= cost
+        elif remaining - HEADING_OVERHEAD_TOKENS >= MIN_TRUNCATED_TOKENS:
+            text = truncate_to_tokens(section.get("text", ""), remaining - HEADING_OVERHEAD_TOKENS)
+            chosen.append((idx, {**section, "text": text}))
+            remaining = 0
+
+    return [section for _, section in sorted(chosen, key=lambda c: c[0])]
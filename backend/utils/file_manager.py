@@ -1,23 +1,91 @@
+import asyncio
+import hashlib
+import json
 import os
+import tempfile
+import threading
+from typing import Tuple
 from fastapi import UploadFile
 from core.config import settings
 
 USER_WORKDIR = settings.USER_WORKDIR
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+HASH_INDEX_NAME = ".sha256_index.json"
+_hash_index_lock = threading.Lock()
 
 
 def ensure_folder_exists(folder_path: str):
     os.makedirs(folder_path, exist_ok=True)
 
 
-#async def save_uploaded_file(file: UploadFile, folder_path: str) -> str:
- #   ensure_folder_exists(folder_path)
-  #  file_path = os.path.join(folder_path, file.filename)
+async def save_uploaded_file(file: UploadFile, folder_path: str) -> Tuple[str, str]:
+    """
+    Stream an upload to disk in chunks and return (path, sha256).
+
+    The bytes go to a temp file in the target folder while being hashed, then
+    the temp file is atomically renamed into place. If a file with the same
+    content was stored before, the temp file is discarded and the existing
+    path is returned instead; if only the name is taken, the upload is stored
+    as `<hash prefix>_<name>`, so a stored file never changes content. Disk
+    writes and the hash index update run in worker threads, so the event loop
+    never blocks on them.
+    """
+    ensure_folder_exists(folder_path)
+    digest = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=folder_path, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await asyncio.to_thread(_hash_and_write, digest, out, chunk)
+        filename = os.path.basename(file.filename or digest.hexdigest() + ".pdf")
+        return await asyncio.to_thread(_store_upload, folder_path, tmp_path, digest.hexdigest(), filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _hash_and_write(digest, out, chunk: bytes):
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _store_upload(folder_path: str, tmp_path: str, content_hash: str, filename: str) -> Tuple[str, str]:
+    """Move a finished upload into place, or drop it if its content is already stored."""
+    # Concurrent uploads would otherwise lose each other's index entries
+    with _hash_index_lock:
+        index = _load_hash_index(folder_path)
+        existing = index.get(content_hash)
+        if existing and os.path.isfile(os.path.join(folder_path, existing)):
+            os.remove(tmp_path)
+            return os.path.join(folder_path, existing), content_hash
+
+        # Never replace a stored file with other content: jobs and the section
+        # cache know it by path and hash, and the two must keep agreeing
+        if os.path.exists(os.path.join(folder_path, filename)):
+            filename = f"{content_hash[:16]}_{filename}"
+        file_path = os.path.join(folder_path, filename)
+        os.replace(tmp_path, file_path)
+
+        index[content_hash] = filename
+        _save_hash_index(folder_path, index)
+        return file_path, content_hash
+
+
+def _load_hash_index(folder_path: str) -> dict:
+    try:
+        with open(os.path.join(folder_path, HASH_INDEX_NAME), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
 
-   # contents = await file.read()  # ✅ Fix corruption
-    #with open(file_path, "wb") as f:
-     #   f.write(contents)
 
-    #return file_path
+def _save_hash_index(folder_path: str, index: dict):
+    index_path = os.path.join(folder_path, HASH_INDEX_NAME)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
 
 def save_file(path: str, content: str):
     """
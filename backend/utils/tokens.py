@@ -0,0 +1,48 @@
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+ENCODING_NAME = "cl100k_base"
+CHARS_PER_TOKEN = 4  # fallback estimate when tiktoken is unavailable
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """
+    Load the tiktoken encoding once. Returns None when tiktoken or its
+    encoding file is unavailable, in which case counts are estimated.
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, estimating token counts from length: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens locally, without calling the model API.
+    """
+    if not text:
+        return 0
+    enc = _encoding()
+    if enc is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text down to at most `max_tokens` tokens.
+    """
+    if max_tokens <= 0:
+        return ""
+    enc = _encoding()
+    if enc is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = enc.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens])